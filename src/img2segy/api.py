@@ -1,22 +1,112 @@
+import functools
+import glob
+import io
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
+import numpy as np
 import toml
 from PIL import Image, ImageOps
-from segpy.writer import write_segy
+import segpy.writer
 
-from img2segy.geometry import Geometry
+from img2segy import cache, chunked, compression, writer
+from img2segy.defaults import DEFAULT_ENGINE
+from img2segy.geometry import ConfigurationError as GeometryConfigurationError, Geometry
 from img2segy.image_dataset import ImageDataset
-from img2segy.trace_header_mapper import TraceHeaderMapper
+from img2segy.profiling import NULL_PROFILE, Profile
+from img2segy.render import render_segy
+from img2segy.resampling import ConfigurationError as ResamplingConfigurationError, Resampling
+from img2segy.sample_encoder import ConfigurationError as SampleEncoderConfigurationError, SampleEncoder
+from img2segy.trace_header_mapper import ConfigurationError as TraceHeaderMapperConfigurationError, TraceHeaderMapper
+from img2segy.verify import verify_segy
+from img2segy.volume_dataset import (
+    ConfigurationError as VolumeConfigurationError,
+    VolumeDataset,
+    volume_slices,
+)
 
 logger = logging.getLogger(__name__)
 
+# The functions which can be used to serialize a dataset to SEG-Y, keyed by engine name.
+WRITERS = {
+    "native": writer.write_segy,
+    "mmap": writer.write_segy_mapped,
+    "segpy": segpy.writer.write_segy,
+}
+
 
 class ConfigurationError(Exception):
     pass
 
 
-def convert(image_filepath: Path, segy_filepath: Path=None, config_filepath: Path=None, *, force=False):
+# Exceptions which indicate a problem with the configuration rather than with the image.
+CONFIGURATION_ERRORS = (
+    ConfigurationError,
+    GeometryConfigurationError,
+    ResamplingConfigurationError,
+    SampleEncoderConfigurationError,
+    TraceHeaderMapperConfigurationError,
+    VolumeConfigurationError,
+)
+
+GLOB_CHARACTERS = frozenset("*?[")
+
+# Output formats, other than the compression codecs, selected by the extension of the output path.
+SEGY = "segy"
+ZARR = "zarr"
+ZARR_SUFFIX = ".zarr"
+
+
+@dataclass(frozen=True)
+class Conversion:
+    """An image to be converted to SEG-Y, with optional paths to its configuration and output.
+
+    Omitted paths are derived from the image path, as they are by convert().
+    """
+    image_filepath: Path
+    segy_filepath: Optional[Path] = None
+    config_filepath: Optional[Path] = None
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """The outcome of one conversion in a batch.
+
+    Attributes:
+        conversion: The conversion which was attempted.
+        error: A description of the error which caused the conversion to fail, or None if the
+            conversion succeeded.
+        configuration_error: True if the failure was caused by the configuration.
+        up_to_date: True if the conversion was skipped because its output was up to date.
+        stats: The statistics recorded by the Profile of the conversion, as returned by
+            Profile.as_dict(), or None if it was not profiled.
+    """
+    conversion: Conversion
+    error: Optional[str] = None
+    configuration_error: bool = False
+    up_to_date: bool = False
+    stats: Optional[dict] = None
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def convert(
+        image_filepath: Path,
+        segy_filepath: Path=None,
+        config_filepath: Path=None,
+        *,
+        force=False,
+        engine=DEFAULT_ENGINE,
+        strip_width=None,
+        workers=1,
+        profile=None,
+):
     """Convert an image to SEG-Y.
 
     Args:
@@ -24,28 +114,679 @@ def convert(image_filepath: Path, segy_filepath: Path=None, config_filepath: Pat
 
         segy_filepath: An optional path to the SEG-Y file that will be produced. If not provided
             the path to will be generated by changing the extension of the image file to *.segy
+            Alternatively, a file-like object open for binary write, such as sys.stdout.buffer,
+            to which the SEG-Y data is written strictly sequentially in blocks of bounded size.
+            Streams are always written, regardless of force, and require the "native" engine.
+            Paths ending in *.gz or *.zst are written as SEG-Y compressed with gzip or zstd,
+            and paths ending in *.zarr as a chunked Zarr container (see output_format()).
+            Both require the "native" engine, and Zarr containers are always written.
 
         config_filepath: An optional path to a TOML file containing configuration information.
             If not provided this function will look for a config file with the same name as the
             image file, but with the *.toml file extension.
+
+        engine: The name of the SEG-Y writer to use; one of the keys of WRITERS. The
+            "native" engine serializes traces in bulk with NumPy, the "mmap" engine
+            preallocates the file and assigns traces in bulk into a memory mapping of it, and
+            the "segpy" engine serializes one trace at a time with segpy. All produce
+            identical output.
+
+        strip_width: If provided, the image is decoded and written in vertical strips of this
+            many columns, so that peak memory use is bounded by the strip width rather than by
+            the image size. This is only effective for uncompressed images, tiled or not; others
+            are decoded once in their entirety.
+
+        workers: The number of threads across which the traces of the image will be sharded,
+            each shard being decoded, encoded and written concurrently at its position in the
+            file. Unless strip_width is given, each shard is decoded as a single strip. If
+            greater than one, the "mmap" engine is used if "native" was specified. For
+            compressed outputs, the number of threads which compress chunks concurrently.
+
+        force: If False, the conversion is skipped when the SEG-Y file is up to date: when
+            the manifest written beside it records that it was produced by this version of
+            img2segy from identical image content and configuration. If True, the image is
+            always converted.
+
+        profile: An optional Profile in which the wall-clock time, CPU time and peak memory
+            allocation of each stage of the conversion are recorded.
+
+    Returns:
+        True if the image was converted, or False if the conversion was skipped because the
+        SEG-Y file was up to date.
+
+    Raises:
+        ValueError: If the engine is unknown, or cannot write to the requested output.
     """
+    segy_stream = is_stream(segy_filepath)
     image_filepath = Path(image_filepath)
-    segy_filepath = (segy_filepath and Path(segy_filepath)) or image_filepath.with_suffix(".segy")
+    if not segy_stream:
+        segy_filepath = (
+            (segy_filepath and Path(segy_filepath)) or image_filepath.with_suffix(".segy")
+        )
+    write_segy = _writer(engine, workers, segy_stream, output_format(segy_filepath))
+    # A directory of chunks cannot be checked for being unchanged, so is always written
+    cacheable = not segy_stream and output_format(segy_filepath) != ZARR
     config_filepath = (config_filepath and Path(config_filepath)) or image_filepath.with_suffix(".toml")
 
     logger.info("segy_filepath = %s", segy_filepath)
     logger.info("image_filepath = %s", image_filepath)
     logger.info("config_filepath = %s", config_filepath)
 
+    profile = profile or NULL_PROFILE
+
+    with profile.stage("configure"):
+        config = load_config(config_filepath)
+        components = _components(config)
+
+    if cacheable:
+        with profile.stage("digest"):
+            digest = cache.source_digest(image_filepath, config)
+            up_to_date = not force and cache.is_up_to_date(segy_filepath, digest)
+        if up_to_date:
+            logger.info("%s is up to date", segy_filepath)
+            return False
+
+    with profile.stage("decode"):
+        image = Image.open(image_filepath)
+        strip_width = _strip_width(image, strip_width, workers)
+        if strip_width is None:
+            image.load()
+
+    dataset = ImageDataset(image, **components, strip_width=strip_width, profile=profile)
+    profile.record_traces(dataset.num_traces())
+
+    if segy_stream:
+        with profile.stage("write"):
+            write_segy(segy_filepath, dataset)
+            segy_filepath.flush()
+        return True
+
+    if cacheable:
+        cache.invalidate(segy_filepath)
+    with profile.stage("write"):
+        _write(segy_filepath, dataset, write_segy, workers)
+    if cacheable:
+        cache.record(segy_filepath, digest, image_filepath, config_filepath)
+    return True
+
+
+def convert_image(
+        image,
+        config,
+        segy=None,
+        *,
+        engine=DEFAULT_ENGINE,
+        workers=1,
+        profile=None,
+):
+    """Convert an image held in memory to SEG-Y, without reading from the filesystem.
+
+    Args:
+        image: The image, in any of the forms accepted by open_image().
+
+        config: The configuration, as a dictionary such as that returned by load_config().
+
+        segy: An optional path to the SEG-Y file that will be produced, or a file-like object
+            open for binary write. If not provided, the SEG-Y data are returned.
+
+        engine, workers, profile: As for convert().
+
+    Returns:
+        The SEG-Y data as bytes if segy was not provided, otherwise None.
+
+    Raises:
+        ValueError: If the engine is unknown or cannot write to the requested output, or the
+            image array has an unsupported shape or type.
+        TypeError: If the image is not of a supported type.
+    """
+    write_segy = _writer(engine, workers, segy is None or is_stream(segy), output_format(segy))
+    profile = profile or NULL_PROFILE
+
+    with profile.stage("configure"):
+        components = _components(config)
+
+    with profile.stage("decode"):
+        image = open_image(image)
+        image.load()
+
+    dataset = ImageDataset(
+        image, **components, strip_width=_strip_width(image, None, workers), profile=profile
+    )
+    profile.record_traces(dataset.num_traces())
+
+    with profile.stage("write"):
+        if segy is None:
+            segy_buffer = io.BytesIO()
+            write_segy(segy_buffer, dataset)
+            return segy_buffer.getvalue()
+        if is_stream(segy):
+            write_segy(segy, dataset)
+            segy.flush()
+        else:
+            _write(Path(segy), dataset, write_segy, workers)
+    return None
+
+
+def convert_volume(
+        image_filepaths: Iterable[Path],
+        segy_filepath: Path,
+        config_filepaths: Iterable[Path]=None,
+        *,
+        engine=DEFAULT_ENGINE,
+        workers=1,
+        profile=None,
+):
+    """Assemble many images into a single three-dimensional SEG-Y volume.
+
+    Each image is an inline of the volume, positioned by its own configuration. Each page of a
+    multi-page image, such as a TIFF file, is a further inline, displaced from the previous page
+    by the [volume] page-offset of its configuration. The trace header mapping, resampling and
+    sample encoding of the whole volume are those configured for the first image. The slices
+    are decoded one at a time as they are written, so only one need be held in memory.
+
+    Args:
+        image_filepaths: The paths to the image files, in inline order.
+
+        segy_filepath: The path to the SEG-Y file that will be produced, or a file-like object
+            open for binary write.
+
+        config_filepaths: Optional paths to the TOML configuration file of each image. If not
+            provided, or if an entry is None, the file with the same name as the image, but
+            with the *.toml file extension, is used.
+
+        engine, workers, profile: As for convert().
+
+    Raises:
+        ValueError: If the engine is unknown or cannot write to the requested output, there are
+            no images, or the slices differ in their dimensions, sample interval or data sample format.
+    """
+    segy_stream = is_stream(segy_filepath)
+    write_segy = _writer(engine, workers, segy_stream, output_format(segy_filepath))
+    image_filepaths = [Path(image_filepath) for image_filepath in image_filepaths]
+    if not image_filepaths:
+        raise ValueError("A volume requires at least one image")
+    config_filepaths = list(config_filepaths or [None] * len(image_filepaths))
+    profile = profile or NULL_PROFILE
+
+    with profile.stage("configure"):
+        slices = []
+        components = None
+        for image_filepath, config_filepath in zip(image_filepaths, config_filepaths):
+            config_filepath = (
+                (config_filepath and Path(config_filepath)) or image_filepath.with_suffix(".toml")
+            )
+            config = load_config(config_filepath)
+            if components is None:
+                components = _components(config)
+            with Image.open(image_filepath) as image:
+                num_pages = getattr(image, "n_frames", 1)
+            slices.extend(volume_slices(image_filepath, config, num_pages))
+
+        dataset = VolumeDataset(
+            slices,
+            components["trace_header_mapper"],
+            resampling=components["resampling"],
+            sample_encoder=components["sample_encoder"],
+        )
+    profile.record_traces(dataset.num_traces())
+
+    logger.info("Assembling %d slices into %s", len(slices), segy_filepath)
+    with profile.stage("write"):
+        if segy_stream:
+            write_segy(segy_filepath, dataset)
+            segy_filepath.flush()
+        else:
+            _write(Path(segy_filepath), dataset, write_segy, workers)
+
+
+def render(
+        segy_filepath: Path,
+        image_filepath: Path=None,
+        *,
+        trace_step=1,
+        sample_step=1,
+        bits=8,
+        amplitude_scale=1.0,
+):
+    """Render a SEG-Y file with fixed-length traces as a grayscale image, one column per trace.
+
+    The traces are memory-mapped and read as a single strided array, so the file is not parsed
+    trace by trace. SEG-Y files converted from 8-bit images with the default settings are
+    rendered as the grayscale image from which they were converted.
+
+    Args:
+        segy_filepath: The path to the SEG-Y file.
+
+        image_filepath: An optional path to the image file that will be produced, in a format
+            determined by its extension. If not provided the path will be generated by
+            appending the *.png extension to the SEG-Y file path, so that an image from which
+            the SEG-Y file was converted is not overwritten.
+
+        trace_step, sample_step: Render only every trace_step-th trace and every
+            sample_step-th sample of each trace.
+
+        bits: The bit depth of the image: 8 or 16.
+
+        amplitude_scale: The factor by which floating point samples were multiplied when
+            they were encoded, as configured by the amplitude-scale entry.
+
+    Returns:
+        The path to the image file.
+
+    Raises:
+        ValueError: If the SEG-Y file does not have fixed-length traces in a supported data
+            sample format, or bits is not 8 or 16.
+    """
+    segy_filepath = Path(segy_filepath)
+    image_filepath = (
+        (image_filepath and Path(image_filepath))
+        or segy_filepath.with_suffix(segy_filepath.suffix + ".png")
+    )
+    image = render_segy(
+        segy_filepath,
+        trace_step=trace_step,
+        sample_step=sample_step,
+        bits=bits,
+        amplitude_scale=amplitude_scale,
+    )
+    image.save(image_filepath)
+    return image_filepath
+
+
+def open_image(image) -> Image.Image:
+    """Open an image held in memory.
+
+    Args:
+        image: Either the content of an image file as bytes, a bytearray or a memoryview; a
+            binary file-like object, such as io.BytesIO or sys.stdin.buffer, positioned at the
+            start of the content of an image file; a PIL.Image.Image; or a two-dimensional
+            NumPy array of unsigned 8-bit or 16-bit grayscale pixel values, indexed by row then
+            column.
+
+    Returns:
+        A PIL.Image.Image, which may not yet have been decoded.
+
+    Raises:
+        ValueError: If the array has an unsupported shape or type.
+        TypeError: If the image is not of a supported type.
+    """
+    if isinstance(image, Image.Image):
+        return image
+    if isinstance(image, np.ndarray):
+        if image.ndim != 2 or image.dtype.kind != "u" or image.dtype.itemsize not in (1, 2):
+            raise ValueError(
+                f"Image array of shape {image.shape} and type {image.dtype} is not a "
+                f"two-dimensional array of uint8 or uint16 pixels"
+            )
+        return Image.fromarray(image)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(image))
+    if hasattr(image, "read"):
+        return Image.open(image)
+    raise TypeError(f"Cannot open an image from {type(image).__name__}")
+
+
+def load_config(config_filepath: Path):
+    """Load a TOML configuration file.
+
+    Returns:
+        The configuration as a dictionary.
+
+    Raises:
+        ConfigurationError: If the file is not valid TOML.
+    """
     try:
-        config = toml.load(config_filepath)
+        return toml.load(config_filepath)
     except toml.decoder.TomlDecodeError as e:
         raise ConfigurationError(f"Configuration error in {config_filepath}: {e}") from e
-    geometry = Geometry.from_config(config)
-    trace_header_mapper = TraceHeaderMapper.from_config(config)
 
+
+def is_stream(segy_filepath) -> bool:
+    """Determine whether a SEG-Y destination is a file-like object rather than a path."""
+    return hasattr(segy_filepath, "write")
+
+
+def output_format(segy_filepath) -> str:
+    """The format in which output is written to a path, as selected by its extension.
+
+    Returns:
+        "zarr" for a chunked Zarr container (*.zarr), the name of the compression codec for
+        compressed SEG-Y ("gzip" for *.gz or "zstd" for *.zst), or "segy" for any other path
+        or for a stream.
+    """
+    if segy_filepath is None or is_stream(segy_filepath):
+        return SEGY
+    if Path(segy_filepath).suffix.lower() == ZARR_SUFFIX:
+        return ZARR
+    return compression.codec_for(segy_filepath) or SEGY
+
+
+def _writer(engine, workers, stream, output=SEGY):
+    """The function which writes SEG-Y with the given engine and number of workers."""
+    try:
+        write_segy = WRITERS[engine]
+    except KeyError:
+        raise ValueError(f"Unknown engine {engine!r}. Choose from {', '.join(WRITERS)}") from None
+    if output != SEGY:
+        # The workers compress chunks of the output rather than writing shards of it
+        if engine != "native":
+            raise ValueError(f"Only the native engine can write {output} output")
+        if output != ZARR:
+            # Fail before the output file is created if the codec is unavailable
+            compression.compressor(output)
+        return write_segy
+    if stream and (engine != "native" or workers > 1):
+        raise ValueError("Only the native engine with one worker can write SEG-Y to a stream")
+    if workers > 1:
+        if engine == "segpy":
+            raise ValueError("The segpy engine cannot write traces concurrently")
+        write_segy = functools.partial(writer.write_segy_mapped, workers=workers)
+    return write_segy
+
+
+def _strip_width(image, strip_width, workers):
+    """The width of the strips in which an image is decoded and encoded.
+
+    When the traces are sharded across several workers and no strip width is given, each
+    shard is a single strip, so that each worker decodes and encodes its own traces rather
+    than copying samples encoded up front.
+    """
+    if strip_width is None and workers > 1:
+        return -(-image.width // workers)
+    return strip_width
+
+
+def _write(segy_filepath: Path, dataset, write_segy, workers):
+    """Write a dataset to a path in the format selected by its extension.
+
+    SEG-Y files are written with write_segy. Compressed SEG-Y files and Zarr containers are
+    written with the native writer, compressing chunks of the output concurrently with the
+    given number of threads.
+    """
+    output = output_format(segy_filepath)
+    if output == ZARR:
+        chunked.write_zarr(segy_filepath, dataset, workers=workers)
+    elif output != SEGY:
+        with open(segy_filepath, 'wb') as segy_file:
+            with compression.CompressedWriter(segy_file, output, workers=workers) as compressed_file:
+                writer.write_segy(compressed_file, dataset)
+    else:
+        with open(segy_filepath, 'w+b') as segy_file:
+            write_segy(segy_file, dataset)
+
+
+def _components(config):
+    """The arguments to ImageDataset, other than the image, described by a configuration."""
+    return dict(
+        geometry=Geometry.from_config(config),
+        trace_header_mapper=TraceHeaderMapper.from_config(config),
+        resampling=Resampling.from_config(config),
+        sample_encoder=SampleEncoder.from_config(config),
+    )
+
+
+def convert_many(
+        conversions: Iterable[Conversion],
+        *,
+        workers=None,
+        force=False,
+        engine=DEFAULT_ENGINE,
+        strip_width=None,
+        profile=False,
+) -> Iterator[ConversionResult]:
+    """Convert many images to SEG-Y, concurrently.
+
+    The failure of one conversion does not prevent the others from proceeding.
+
+    Args:
+        conversions: An iterable series of Conversion objects, such as those produced by
+            find_conversions() or read_manifest().
+
+        workers: The number of worker processes to use. If None, the number of CPUs is used.
+            If one, conversions are performed sequentially in this process.
+
+        force, engine, strip_width: As for convert(), applied to each conversion.
+
+        profile: If True, each conversion is profiled and its statistics included in its
+            ConversionResult.
+
+    Yields:
+        A ConversionResult for each conversion, in the order in which they complete.
+    """
+    conversions = list(conversions)
+    options = dict(force=force, engine=engine, strip_width=strip_width, profile=profile)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(conversions) <= 1:
+        for conversion in conversions:
+            yield convert_one(conversion, **options)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(conversions))) as executor:
+        futures = [executor.submit(convert_one, conversion, **options) for conversion in conversions]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def convert_one(
+        conversion: Conversion,
+        *,
+        force=False,
+        engine=DEFAULT_ENGINE,
+        strip_width=None,
+        profile=False,
+) -> ConversionResult:
+    """Convert one image to SEG-Y, reporting rather than raising any error.
+
+    This is the unit of work performed by convert_many() and by the conversion server, and
+    may be run in a worker process.
+
+    Args:
+        conversion: The Conversion to perform.
+
+        force, engine, strip_width: As for convert().
+
+        profile: If True, the conversion is profiled and its statistics included in the
+            ConversionResult.
+
+    Returns:
+        A ConversionResult describing the outcome.
+    """
+    conversion_profile = Profile() if profile else None
+    try:
+        converted = convert(
+            conversion.image_filepath,
+            conversion.segy_filepath,
+            conversion.config_filepath,
+            force=force,
+            engine=engine,
+            strip_width=strip_width,
+            profile=conversion_profile,
+        )
+    except CONFIGURATION_ERRORS as e:
+        logger.debug("Configuration error converting %s", conversion.image_filepath, exc_info=True)
+        return ConversionResult(conversion, error=str(e), configuration_error=True)
+    except Exception as e:
+        logger.debug("Error converting %s", conversion.image_filepath, exc_info=True)
+        return ConversionResult(conversion, error=f"{type(e).__name__}: {e}")
+    return ConversionResult(
+        conversion,
+        up_to_date=not converted,
+        stats=conversion_profile and conversion_profile.as_dict(),
+    )
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    """The outcome of verifying the output of one conversion.
+
+    Attributes:
+        conversion: The conversion whose output was verified.
+        mismatches: The Mismatches between the SEG-Y file and the image and configuration.
+        error: A description of the error which prevented verification, or None.
+    """
+    conversion: Conversion
+    mismatches: tuple = ()
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self):
+        return self.error is None and not self.mismatches
+
+
+def verify(
+        image_filepath: Path,
+        segy_filepath: Path=None,
+        config_filepath: Path=None,
+        *,
+        strip_width=None,
+) -> list:
+    """Verify that a SEG-Y file is the conversion of an image with its configuration.
+
+    The trace count, reel headers, trace headers and samples of the memory-mapped SEG-Y file
+    are checked in bulk against the image and configuration. Coordinates are checked against
+    positions interpolated directly between the control points of the Geometry, and samples
+    against the grayscale pixels of the image, independently of the code which wrote them.
+    Trace and crossline numbers are also checked to be increasing.
+
+    Args:
+        image_filepath, segy_filepath, config_filepath, strip_width: As for convert().
+
+    Returns:
+        A list of Mismatches, which is empty if the SEG-Y file is as expected.
+
+    Raises:
+        FileNotFoundError: If the SEG-Y file does not exist.
+    """
+    image_filepath = Path(image_filepath)
+    segy_filepath = (segy_filepath and Path(segy_filepath)) or image_filepath.with_suffix(".segy")
+    config_filepath = (config_filepath and Path(config_filepath)) or image_filepath.with_suffix(".toml")
+    if not segy_filepath.is_file():
+        raise FileNotFoundError(f"No SEG-Y file {segy_filepath}")
+
+    components = _components(load_config(config_filepath))
     image = Image.open(image_filepath)
-    dataset = ImageDataset(image, geometry, trace_header_mapper)
+    # The dataset is only ever asked for pixels, so is never given the chance to encode samples
+    dataset = ImageDataset(image, **components, strip_width=strip_width or image.width)
+    return verify_segy(segy_filepath, dataset)
+
+
+def verify_many(
+        conversions: Iterable[Conversion],
+        *,
+        workers=None,
+        strip_width=None,
+) -> Iterator[VerificationResult]:
+    """Verify the outputs of many conversions, concurrently.
+
+    Args:
+        conversions: An iterable series of Conversion objects, such as those produced by
+            find_conversions() or read_manifest().
+
+        workers: The number of worker processes to use. If None, the number of CPUs is used.
+            If one, verifications are performed sequentially in this process.
+
+        strip_width: As for convert(), applied to each verification.
+
+    Yields:
+        A VerificationResult for each conversion, in the order in which they complete.
+    """
+    conversions = list(conversions)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(conversions) <= 1:
+        for conversion in conversions:
+            yield _verify_one(conversion, strip_width)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(conversions))) as executor:
+        futures = [executor.submit(_verify_one, conversion, strip_width) for conversion in conversions]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _verify_one(conversion: Conversion, strip_width=None) -> VerificationResult:
+    try:
+        mismatches = verify(
+            conversion.image_filepath,
+            conversion.segy_filepath,
+            conversion.config_filepath,
+            strip_width=strip_width,
+        )
+    except Exception as e:
+        logger.debug("Error verifying %s", conversion.image_filepath, exc_info=True)
+        return VerificationResult(conversion, error=f"{type(e).__name__}: {e}")
+    return VerificationResult(conversion, mismatches=tuple(mismatches))
+
+
+def find_conversions(sources: Iterable) -> Iterator[Conversion]:
+    """Find images to be converted.
+
+    Args:
+        sources: An iterable series of paths to image files, paths to directories which will be
+            searched (non-recursively) for files with image file extensions, or glob patterns
+            such as "sections/**/*.tif".
+
+    Yields:
+        A Conversion for each distinct image found, with its configuration and output paths
+        to be derived from the image path.
+    """
+    image_suffixes = set(Image.registered_extensions())
+    seen = set()
+    for source in sources:
+        source = str(source)
+        if GLOB_CHARACTERS.intersection(source):
+            candidates = sorted(Path(p) for p in glob.glob(source, recursive=True))
+        elif Path(source).is_dir():
+            candidates = sorted(Path(source).iterdir())
+        else:
+            # An explicitly named file is always included, so that if it is missing or isn't an
+            # image its conversion will fail and be reported.
+            candidates = None
+        filepaths = (
+            [Path(source)] if candidates is None
+            else [p for p in candidates if p.suffix.lower() in image_suffixes and p.is_file()]
+        )
+        for filepath in filepaths:
+            key = filepath.resolve()
+            if key not in seen:
+                seen.add(key)
+                yield Conversion(filepath)
+
+
+def read_manifest(manifest_filepath: Path) -> list:
+    """Read a TOML manifest of conversions.
+
+    The manifest contains an array of tables, each with an image path and optional config
+    and segy paths. Relative paths are relative to the directory containing the manifest::
+
+        [[conversion]]
+        image = "sections/line_1.tif"
+
+        [[conversion]]
+        image = "sections/line_2.tif"
+        config = "configs/line_2.toml"
+        segy = "output/line_2.segy"
+
+    Returns:
+        A list of Conversion objects.
+
+    Raises:
+        ConfigurationError: If the manifest is malformed.
+    """
+    manifest_filepath = Path(manifest_filepath)
+    base_dirpath = manifest_filepath.parent
+    try:
+        manifest = toml.load(manifest_filepath)
+        return [
+            Conversion(
+                image_filepath=base_dirpath / entry["image"],
+                segy_filepath=_optional_path(base_dirpath, entry.get("segy")),
+                config_filepath=_optional_path(base_dirpath, entry.get("config")),
+            )
+            for entry in manifest.get("conversion", [])
+        ]
+    except (toml.decoder.TomlDecodeError, KeyError, TypeError) as e:
+        raise ConfigurationError(f"Manifest error in {manifest_filepath}: {e}") from e
+
 
-    with open(segy_filepath, 'wb') as segy_file:
-        write_segy(segy_file, dataset)
+def _optional_path(base_dirpath, filepath):
+    return None if filepath is None else base_dirpath / filepath
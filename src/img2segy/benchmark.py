@@ -0,0 +1,261 @@
+"""Benchmarking conversion throughput on synthetic workloads.
+
+Each workload is a synthetic image of a given width, height and bit depth, saved as an
+uncompressed TIFF file together with a matching TOML configuration. The stages of converting it
+are timed separately, so that a regression can be attributed to the stage responsible:
+
+  construct: Opening the image and constructing the ImageDataset, including decoding the image
+      and building the table of trace header values.
+  headers: Assembling the trace headers of every trace into a structured array.
+  encode: Encoding the pixels of the whole image as samples.
+  write: Writing the dataset to a SEG-Y file.
+
+The results can be saved as JSON and compared with those from an earlier release.
+"""
+import datetime
+import platform
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import toml
+from PIL import Image
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy import writer
+from img2segy.api import WRITERS
+from img2segy.defaults import (
+    DEFAULT_BENCHMARK_BIT_DEPTHS as DEFAULT_BIT_DEPTHS,
+    DEFAULT_BENCHMARK_HEIGHTS as DEFAULT_HEIGHTS,
+    DEFAULT_BENCHMARK_REPEAT as DEFAULT_REPEAT,
+    DEFAULT_BENCHMARK_TOLERANCE as DEFAULT_TOLERANCE,
+    DEFAULT_BENCHMARK_WIDTHS as DEFAULT_WIDTHS,
+    DEFAULT_ENGINE,
+)
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.profiling import peak_rss_bytes
+from img2segy.sample_encoder import SampleEncoder
+from img2segy.trace_header_mapper import TraceHeaderMapper
+from img2segy.version import __version__
+
+BYTES_PER_MEGABYTE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Workload:
+    """The dimensions of a synthetic image to be converted."""
+    width: int
+    height: int
+    bits: int = 8
+
+    def __post_init__(self):
+        if self.width < 1 or self.height < 2:
+            raise ValueError(f"Workload {self.name} must be at least 1 pixel wide and 2 pixels high")
+        if self.bits not in (8, 16):
+            raise ValueError(f"Workload {self.name} bit depth must be 8 or 16")
+
+    @property
+    def name(self):
+        return f"{self.width}x{self.height}x{self.bits}"
+
+
+def workloads(widths=DEFAULT_WIDTHS, heights=DEFAULT_HEIGHTS, bit_depths=DEFAULT_BIT_DEPTHS):
+    """Every combination of the given widths, heights and bit depths, smallest first."""
+    return sorted(
+        (Workload(width, height, bits) for width in widths for height in heights for bits in bit_depths),
+        key=lambda workload: (workload.width * workload.height * workload.bits, workload.name),
+    )
+
+
+def synthetic_image(workload: Workload, seed=0) -> Image.Image:
+    """A grayscale image of horizontal layers, like a seismic section, with added noise."""
+    rng = np.random.default_rng(seed)
+    maximum = (1 << workload.bits) - 1
+    depths = np.arange(workload.height)[:, np.newaxis]
+    columns = np.arange(workload.width)[np.newaxis, :]
+    layers = np.sin((depths + 8 * np.sin(columns / 50)) / 4)
+    noise = rng.normal(scale=0.1, size=(workload.height, workload.width))
+    pixels = np.clip((layers + noise + 1) / 2, 0, 1) * maximum
+    dtype = np.uint16 if workload.bits == 16 else np.uint8
+    return Image.fromarray(pixels.astype(dtype))
+
+
+def synthetic_config(workload: Workload):
+    """A configuration for a synthetic image, with traces one metre apart and one sample per metre."""
+    return {
+        "position": {
+            "left": {"x": 500000, "y": 6000000},
+            "right": {"x": 500000 + workload.width, "y": 6000000},
+            "depth": {"top": 0, "bottom": workload.height - 1},
+        },
+        "coordinate-reference-system": {
+            "map-projection": "WGS-84 UTM",
+            "zone-id": 32,
+            "horizontal-units": "m",
+            "vertical-units": "m",
+        },
+        "segy": {
+            "trace-position": {
+                "use-source-coord-fields": True,
+                "use-group-coord-fields": True,
+                "use-cdp-coord-fields": True,
+            },
+            "trace-number": {
+                "use-trace-number-field": True,
+                "use-crossline-number-field": True,
+            },
+            "base-trace-number": 1,
+        },
+    }
+
+
+def generate(dirpath: Path, workload: Workload) -> Path:
+    """Save the synthetic image and configuration for a workload.
+
+    Args:
+        dirpath: The directory in which to save the files.
+        workload: The workload to generate.
+
+    Returns:
+        The path to the image file. The configuration file has the same name, with the .toml
+        extension, so the image can also be converted with the convert command.
+    """
+    image_filepath = Path(dirpath) / f"synthetic_{workload.name}.tif"
+    synthetic_image(workload).save(image_filepath)
+    image_filepath.with_suffix(".toml").write_text(toml.dumps(synthetic_config(workload)))
+    return image_filepath
+
+
+def run(workloads, *, repeat=DEFAULT_REPEAT, engine=DEFAULT_ENGINE, dirpath=None, isolate=True):
+    """Benchmark the conversion of a series of workloads.
+
+    Args:
+        workloads: An iterable series of Workloads.
+        repeat: The number of times each stage is run. The fastest run is reported.
+        engine: The name of the SEG-Y writer used in the write stage; one of the keys of
+            img2segy.api.WRITERS.
+        dirpath: The directory in which the synthetic files are generated and the SEG-Y files
+            written. If None, a temporary directory is used and removed afterwards.
+        isolate: If True, each workload is run in a fresh process so that its peak resident
+            set size is not masked by that of an earlier, larger workload.
+
+    Returns:
+        A JSON-serializable dictionary describing the environment, and the timings of each
+        stage of each workload.
+    """
+    with tempfile.TemporaryDirectory() as temp_dirpath:
+        dirpath = Path(dirpath or temp_dirpath)
+        results = []
+        for workload in workloads:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(run_workload, workload, repeat, engine, dirpath).result()
+            else:
+                result = run_workload(workload, repeat, engine, dirpath)
+            results.append(result)
+
+    return {
+        "img2segy_version": __version__,
+        "python_version": platform.python_version(),
+        "numpy_version": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "engine": engine,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def run_workload(workload: Workload, repeat, engine, dirpath: Path):
+    """Benchmark the conversion of one workload.
+
+    Returns:
+        A dictionary containing the workload, the size of the SEG-Y output, the timings of
+        each stage, and the peak resident set size of the process.
+    """
+    write_segy = WRITERS[engine]
+    image_filepath = generate(dirpath, workload)
+    segy_filepath = image_filepath.with_suffix(".segy")
+    config = toml.load(image_filepath.with_suffix(".toml"))
+
+    def construct():
+        image = Image.open(image_filepath)
+        return ImageDataset(image, Geometry.from_config(config), TraceHeaderMapper.from_config(config))
+
+    dataset = construct()
+    num_traces = dataset.num_traces()
+    image = Image.open(image_filepath)
+    image.load()
+    sample_encoder = SampleEncoder.from_config(config)
+
+    def write():
+        with open(segy_filepath, "w+b") as segy_file:
+            write_segy(segy_file, dataset)
+
+    stages = {
+        "construct": construct,
+        "headers": lambda: writer.trace_header_array(dataset, 0, num_traces, TraceHeaderRev1),
+        "encode": lambda: sample_encoder.encode(image),
+        "write": write,
+    }
+    seconds = {name: _fastest(stage, repeat) for name, stage in stages.items()}
+    segy_num_bytes = segy_filepath.stat().st_size
+    segy_filepath.unlink()
+
+    return {
+        "workload": {"name": workload.name, **asdict(workload)},
+        "num_traces": num_traces,
+        "segy_num_bytes": segy_num_bytes,
+        "stages": {
+            name: {
+                "seconds": stage_seconds,
+                "traces_per_second": num_traces / stage_seconds,
+                "megabytes_per_second": segy_num_bytes / BYTES_PER_MEGABYTE / stage_seconds,
+            }
+            for name, stage_seconds in seconds.items()
+        },
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def compare(baseline, results, tolerance=DEFAULT_TOLERANCE):
+    """Find the stages which are slower than in a baseline.
+
+    Args:
+        baseline: Benchmark results, as returned by run(), from an earlier release.
+        results: Benchmark results, as returned by run().
+        tolerance: The proportion by which a stage may be slower than the baseline before it
+            is considered to have regressed.
+
+    Returns:
+        A list of (workload name, stage name, baseline seconds, seconds) tuples, one for each
+        stage of each workload common to both which has regressed.
+    """
+    baseline_stages = {
+        result["workload"]["name"]: result["stages"] for result in baseline["results"]
+    }
+    regressions = []
+    for result in results["results"]:
+        name = result["workload"]["name"]
+        for stage, timing in result["stages"].items():
+            try:
+                baseline_seconds = baseline_stages[name][stage]["seconds"]
+            except KeyError:
+                continue
+            if timing["seconds"] > baseline_seconds * (1 + tolerance):
+                regressions.append((name, stage, baseline_seconds, timing["seconds"]))
+    return regressions
+
+
+def _fastest(stage, repeat):
+    """The shortest wall-clock time in seconds of repeated calls to stage."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        stage()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,95 @@
+"""Skipping conversions whose output is already up to date.
+
+Beside each SEG-Y file a small JSON manifest records a digest of everything the output was
+derived from: the bytes of the image, the parsed configuration, and the version of img2segy.
+A conversion can be skipped if the digest of its inputs matches that recorded in the manifest
+and the SEG-Y file is still as it was written.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from img2segy.version import __version__
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = ".img2segy.json"
+
+READ_CHUNK_NUM_BYTES = 1024 * 1024
+
+
+def manifest_filepath(segy_filepath: Path) -> Path:
+    """The path of the manifest which accompanies a SEG-Y file."""
+    segy_filepath = Path(segy_filepath)
+    return segy_filepath.with_name(segy_filepath.name + MANIFEST_SUFFIX)
+
+
+def source_digest(image_filepath: Path, config) -> str:
+    """A digest of the inputs to a conversion.
+
+    Args:
+        image_filepath: The path to the image file, the whole content of which is digested.
+        config: The parsed configuration, as a dictionary.
+
+    Returns:
+        A hexadecimal SHA-256 digest of the image, the configuration and the img2segy version.
+    """
+    digest = hashlib.sha256()
+    digest.update(__version__.encode("ascii"))
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+    with open(image_filepath, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(READ_CHUNK_NUM_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_up_to_date(segy_filepath: Path, digest: str) -> bool:
+    """Determine whether a SEG-Y file was produced from inputs with the given digest.
+
+    Args:
+        segy_filepath: The path to the SEG-Y file.
+        digest: The digest of the inputs, as returned by source_digest().
+
+    Returns:
+        True if the SEG-Y file exists, has not changed size since it was written, and its
+        manifest records the same digest; otherwise False.
+    """
+    segy_filepath = Path(segy_filepath)
+    try:
+        manifest = json.loads(manifest_filepath(segy_filepath).read_text())
+        return (
+            manifest["digest"] == digest
+            and manifest["segy_size"] == segy_filepath.stat().st_size
+        )
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.debug("%s is not up to date: %s", segy_filepath, e)
+        return False
+
+
+def invalidate(segy_filepath: Path):
+    """Remove the manifest for a SEG-Y file, if there is one."""
+    try:
+        manifest_filepath(segy_filepath).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def record(segy_filepath: Path, digest: str, image_filepath: Path, config_filepath: Path):
+    """Write the manifest for a newly written SEG-Y file.
+
+    Args:
+        segy_filepath: The path to the SEG-Y file.
+        digest: The digest of the inputs, as returned by source_digest().
+        image_filepath: The path to the image file, recorded for information only.
+        config_filepath: The path to the configuration file, recorded for information only.
+    """
+    segy_filepath = Path(segy_filepath)
+    manifest = {
+        "digest": digest,
+        "segy_size": segy_filepath.stat().st_size,
+        "image": str(image_filepath),
+        "config": str(config_filepath),
+        "img2segy_version": __version__,
+    }
+    manifest_filepath(segy_filepath).write_text(json.dumps(manifest, indent=2))
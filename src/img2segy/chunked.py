@@ -0,0 +1,167 @@
+"""Writing datasets to a chunked, compressed array container in the Zarr (version 2) format.
+
+Rather than a single SEG-Y file, the dataset is written as a directory containing two arrays:
+"headers", a one-dimensional structured array of trace headers with the same binary layout as
+in SEG-Y, and "samples", a two-dimensional array with one row per trace. Both are divided into
+chunks of whole traces, each of which is compressed independently, in parallel, and stored in
+its own file. The reel headers are stored as attributes of the containing group::
+
+    my_cross_section.zarr/
+        .zgroup
+        .zattrs          textual and binary reel headers
+        headers/
+            .zarray
+            0, 1, 2, ...
+        samples/
+            .zarray
+            0.0, 1.0, 2.0, ...
+
+The container can be read with the zarr package, or with nothing more than json, zlib and NumPy.
+"""
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from segpy.binary_reel_header import BinaryReelHeader
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy import writer
+from img2segy.compression import DEFAULT_LEVELS, compressor
+from img2segy.version import __version__
+
+ZARR_FORMAT = 2
+
+# The compression codecs which may be used, by their names in Zarr metadata.
+CODECS = ("zlib", "zstd")
+
+DEFAULT_CODEC = "zlib"
+
+
+def write_zarr(
+        dirpath,
+        dataset,
+        *,
+        codec=DEFAULT_CODEC,
+        level=None,
+        workers=1,
+        trace_header_format=TraceHeaderRev1,
+        block_num_bytes=writer.DEFAULT_BLOCK_NUM_BYTES,
+):
+    """Write a dataset with fixed-length traces to a Zarr container.
+
+    The trace headers and samples are generated in blocks, exactly as they would be for a SEG-Y
+    file, and each block is one chunk of each array. The chunks are compressed and written by
+    a pool of threads, with a bounded number in flight at once.
+
+    Args:
+        dirpath: The path to the directory which will contain the arrays. It is created if it
+            does not exist.
+        dataset: An object implementing the interface of segpy.dataset.Dataset, such as an
+            ImageDataset.
+        codec: The compression codec: "zlib" or "zstd".
+        level: The compression level, or None for the default level of the codec.
+        workers: The number of threads which compress and write chunks concurrently.
+        trace_header_format: The class which defines the layout of the trace header.
+        block_num_bytes: The approximate number of bytes of trace data in each chunk. Ignored
+            if the dataset has a strip_width attribute which is not None, in which case each
+            chunk contains one strip of traces.
+
+    Raises:
+        ValueError: If the codec is unknown or unavailable, a trace header value is out of
+            range for its field, or the data sample format is not supported.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}. Choose from {', '.join(CODECS)}")
+    compress = compressor(codec, level)
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    dirpath = Path(dirpath)
+
+    binary_reel_header = dataset.binary_reel_header
+    num_samples = binary_reel_header.num_samples
+    num_traces = dataset.num_traces()
+    trace_dtype = writer.trace_dtype(num_samples, dataset.data_sample_format, trace_header_format)
+    header_dtype = trace_dtype["header"]
+    sample_dtype = trace_dtype["samples"].base
+    blocks = list(writer.trace_blocks(dataset, 0, num_traces, trace_dtype.itemsize, block_num_bytes))
+    chunk_num_traces = max(1, max((stop - start for start, stop in blocks), default=1))
+
+    dirpath.mkdir(parents=True, exist_ok=True)
+    _write_json(dirpath / ".zgroup", {"zarr_format": ZARR_FORMAT})
+    _write_json(dirpath / ".zattrs", {
+        "textual_reel_header": list(dataset.textual_reel_header),
+        "binary_reel_header": {
+            name: int(getattr(binary_reel_header, name))
+            for name in BinaryReelHeader.ordered_field_names()
+        },
+        "img2segy_version": __version__,
+    })
+    compressor_metadata = {"id": codec, "level": level}
+    headers_dirpath = _create_array(
+        dirpath / "headers", (num_traces,), (chunk_num_traces,), header_dtype, compressor_metadata
+    )
+    samples_dirpath = _create_array(
+        dirpath / "samples",
+        (num_traces, num_samples),
+        (chunk_num_traces, num_samples),
+        sample_dtype,
+        compressor_metadata,
+    )
+
+    def store(filepath, chunk):
+        filepath.write_bytes(compress(chunk))
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk_index, (start, stop) in enumerate(blocks):
+            # Chunks at the end of an array are stored at full size
+            headers = np.zeros(chunk_num_traces, dtype=header_dtype)
+            headers[:stop - start] = writer.trace_header_array(dataset, start, stop, trace_header_format)
+            samples = np.zeros((chunk_num_traces, num_samples), dtype=sample_dtype)
+            samples[:stop - start] = writer.trace_samples_array(dataset, start, stop)
+            pending.append(executor.submit(store, headers_dirpath / f"{chunk_index}", headers))
+            pending.append(executor.submit(store, samples_dirpath / f"{chunk_index}.0", samples))
+            while len(pending) > 2 * workers:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+
+
+def zarr_dtype(dtype):
+    """The description of a NumPy dtype in Zarr metadata.
+
+    Structured dtypes are described as a list of [name, type] pairs, with the gaps between
+    fields described as explicit padding fields so that the layout is preserved.
+    """
+    if dtype.names is None:
+        return dtype.str
+    fields = []
+    offset = 0
+    for name, (field_dtype, field_offset) in sorted(dtype.fields.items(), key=lambda item: item[1][1]):
+        if field_offset > offset:
+            fields.append([f"_padding_{offset}", f"|V{field_offset - offset}"])
+        fields.append([name, field_dtype.str])
+        offset = field_offset + field_dtype.itemsize
+    if dtype.itemsize > offset:
+        fields.append([f"_padding_{offset}", f"|V{dtype.itemsize - offset}"])
+    return fields
+
+
+def _create_array(dirpath, shape, chunks, dtype, compressor_metadata):
+    dirpath.mkdir(exist_ok=True)
+    _write_json(dirpath / ".zarray", {
+        "zarr_format": ZARR_FORMAT,
+        "shape": list(shape),
+        "chunks": list(chunks),
+        "dtype": zarr_dtype(dtype),
+        "compressor": compressor_metadata,
+        "fill_value": None,
+        "order": "C",
+        "filters": None,
+    })
+    return dirpath
+
+
+def _write_json(filepath, data):
+    filepath.write_text(json.dumps(data, indent=2))
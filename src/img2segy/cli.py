@@ -1,3 +1,4 @@
+import json
 import logging
 import sys
 
@@ -5,10 +6,14 @@ import click
 from click import Path
 from exit_codes import ExitCode
 
-from img2segy import api
-from img2segy.api import ConfigurationError
+from img2segy import defaults
+from img2segy.profiling import Profile
 from .version import __version__
 
+# Only lightweight modules are imported above, so that the command line interface starts
+# quickly. The modules implementing each command, which import NumPy, Pillow and segpy, are
+# imported by the command.
+
 log_levels = tuple(logging._levelToName.values())
 
 
@@ -26,18 +31,550 @@ def cli(verbosity):
 
 
 @cli.command(name="convert")
-@click.argument("image", type=click.Path(exists=True))
+@click.argument("image", type=click.Path(exists=True, allow_dash=True))
 @click.option("--config", type=click.Path(exists=True), help="Input configuration TOML file")
-@click.option("--segy", type=click.Path(writable=True), help="Output SEG-Y file")
-@click.option("--force", is_flag=True)
-def convert(image: Path, config, segy, force):
+@click.option(
+    "--segy",
+    type=click.Path(writable=True, allow_dash=True),
+    help="Output SEG-Y file, which is compressed if it ends .gz or .zst, or a Zarr container "
+         "if it ends .zarr, or - to write to standard output",
+)
+@click.option("--force", is_flag=True, help="Convert even if the SEG-Y file is up to date.")
+@click.option(
+    "--engine",
+    default=defaults.DEFAULT_ENGINE,
+    type=click.Choice(defaults.ENGINES, case_sensitive=True),
+    help="The SEG-Y writer implementation to use.",
+)
+@click.option(
+    "--strip-width",
+    type=click.IntRange(min=1),
+    help="Decode and write the image in vertical strips of this many columns to bound memory use.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="The number of threads across which the traces of the image are sharded.",
+)
+@click.option(
+    "--profile",
+    "show_profile",
+    is_flag=True,
+    help="Report the time and memory used by each stage of the conversion.",
+)
+@click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Write the time and memory used by each stage of the conversion as JSON to this file, "
+         "or - for standard output.",
+)
+def convert(
+        image: Path, config, segy, force, engine, strip_width, workers, show_profile, stats_json
+):
+    """Convert an image to SEG-Y.
+
+    If IMAGE is - the image is read from standard input, in which case --config is required,
+    and the SEG-Y data are written to standard output unless --segy is supplied.
+    """
+    from img2segy import api
+
+    if image == "-":
+        if config is None:
+            raise click.UsageError(
+                "--config is required when the image is read from standard input"
+            )
+        if strip_width is not None:
+            raise click.UsageError(
+                "--strip-width cannot be used when the image is read from standard input"
+            )
+        segy = segy or "-"
+    if segy == "-":
+        if stats_json == "-":
+            raise click.UsageError(
+                "--segy and --stats-json cannot both be written to standard output"
+            )
+        if engine != "native" or workers > 1:
+            raise click.UsageError("--segy - requires the native engine and a single worker")
+        segy = click.open_file("-", "wb")
+    profile = Profile() if (show_profile or stats_json) else None
     try:
-        api.convert(image, segy, config, force=force)
-    except ConfigurationError as e:
+        if image == "-":
+            with click.open_file("-", "rb") as image_file:
+                image_data = image_file.read()
+            api.convert_image(
+                image_data,
+                api.load_config(config),
+                segy,
+                engine=engine,
+                workers=workers,
+                profile=profile,
+            )
+        else:
+            api.convert(
+                image,
+                segy,
+                config,
+                force=force,
+                engine=engine,
+                strip_width=strip_width,
+                workers=workers,
+                profile=profile,
+            )
+    except api.CONFIGURATION_ERRORS as e:
         click.secho(str(e), fg="red")
         sys.exit(ExitCode.CONFIG)
     except Exception as e:
         raise
         click.secho(str(e), fg="red")
         sys.exit(ExitCode.DATA_ERR)
+    if profile is not None:
+        stats = profile.as_dict()
+        if show_profile:
+            _echo_profile(stats)
+        if stats_json:
+            _write_json(stats_json, stats)
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(name="batch")
+@click.argument("sources", nargs=-1)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="A TOML manifest listing conversions",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="The number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option("--force", is_flag=True, help="Convert even if the SEG-Y file is up to date.")
+@click.option(
+    "--engine",
+    default=defaults.DEFAULT_ENGINE,
+    type=click.Choice(defaults.ENGINES, case_sensitive=True),
+    help="The SEG-Y writer implementation to use.",
+)
+@click.option(
+    "--strip-width",
+    type=click.IntRange(min=1),
+    help="Decode and write each image in vertical strips of this many columns to bound memory use.",
+)
+@click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    help="Write the time and memory used by each stage of each conversion as JSON to this file, "
+         "or - for standard output.",
+)
+def batch(sources, manifest, workers, force, engine, strip_width, stats_json):
+    """Convert many images to SEG-Y.
+
+    SOURCES may be image files, directories containing images, or glob patterns. Each image is
+    paired with the TOML file of the same name, and converted to a SEG-Y file of the same name.
+    """
+    from img2segy import api
+
+    try:
+        conversions = list(api.find_conversions(sources))
+        if manifest:
+            conversions.extend(api.read_manifest(manifest))
+    except api.ConfigurationError as e:
+        click.secho(str(e), fg="red")
+        sys.exit(ExitCode.CONFIG)
+
+    results = api.convert_many(
+        conversions,
+        workers=workers,
+        force=force,
+        engine=engine,
+        strip_width=strip_width,
+        profile=bool(stats_json),
+    )
+    num_failed = 0
+    conversion_stats = []
+    for result in results:
+        image_filepath = result.conversion.image_filepath
+        if result.up_to_date:
+            click.echo(f"{click.style('SKIP', fg='blue')}   {image_filepath} is up to date")
+        elif result.succeeded:
+            click.echo(f"{click.style('OK', fg='green')}     {image_filepath}")
+        else:
+            num_failed += 1
+            click.echo(f"{click.style('FAILED', fg='red')} {image_filepath}: {result.error}")
+        if result.stats is not None:
+            conversion_stats.append({"image": str(image_filepath), **result.stats})
+
+    click.echo(f"{len(conversions) - num_failed} succeeded, {num_failed} failed")
+    if stats_json:
+        _write_json(stats_json, conversion_stats)
+    sys.exit(ExitCode.DATA_ERR if num_failed else ExitCode.OK)
+
+
+@cli.command(name="verify")
+@click.argument("sources", nargs=-1)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="A TOML manifest listing conversions",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="The number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--strip-width",
+    type=click.IntRange(min=1),
+    help="Decode each image in vertical strips of this many columns to bound memory use.",
+)
+def verify(sources, manifest, workers, strip_width):
+    """Verify that SEG-Y files are the conversions of their images.
+
+    SOURCES and --manifest identify the conversions as for the batch command. The trace count,
+    headers and samples of each SEG-Y file are compared with those generated from its image and
+    configuration, and any mismatches are reported.
+    """
+    from img2segy import api
+
+    try:
+        conversions = list(api.find_conversions(sources))
+        if manifest:
+            conversions.extend(api.read_manifest(manifest))
+    except api.ConfigurationError as e:
+        click.secho(str(e), fg="red")
+        sys.exit(ExitCode.CONFIG)
+
+    num_failed = 0
+    for result in api.verify_many(conversions, workers=workers, strip_width=strip_width):
+        image_filepath = result.conversion.image_filepath
+        if result.succeeded:
+            click.echo(f"{click.style('OK', fg='green')}       {image_filepath}")
+            continue
+        num_failed += 1
+        if result.error is not None:
+            click.echo(f"{click.style('FAILED', fg='red')}   {image_filepath}: {result.error}")
+        else:
+            click.echo(f"{click.style('MISMATCH', fg='red')} {image_filepath}")
+            for mismatch in result.mismatches:
+                click.echo(f"         {mismatch}")
+
+    click.echo(f"{len(conversions) - num_failed} verified, {num_failed} failed")
+    sys.exit(ExitCode.DATA_ERR if num_failed else ExitCode.OK)
+
+
+@cli.command(name="volume")
+@click.argument("images", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--segy",
+    required=True,
+    type=click.Path(writable=True, allow_dash=True),
+    help="Output SEG-Y file, which is compressed if it ends .gz or .zst, or a Zarr container "
+         "if it ends .zarr, or - to write to standard output",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True),
+    help="Input configuration TOML file, used for every image in place of their own.",
+)
+@click.option(
+    "--engine",
+    default=defaults.DEFAULT_ENGINE,
+    type=click.Choice(defaults.ENGINES, case_sensitive=True),
+    help="The SEG-Y writer implementation to use.",
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="The number of threads across which the slices of the volume are sharded.",
+)
+@click.option(
+    "--profile",
+    "show_profile",
+    is_flag=True,
+    help="Report the time and memory used by each stage of the conversion.",
+)
+def volume(images, segy, config, engine, workers, show_profile):
+    """Assemble many images into a single three-dimensional SEG-Y volume.
+
+    Each of the IMAGES, and each page of a multi-page TIFF file, is an inline of the volume, in
+    the order given. Each image is paired with the TOML file of the same name, which gives its
+    position, unless --config is supplied.
+    """
+    from img2segy import api
+
+    if segy == "-":
+        if engine != "native" or workers > 1:
+            raise click.UsageError("--segy - requires the native engine and a single worker")
+        segy = click.open_file("-", "wb")
+    profile = Profile() if show_profile else None
+    try:
+        api.convert_volume(
+            images,
+            segy,
+            config and [config] * len(images),
+            engine=engine,
+            workers=workers,
+            profile=profile,
+        )
+    except api.CONFIGURATION_ERRORS as e:
+        click.secho(str(e), fg="red")
+        sys.exit(ExitCode.CONFIG)
+    except ValueError as e:
+        click.secho(str(e), fg="red")
+        sys.exit(ExitCode.DATA_ERR)
+    if profile is not None:
+        _echo_profile(profile.as_dict())
     sys.exit(ExitCode.OK)
+
+
+@cli.command(name="render")
+@click.argument("segy", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--image",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Output image file, in a format determined by its extension. Defaults to the SEG-Y "
+         "file name with .png appended.",
+)
+@click.option(
+    "--trace-step",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Render every Nth trace.",
+)
+@click.option(
+    "--sample-step",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Render every Nth sample of each trace.",
+)
+@click.option(
+    "--bits",
+    default="8",
+    show_default=True,
+    type=click.Choice(("8", "16")),
+    help="The bit depth of the image.",
+)
+@click.option(
+    "--amplitude-scale",
+    default=1.0,
+    show_default=True,
+    type=float,
+    help="The factor by which floating point samples were multiplied when they were encoded.",
+)
+def render(segy, image, trace_step, sample_step, bits, amplitude_scale):
+    """Render a SEG-Y file as a grayscale image, one column of pixels per trace.
+
+    The SEG-Y file must have fixed-length traces. Files converted from 8-bit images with the
+    default settings are rendered as the grayscale image from which they were converted.
+    """
+    from img2segy import api
+
+    try:
+        image_filepath = api.render(
+            segy,
+            image,
+            trace_step=trace_step,
+            sample_step=sample_step,
+            bits=int(bits),
+            amplitude_scale=amplitude_scale,
+        )
+    except ValueError as e:
+        click.secho(str(e), fg="red")
+        sys.exit(ExitCode.DATA_ERR)
+    click.echo(f"Rendered {segy} to {image_filepath}", err=True)
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(name="bench")
+@click.option(
+    "--width",
+    "widths",
+    multiple=True,
+    default=defaults.DEFAULT_BENCHMARK_WIDTHS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="The width of the synthetic images in pixels. May be repeated.",
+)
+@click.option(
+    "--height",
+    "heights",
+    multiple=True,
+    default=defaults.DEFAULT_BENCHMARK_HEIGHTS,
+    show_default=True,
+    type=click.IntRange(min=2),
+    help="The height of the synthetic images in pixels. May be repeated.",
+)
+@click.option(
+    "--bits",
+    "bit_depths",
+    multiple=True,
+    default=tuple(map(str, defaults.DEFAULT_BENCHMARK_BIT_DEPTHS)),
+    show_default=True,
+    type=click.Choice(("8", "16")),
+    help="The bit depth of the synthetic images. May be repeated.",
+)
+@click.option(
+    "--repeat",
+    default=defaults.DEFAULT_BENCHMARK_REPEAT,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="The number of times each stage is run. The fastest run is reported.",
+)
+@click.option(
+    "--engine",
+    default=defaults.DEFAULT_ENGINE,
+    type=click.Choice(defaults.ENGINES, case_sensitive=True),
+    help="The SEG-Y writer implementation to benchmark.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the results as JSON to this file rather than to standard output.",
+)
+@click.option(
+    "--keep",
+    type=click.Path(file_okay=False, exists=True, writable=True),
+    help="Generate the synthetic images and configurations in this directory, and keep them.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, exists=True),
+    help="JSON results from an earlier run, against which to check for regressions.",
+)
+@click.option(
+    "--tolerance",
+    default=defaults.DEFAULT_BENCHMARK_TOLERANCE,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="The proportion by which a stage may be slower than the baseline.",
+)
+def bench(widths, heights, bit_depths, repeat, engine, output, keep, baseline, tolerance):
+    """Measure conversion throughput on synthetic images.
+
+    The construction of the dataset, the generation of trace headers, the encoding of samples
+    and the writing of the SEG-Y file are timed separately for every combination of width,
+    height and bit depth. The results, including traces/s, MB/s and peak RSS, are reported as JSON.
+    """
+    from img2segy import benchmark
+
+    workloads = benchmark.workloads(widths, heights, tuple(map(int, bit_depths)))
+    results = benchmark.run(workloads, repeat=repeat, engine=engine, dirpath=keep)
+
+    for result in results["results"]:
+        timings = "  ".join(
+            f"{stage} {timing['traces_per_second']:,.0f} traces/s "
+            f"{timing['megabytes_per_second']:,.1f} MB/s"
+            for stage, timing in result["stages"].items()
+        )
+        click.echo(f"{result['workload']['name']:>16}  {timings}", err=True)
+
+    _write_json(output or "-", results)
+
+    if baseline:
+        with open(baseline) as baseline_file:
+            regressions = benchmark.compare(json.load(baseline_file), results, tolerance)
+        for name, stage, baseline_seconds, seconds in regressions:
+            click.secho(
+                f"REGRESSION {name} {stage}: {seconds:.4f}s against {baseline_seconds:.4f}s",
+                fg="red",
+                err=True,
+            )
+        if regressions:
+            sys.exit(ExitCode.SOFTWARE)
+    sys.exit(ExitCode.OK)
+
+
+@cli.command(name="serve")
+@click.option(
+    "--host",
+    default=defaults.DEFAULT_SERVER_HOST,
+    show_default=True,
+    help="The host name or address on which to listen.",
+)
+@click.option(
+    "--port",
+    default=defaults.DEFAULT_SERVER_PORT,
+    show_default=True,
+    type=click.IntRange(min=0, max=65535),
+    help="The TCP port on which to listen.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Listen on a Unix domain socket at this path rather than on TCP.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="The number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--queue-size",
+    default=defaults.DEFAULT_SERVER_QUEUE_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="The number of jobs which may wait for a worker before submissions are refused.",
+)
+@click.option(
+    "--engine",
+    default=defaults.DEFAULT_ENGINE,
+    type=click.Choice(defaults.ENGINES, case_sensitive=True),
+    help="The SEG-Y writer implementation to use.",
+)
+@click.option(
+    "--strip-width",
+    type=click.IntRange(min=1),
+    help="Decode and write each image in vertical strips of this many columns to bound memory use.",
+)
+def serve(host, port, socket_path, workers, queue_size, engine, strip_width):
+    """Serve conversions over HTTP from a pool of warm worker processes.
+
+    Images on the server's filesystem can be queued by POSTing a JSON job to /jobs, and their
+    progress followed at /jobs/<id>. Alternatively, POST an image and its configuration as
+    multipart/form-data to /convert to receive the SEG-Y file in response.
+    """
+    import asyncio
+
+    from img2segy.server import ConversionServer
+
+    async def run():
+        async with ConversionServer(
+            workers=workers,
+            queue_size=queue_size,
+            engine=engine,
+            strip_width=strip_width,
+        ) as server:
+            await server.start(host=host, port=port, socket_path=socket_path)
+            for address in server.addresses:
+                click.echo(f"Serving on {address}", err=True)
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    sys.exit(ExitCode.OK)
+
+
+def _echo_profile(stats):
+    click.echo(f"{'stage':<12}{'wall s':>10}{'cpu s':>10}{'peak MiB':>10}{'traces/s':>14}", err=True)
+    for name, stage in [*stats["stages"].items(), ("total", stats["total"])]:
+        peak = stage["peak_allocated_bytes"]
+        rate = stage["traces_per_second"]
+        click.echo(
+            f"{name:<12}{stage['wall_seconds']:>10.3f}{stage['cpu_seconds']:>10.3f}"
+            f"{'-' if peak is None else f'{peak / 2**20:.1f}':>10}"
+            f"{'-' if rate is None else f'{rate:,.0f}':>14}",
+            err=True,
+        )
+
+
+def _write_json(filepath, data):
+    with click.open_file(filepath, "w") as json_file:
+        json.dump(data, json_file, indent=2)
+        json_file.write("\n")
@@ -0,0 +1,141 @@
+"""Compression of output as it is written, in parallel across chunks.
+
+The data written are divided into chunks of a fixed size, each of which is compressed
+independently by a pool of threads and written in order. Each chunk is a complete gzip member
+or zstd frame, and a sequence of them is a valid gzip or zstd stream, which decompresses to the
+concatenation of the chunks. Since the chunk boundaries do not depend on the number of threads,
+the output is the same however many are used.
+
+zstd compression requires the optional zstandard package.
+"""
+import gzip
+import io
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# The number of bytes of uncompressed data in each independently compressed chunk.
+DEFAULT_CHUNK_NUM_BYTES = 4 * 1024 * 1024
+
+# Compression codecs, keyed by the file extensions which select them.
+SUFFIXES = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+
+DEFAULT_LEVELS = {
+    "gzip": 6,
+    "zlib": 6,
+    "zstd": 3,
+}
+
+
+def codec_for(filepath):
+    """The codec selected by the extension of a file path, or None if it is not compressed."""
+    return SUFFIXES.get(Path(filepath).suffix.lower())
+
+
+def compressor(codec, level=None):
+    """A function which compresses bytes with a codec.
+
+    Args:
+        codec: "gzip" to produce a gzip member, "zlib" to produce a zlib stream, or "zstd" to
+            produce a zstd frame.
+        level: The compression level, or None for the default level of the codec.
+
+    Returns:
+        A unary callable which accepts a bytes-like object and returns bytes.
+
+    Raises:
+        ValueError: If the codec is unknown, or is zstd and the zstandard package is not
+            installed.
+    """
+    if codec not in DEFAULT_LEVELS:
+        raise ValueError(f"Unknown codec {codec!r}. Choose from {', '.join(DEFAULT_LEVELS)}")
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == "gzip":
+        # A fixed modification time makes the output reproducible
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, level)
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "zstd compression requires the zstandard package: pip install img2segy[zstd]"
+        ) from None
+    # Compressors are not thread-safe, so each chunk has its own
+    return lambda data: zstandard.ZstdCompressor(level=level, write_content_size=True).compress(data)
+
+
+class CompressedWriter(io.RawIOBase):
+    """A binary file-like object which compresses the data written to it into another.
+
+    Data are accumulated into chunks, which are compressed concurrently by a pool of threads
+    and written to the underlying file in order. A bounded number of chunks are in flight at
+    once, so memory use does not depend on the amount of data written. The underlying file
+    need not be seekable. Closing the writer flushes the remaining data, but does not close
+    the underlying file.
+    """
+
+    def __init__(self, fh, codec, *, level=None, workers=1, chunk_num_bytes=DEFAULT_CHUNK_NUM_BYTES):
+        """
+        Args:
+            fh: A file-like object open for binary write, to which the compressed data are
+                written.
+            codec: The name of the codec, as for compressor().
+            level: The compression level, or None for the default level of the codec.
+            workers: The number of threads which compress chunks concurrently.
+            chunk_num_bytes: The number of bytes of uncompressed data in each chunk.
+
+        Raises:
+            ValueError: As for compressor().
+        """
+        super().__init__()
+        self._fh = fh
+        self._compress = compressor(codec, level)
+        self._chunk_num_bytes = chunk_num_bytes
+        self._buffer = bytearray()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = deque()
+        self._max_pending = 2 * workers
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = memoryview(data).cast("B")
+        self._buffer += data
+        while len(self._buffer) >= self._chunk_num_bytes:
+            chunk = bytes(self._buffer[:self._chunk_num_bytes])
+            del self._buffer[:self._chunk_num_bytes]
+            self._submit(chunk)
+        return len(data)
+
+    def flush(self):
+        """Write all complete chunks compressed so far to the underlying file.
+
+        Data in an incomplete chunk remain buffered until more data are written, or the
+        writer is closed, so that the chunk boundaries do not depend on when flush is called.
+        """
+        while self._pending:
+            self._fh.write(self._pending.popleft().result())
+        self._fh.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            self.flush()
+        finally:
+            self._executor.shutdown()
+            super().close()
+
+    def _submit(self, chunk):
+        self._pending.append(self._executor.submit(self._compress, chunk))
+        while len(self._pending) > self._max_pending:
+            self._fh.write(self._pending.popleft().result())
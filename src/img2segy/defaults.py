@@ -0,0 +1,22 @@
+"""Default values shared by the command line interface and the modules which implement it.
+
+This module is imported whenever the command line interface starts, even just to print its help,
+so it must not import NumPy, Pillow, segpy or any other dependency which is slow to import.
+"""
+
+# The names of the SEG-Y writer implementations; the keys of img2segy.api.WRITERS.
+ENGINES = ("native", "mmap", "segpy")
+
+DEFAULT_ENGINE = "native"
+
+# The dimensions of the synthetic images used by the benchmark, and how it is run.
+DEFAULT_BENCHMARK_WIDTHS = (1000, 4000)
+DEFAULT_BENCHMARK_HEIGHTS = (500, 2000)
+DEFAULT_BENCHMARK_BIT_DEPTHS = (8, 16)
+DEFAULT_BENCHMARK_REPEAT = 3
+DEFAULT_BENCHMARK_TOLERANCE = 0.1
+
+# Where the conversion server listens, and the number of jobs which may wait for a worker.
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8470
+DEFAULT_SERVER_QUEUE_SIZE = 16
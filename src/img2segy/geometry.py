@@ -1,6 +1,8 @@
 from dataclasses import dataclass
+from typing import Optional
 
-from euclidian.cartesian2 import Point2, Segment2
+import numpy as np
+from euclidian.cartesian2 import Point2
 
 MICROSECONDS_PER_MILLISECOND = 1000
 
@@ -17,17 +19,60 @@ class CoordinateReferenceSystem:
     zone_id: str
 
 
+@dataclass(frozen=True)
+class Waypoint:
+    """An intermediate control point of the path along which an image lies.
+
+    Attributes:
+        xy: The position of the control point.
+        column: The column of pixels of the image which lies at the control point, or None if
+            the columns are spread evenly along the path.
+    """
+    xy: Point2
+    column: Optional[float] = None
+
+
 class Geometry:
+    """The position of an image in space.
+
+    The image lies along a horizontal path through two or more control points, from the left
+    edge of the image at the first point to the right edge at the last. Between the control
+    points the path is straight. Intermediate control points may be pinned to a column of pixels
+    of the image; the columns between pinned points are otherwise spread evenly along the path.
+    """
 
     @classmethod
     def from_config(cls, config):
         try:
             position = config["position"]
-            left = position["left"]
-            right = position["right"]
             depth = position["depth"]
             crs = config.get("coordinate-reference-system", {})
 
+            if "points" in position:
+                points = position["points"]
+                if len(points) < 2:
+                    raise ValueError(
+                        f"[position] points has {len(points)} entries; at least 2 are required"
+                    )
+                for point in (points[0], points[-1]):
+                    if "column" in point:
+                        raise ValueError(
+                            "[position] points: only intermediate points may be pinned to a column"
+                        )
+                left = points[0]
+                right = points[-1]
+                waypoints = [
+                    Waypoint(
+                        xy=Point2(float(point["x"]), float(point["y"])),
+                        column=None if point.get("column") is None else float(point["column"]),
+                    )
+                    for point in points[1:-1]
+                ]
+            else:
+                left = position["left"]
+                right = position["right"]
+                waypoints = []
+
             return cls(
                 left_xy=Point2(left["x"], float(left["y"])),
                 right_xy=Point2(float(right["x"]), float(right["y"])),
@@ -38,9 +83,10 @@ class Geometry:
                     horizontal_units=str(crs.get("horizontal-units", "")),
                     vertical_units=str(crs.get("vertical-units", "")),
                     zone_id=str(crs.get("zone-id", "")),
-                )
+                ),
+                waypoints=waypoints,
             )
-        except (KeyError, ValueError) as e:
+        except (KeyError, ValueError, TypeError) as e:
             raise ConfigurationError(str(e)) from e
 
 
@@ -50,23 +96,71 @@ class Geometry:
             right_xy: Point2,
             top_z: float,
             bottom_z: float,
-            coordinate_reference_system: CoordinateReferenceSystem
+            coordinate_reference_system: CoordinateReferenceSystem,
+            waypoints=(),
     ):
-        self._segment = Segment2(left_xy, right_xy)
+        """
+        Args:
+            left_xy: The position of the left edge of the image.
+            right_xy: The position of the right edge of the image.
+            top_z: The depth of the top edge of the image.
+            bottom_z: The depth of the bottom edge of the image.
+            coordinate_reference_system: The coordinate reference system of the positions.
+            waypoints: An optional sequence of Waypoints through which the path from left to
+                right passes, in order.
+
+        Raises:
+            ValueError: If the pinned columns of the waypoints are not strictly increasing.
+        """
+        self._left_xy = left_xy
+        self._right_xy = right_xy
+        self._waypoints = tuple(waypoints)
         self._top_z = top_z
         self._bottom_z = bottom_z
         self._coordinate_reference_system = coordinate_reference_system
 
+        xys = [left_xy, *(waypoint.xy for waypoint in self._waypoints), right_xy]
+        self._xs = np.array([xy[0] for xy in xys], dtype=float)
+        self._ys = np.array([xy[1] for xy in xys], dtype=float)
+        # The distance along the path to each control point
+        self._distances = np.concatenate(
+            ([0.0], np.cumsum(np.hypot(np.diff(self._xs), np.diff(self._ys))))
+        )
+
+        columns = [waypoint.column for waypoint in self._waypoints if waypoint.column is not None]
+        if any(column < 0 for column in columns) or any(a >= b for a, b in zip(columns, columns[1:])):
+            raise ValueError(
+                f"The waypoint columns {columns} are not non-negative and strictly increasing"
+            )
+
     def __repr__(self):
-        return f"{type(self).__name__}(start_xy={self._segment.source}, end_xy={self._segment.target}, top_z={self._top_z}, bottom_z={self._bottom_z})"
+        waypoints = f", waypoints={list(self._waypoints)}" if self._waypoints else ""
+        return (
+            f"{type(self).__name__}(start_xy={self._left_xy}, end_xy={self._right_xy}{waypoints}, "
+            f"top_z={self._top_z}, bottom_z={self._bottom_z})"
+        )
 
     @property
     def left_xy(self):
-        return self._segment.source
+        return self._left_xy
 
     @property
     def right_xy(self):
-        return self._segment.target
+        return self._right_xy
+
+    @property
+    def waypoints(self):
+        return self._waypoints
+
+    @property
+    def length(self):
+        """The horizontal distance from left to right along the path."""
+        return float(self._distances[-1])
+
+    @property
+    def max_abs_coordinate(self):
+        """The greatest absolute value of any x or y coordinate on the path."""
+        return float(max(np.abs(self._xs).max(), np.abs(self._ys).max()))
 
     @property
     def top_z(self):
@@ -76,15 +170,106 @@ class Geometry:
     def bottom_z(self):
         return self._bottom_z
 
-    def interpolate_xy(self, proportion):
-        """Interpolate between the start and end positions.
+    def translated(self, dx, dy):
+        """A Geometry of the same shape, with every control point displaced horizontally.
+
+        Args:
+            dx: The displacement in x.
+            dy: The displacement in y.
+        """
+        return type(self)(
+            left_xy=Point2(self._left_xy[0] + dx, self._left_xy[1] + dy),
+            right_xy=Point2(self._right_xy[0] + dx, self._right_xy[1] + dy),
+            top_z=self._top_z,
+            bottom_z=self._bottom_z,
+            coordinate_reference_system=self._coordinate_reference_system,
+            waypoints=[
+                Waypoint(Point2(waypoint.xy[0] + dx, waypoint.xy[1] + dy), waypoint.column)
+                for waypoint in self._waypoints
+            ],
+        )
+
+    def control_point_proportions(self, num_columns=None):
+        """The proportions of the width of the image at which the control points lie.
+
+        The left and right points are at zero and one, and pinned waypoints at their column
+        divided by the number of columns. Each run of unpinned waypoints is positioned
+        according to its distance along the path between the adjacent pinned points.
+
+        Args:
+            num_columns: The width of the image in pixels, required only if any waypoint is
+                pinned to a column.
+
+        Returns:
+            A non-decreasing array of proportions, one for each control point.
+
+        Raises:
+            ValueError: If a waypoint is pinned to a column and num_columns is not supplied, or
+                a pinned column lies beyond the right edge of the image.
+        """
+        proportions = np.full(len(self._xs), np.nan)
+        proportions[0] = 0.0
+        proportions[-1] = 1.0
+        for index, waypoint in enumerate(self._waypoints, start=1):
+            if waypoint.column is not None:
+                if num_columns is None:
+                    raise ValueError("The number of columns is required to position pinned waypoints")
+                if waypoint.column >= num_columns:
+                    raise ValueError(
+                        f"Waypoint column {waypoint.column} is beyond the right edge of the "
+                        f"image at column {num_columns}"
+                    )
+                proportions[index] = waypoint.column / num_columns
+
+        anchors = np.flatnonzero(~np.isnan(proportions))
+        for a, b in zip(anchors, anchors[1:]):
+            if b - a < 2:
+                continue
+            span = self._distances[b] - self._distances[a]
+            if span > 0:
+                fractions = (self._distances[a + 1:b] - self._distances[a]) / span
+            else:
+                fractions = np.arange(1, b - a) / (b - a)
+            proportions[a + 1:b] = proportions[a] + fractions * (proportions[b] - proportions[a])
+        return proportions
+
+    def interpolate_xy(self, proportion, num_columns=None):
+        """Interpolate along the path from the start to the end position.
 
         Args:
             proportion: A number between zero and one inclusive.
+            num_columns: The width of the image in pixels, required only if any waypoint is
+                pinned to a column.
+
+        Returns: A Point2 on the path between left and right.
+        """
+        xs, ys = self.interpolate_xy_array([proportion], num_columns)
+        return Point2(float(xs[0]), float(ys[0]))
+
+    def interpolate_xy_array(self, proportions, num_columns=None):
+        """Interpolate along the path from the start to the end position for many proportions.
+
+        The segment of the path containing each proportion is found by a binary search of the
+        proportions of the control points, and the position is interpolated linearly along it.
+
+        Args:
+            proportions: An array of numbers between zero and one inclusive.
+            num_columns: The width of the image in pixels, required only if any waypoint is
+                pinned to a column.
 
-        Returns: A Point2 on the line between left and right.
+        Returns: A pair of arrays containing the x and y coordinates respectively of points on
+            the path between left and right.
         """
-        return self._segment.lerp(proportion)
+        proportions = np.asarray(proportions, dtype=float)
+        knots = self.control_point_proportions(num_columns)
+        segments = np.clip(np.searchsorted(knots, proportions, side="right") - 1, 0, len(knots) - 2)
+        starts = knots[segments]
+        widths = knots[segments + 1] - starts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ts = np.where(widths > 0, (proportions - starts) / widths, 0.0)
+        xs = self._xs[segments] + ts * (self._xs[segments + 1] - self._xs[segments])
+        ys = self._ys[segments] + ts * (self._ys[segments + 1] - self._ys[segments])
+        return xs, ys
 
     def sample_interval_z(self, num_samples):
         """The sample interval of the data.
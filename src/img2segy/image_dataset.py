@@ -1,19 +1,24 @@
 from pathlib import Path
 
-from PIL import Image, ImageOps
+from PIL import Image
 import numpy as np
 import datetime
+import threading
 
 from euclidian.cartesian2 import Point2
 from segpy.binary_reel_header import BinaryReelHeader, TraceSorting, FixedLengthTraceFlag, \
     MeasurementSystem
 from segpy.dataset import Dataset
-from segpy.datatypes import DataSampleFormat, data_sample_format_size_in_bytes, data_sample_format_description
+from segpy.datatypes import data_sample_format_size_in_bytes, data_sample_format_description
 from segpy.revisions import SegYRevision
 from segpy.toolkit import format_standard_textual_header
 from segpy.trace_header import TraceHeaderRev1, CoordinateUnits
 
 from img2segy.geometry import Geometry, MICROSECONDS_PER_MILLISECOND
+from img2segy.profiling import NULL_PROFILE
+from img2segy.resampling import Resampling
+from img2segy.sample_encoder import SampleEncoder, bits_per_pixel, grayscale
+from img2segy.strips import ImageStrips
 from img2segy.trace_header_mapper import TraceHeaderMapper
 from img2segy.version import __version__
 
@@ -31,19 +36,76 @@ class ImageDataset(Dataset):
             image: Image,
             geometry: Geometry,
             trace_header_mapper: TraceHeaderMapper,
+            *,
+            strip_width: int = None,
+            resampling: Resampling = None,
+            sample_encoder: SampleEncoder = None,
+            xy_scalar: int = None,
+            profile=None,
     ):
-        self._image = image
+        """
+        Args:
+            image: The image to be converted.
+            geometry: The position of the image in space.
+            trace_header_mapper: Determines which trace header fields are populated.
+            strip_width: If provided, the image is decoded in vertical strips of this many
+                columns as the samples are needed, rather than all at once, bounding the memory
+                required. Samples are most efficiently requested in ascending order of trace.
+            resampling: If provided, the image is resampled to the trace spacing and sample
+                interval it specifies before conversion. The whole image must then be decoded,
+                regardless of strip_width.
+            sample_encoder: Determines how pixel values are encoded as samples. By default,
+                8-bit images are encoded as int8 samples and 16-bit images as int16 samples.
+            xy_scalar: The coordinate scalar with which positions are stored. By default it is
+                determined by the trace header mapper from the extent of the geometry.
+            profile: If provided, a Profile in which the resampling, sample encoding and trace
+                header stages of construction are recorded.
+        """
+        profile = profile or NULL_PROFILE
+        self._source_image = image
         self._geometry = geometry
-        # Convert the image to an 8-bit grayscale (uint8 0 to 255) then shift to (int8 -128 to 127)
-        self._array = (np.array(ImageOps.grayscale(image)) - 128).view(np.int8)
+        self._sample_encoder = sample_encoder or SampleEncoder()
+        if resampling is not None:
+            size = resampling.size(geometry, image.width, image.height)
+            if size != image.size:
+                with profile.stage("resample"):
+                    image = resampling.apply(grayscale(image), geometry)
+        self._image = image
+        if strip_width is None:
+            self._strips = None
+            with profile.stage("encode"):
+                self._samples = self._encode_samples(image)
+        else:
+            self._strips = ImageStrips(image, strip_width)
+            # Each thread retains the samples and pixels of the strip it most recently used
+            self._strip_cache = threading.local()
+            self._samples = None
+        # The grayscale pixels of the whole image, decoded only if they are requested
+        self._pixels = None
         self._trace_header_mapper = trace_header_mapper
-        # We need to check the geometry and the image up front to determine the
-        # xy_scalar value used to scale the coordinates
-        self._xy_scalar = 1.0
+        # The scalar is chosen once from the extent of the geometry, so that every coordinate
+        # of the image is stored with the same precision
+        self._xy_scalar = (
+            xy_scalar if xy_scalar is not None
+            else trace_header_mapper.xy_scalar(geometry.max_abs_coordinate)
+        )
+        # Trace header fields which are the same for every trace, and arrays of the values of
+        # the fields which vary from trace to trace, computed once for all traces.
+        self._trace_header_constants = dict(
+            sample_interval=self._sample_interval(),
+            coordinate_units=self._coordinate_units_code(),
+            xy_scalar=self._xy_scalar,
+        )
+        with profile.stage("headers"):
+            self._trace_header_table = self._make_trace_header_table()
 
     @property
     def textual_reel_header(self):
-        return format_standard_textual_header(
+        return format_standard_textual_header(**self._textual_header_fields())
+
+    def _textual_header_fields(self):
+        """The arguments to format_standard_textual_header() describing this dataset."""
+        return dict(
             revision=SegYRevision.REVISION_1,
             samples_per_trace=self._samples_per_trace(),
             sample_interval=self._sample_interval(),
@@ -55,8 +117,8 @@ class ImageDataset(Dataset):
             unassigned1=f"Converted from {self._image_filename()} by img2segy {__version__}",
             unassigned2=f"on {datetime.date.today().isoformat()}",
             unassigned3=f"img2segy <https://github.com/sixty-north/img2segy> by Sixty North AS",
-            unassigned4=f"Image size: {self._image.width}x{self._image.height}",
-            unassigned5=f"",
+            unassigned4=f"Image size: {self._source_image.width}x{self._source_image.height}",
+            unassigned5=self._resampled_description(),
             unassigned6=f"Coordinate reference system : {self._map_projection()} {self._zone_id()}",
             unassigned7=f"Horizontal (xy) units : {self._coordinate_units()}",
             unassigned8=f"Vertical (z/depth) units : {self._measurement_system()}",
@@ -64,7 +126,7 @@ class ImageDataset(Dataset):
             unassigned10=f"Left : x = {self._left_xy()[0]} y = {self._left_xy()[1]}",
             unassigned11=f"Right  : x = {self._end_xy()[0]} y = {self._end_xy()[1]}",
             unassigned12=f"Depth : top-z = {self._top_z()} bottom-z = {self._bottom_z()}",
-            unassigned13=f"",
+            unassigned13=self._waypoints_description(),
             unassigned14=f"Data sample format : {self._data_sample_description()}",
             unassigned15=f"Vertical sample interval : {self._sample_interval()} {self._measurement_system()}/{MICROSECONDS_PER_MILLISECOND}",
         )
@@ -94,23 +156,102 @@ class ImageDataset(Dataset):
         return self._image.width
 
     def trace_header(self, trace_index):
-        proportion = trace_index / (self.num_traces() / 1)
-        position = self._geometry.interpolate_xy(proportion)
-        position_fields = self._trace_header_mapper.position(position, self._xy_scalar)
-        trace_number_fields = self._trace_header_mapper.trace_number(trace_index)
+        fields = {name: column[trace_index].item() for name, column in self._trace_header_table.items()}
+        return TraceHeaderRev1(**self._trace_header_constants, **fields)
+
+    def trace_header_columns(self, start, stop):
+        """The trace header field values for a range of traces.
+
+        Returns:
+            A dictionary mapping trace header field names to either an array of values, one for
+            each trace in the range, or a single value common to all traces.
+        """
+        return {
+            **self._trace_header_constants,
+            **{name: column[start:stop] for name, column in self._trace_header_table.items()},
+        }
+
+    def _make_trace_header_table(self):
+        trace_indexes = np.arange(self.num_traces())
+        proportions = trace_indexes / self.num_traces()
+        # Waypoints are pinned to columns of the image as supplied, before any resampling
+        xs, ys = self._geometry.interpolate_xy_array(proportions, self._source_image.width)
+        return {
+            **self._trace_header_mapper.trace_numbers(trace_indexes),
+            **self._trace_header_mapper.positions(xs, ys, self._xy_scalar),
+        }
 
-        return TraceHeaderRev1(
-            sample_interval=self._sample_interval(),
-            coordinate_units=self._coordinate_units_code(),
-            **trace_number_fields,
-            **position_fields
-        )
+    @property
+    def geometry(self):
+        """The position of the image in space."""
+        return self._geometry
 
-    def _trace_number(self, trace_index):
-        return self._trace_header_mapper.trace_number(trace_index)
+    @property
+    def source_width(self):
+        """The width in pixels of the image as supplied, before any resampling."""
+        return self._source_image.width
+
+    @property
+    def sample_encoder(self):
+        """Determines how pixel values are encoded as samples."""
+        return self._sample_encoder
+
+    @property
+    def pixel_bits(self):
+        """The number of bits per grayscale pixel of the image: 8 or 16."""
+        return bits_per_pixel(self._image.mode)
+
+    @property
+    def strip_width(self):
+        """The number of traces decoded at a time, or None if the whole image is decoded up front."""
+        return self._strips and self._strips.strip_width
 
     def trace_samples(self, trace_index, start=None, stop=None):
-        return self._array[slice(start, stop), trace_index]
+        return self.trace_samples_array(trace_index, trace_index + 1)[0, slice(start, stop)]
+
+    def trace_samples_array(self, start, stop):
+        """The samples for a range of traces, with one contiguous row per trace."""
+        if self._strips is None:
+            return self._samples[start:stop]
+        return self._strips_range(start, stop, "samples", self._encode_samples)
+
+    def trace_pixels_array(self, start, stop):
+        """The grayscale pixel values for a range of traces, with one row per trace.
+
+        The pixels are decoded but not encoded, so they may be compared with samples
+        independently of the SampleEncoder. Each row is typically a view of a column of the
+        image, so is not contiguous.
+        """
+        if self._strips is None:
+            if self._pixels is None:
+                self._pixels = np.asarray(grayscale(self._image))
+            return self._pixels.T[start:stop]
+        return self._strips_range(start, stop, "pixels", _trace_major_pixels)
+
+    def _strips_range(self, start, stop, name, transform):
+        """The rows for a range of traces, obtained by transforming the strips which contain them."""
+        first = self._strips.strip_index(start)
+        last = self._strips.strip_index(stop - 1)
+        if first == last:
+            offset = self._strips.bounds(first)[0]
+            return self._strip(first, name, transform)[start - offset:stop - offset]
+        return np.concatenate([
+            self._strips_range(max(start, strip_start), min(stop, strip_stop), name, transform)
+            for strip_start, strip_stop in map(self._strips.bounds, range(first, last + 1))
+        ])
+
+    def _strip(self, strip_index, name, transform):
+        """One strip of the image transformed, retaining only the most recently used strip."""
+        cached = getattr(self._strip_cache, name, None)
+        if cached is None or cached[0] != strip_index:
+            # Release the previous strip before the next is decoded
+            setattr(self._strip_cache, name, None)
+            cached = (strip_index, transform(self._strips.strip(strip_index)))
+            setattr(self._strip_cache, name, cached)
+        return cached[1]
+
+    def _encode_samples(self, image):
+        return self._sample_encoder.encode(image)
 
     def _samples_per_trace(self):
         return self._image.height
@@ -178,8 +319,7 @@ class ImageDataset(Dataset):
         return CoordinateUnits.UNKNOWN
 
     def _data_sample_format(self):
-        # Currently we only support 8-bit grayscale. In future we could add support for 16-bit.
-        return DataSampleFormat.INT8
+        return self._sample_encoder.data_sample_format(self._image.mode)
 
     def _left_xy(self) -> Point2:
         """Geographic position of the left side of the image."""
@@ -195,11 +335,26 @@ class ImageDataset(Dataset):
     def _bottom_z(self):
         return self._geometry.bottom_z
 
+    def _resampled_description(self):
+        if self._image.size == self._source_image.size:
+            return ""
+        return f"Resampled to : {self._image.width} traces x {self._image.height} samples"
+
+    def _waypoints_description(self):
+        num_waypoints = len(self._geometry.waypoints)
+        if num_waypoints == 0:
+            return ""
+        return f"Path : {num_waypoints} waypoints, length = {self._geometry.length:.1f}"
+
     def _image_filename(self):
         try:
-            filename = self._image.filename
+            filename = self._source_image.filename
             if filename:
                 return Path(filename).name
         except AttributeError:
             pass
         return "<unknown>"
+
+
+def _trace_major_pixels(image):
+    return np.asarray(grayscale(image)).T
@@ -0,0 +1,165 @@
+"""Measuring the time and memory used by each stage of a conversion.
+
+A Profile is passed to the functions performing a conversion, which wrap each stage of their
+work in a call to Profile.stage(). The wall-clock time, CPU time and peak allocation of each
+stage are recorded, and can be retrieved as a JSON-serializable dictionary. When no profile
+is supplied NULL_PROFILE is used, whose stages record nothing and cost almost nothing.
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+
+@dataclass
+class StageStats:
+    """The resources used by one stage of a conversion, accumulated over each time it was entered.
+
+    Attributes:
+        name: The name of the stage.
+        wall_seconds: The elapsed wall-clock time.
+        cpu_seconds: The CPU time used by all threads of the process.
+        peak_allocated_bytes: The greatest amount of memory allocated by Python and NumPy
+            during the stage, beyond that allocated when it began, or None if memory was not
+            traced. Memory allocated by Pillow for decoded images is not included.
+        calls: The number of times the stage was entered.
+    """
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_allocated_bytes: Optional[int] = None
+    calls: int = 0
+
+
+class Profile:
+    """A record of the resources used by each stage of a conversion."""
+
+    def __init__(self, *, trace_memory=True):
+        """
+        Args:
+            trace_memory: If True, memory allocations are traced with tracemalloc to determine
+                the peak allocation of each stage. This slows allocation-heavy stages.
+        """
+        self._trace_memory = trace_memory
+        self._stages = {}
+        self._num_traces = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(trace_memory={self._trace_memory})"
+
+    @property
+    def stages(self):
+        """A list of StageStats, in the order in which the stages were first entered."""
+        return list(self._stages.values())
+
+    @property
+    def num_traces(self):
+        """The number of traces converted, or None if not recorded."""
+        return self._num_traces
+
+    def record_traces(self, num_traces):
+        """Record the number of traces converted, from which throughput is computed."""
+        self._num_traces = num_traces
+
+    @contextmanager
+    def stage(self, name):
+        """A context manager which records the resources used within it as a stage.
+
+        Stages should not be nested, since the peak allocation of the inner stage would reset
+        that of the outer stage.
+        """
+        stats = self._stages.setdefault(name, StageStats(name))
+        started_tracing = self._trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self._trace_memory:
+            _reset_peak()
+            start_allocated, _ = tracemalloc.get_traced_memory()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds += time.perf_counter() - start_wall
+            stats.cpu_seconds += time.process_time() - start_cpu
+            stats.calls += 1
+            if self._trace_memory:
+                _, peak_allocated = tracemalloc.get_traced_memory()
+                stats.peak_allocated_bytes = max(
+                    stats.peak_allocated_bytes or 0, peak_allocated - start_allocated
+                )
+            if started_tracing:
+                tracemalloc.stop()
+
+    def as_dict(self):
+        """The recorded statistics as a JSON-serializable dictionary.
+
+        Each stage and the total over all stages includes its throughput in traces per second,
+        if the number of traces was recorded.
+        """
+        stages = {stats.name: self._with_throughput(asdict(stats)) for stats in self.stages}
+        for stage in stages.values():
+            del stage["name"]
+        total = self._with_throughput({
+            "wall_seconds": sum(stats.wall_seconds for stats in self.stages),
+            "cpu_seconds": sum(stats.cpu_seconds for stats in self.stages),
+            "peak_allocated_bytes": max(
+                (
+                    stats.peak_allocated_bytes for stats in self.stages
+                    if stats.peak_allocated_bytes is not None
+                ),
+                default=None,
+            ),
+        })
+        return {
+            "num_traces": self._num_traces,
+            "stages": stages,
+            "total": total,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def _with_throughput(self, stats):
+        seconds = stats["wall_seconds"]
+        stats["traces_per_second"] = (
+            self._num_traces / seconds if self._num_traces is not None and seconds > 0 else None
+        )
+        return stats
+
+
+class NullProfile:
+    """A profile which records nothing."""
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    @contextmanager
+    def stage(self, name):
+        yield None
+
+    def record_traces(self, num_traces):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+def peak_rss_bytes():
+    """The peak resident set size of this process in bytes, or None if it is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _reset_peak():
+    try:
+        tracemalloc.reset_peak()
+    except AttributeError:
+        # Before Python 3.9 the peak can only be reset by discarding the traces
+        tracemalloc.clear_traces()
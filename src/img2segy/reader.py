@@ -0,0 +1,79 @@
+"""Reading SEG-Y files with fixed-length traces through a memory mapping.
+
+The binary reel header is parsed to determine the layout of the file, and the traces are
+mapped as a structured array with the same dtype as is used by the writer, so that the headers
+and samples of any range of traces are available as NumPy views without parsing each trace.
+"""
+import os
+
+import numpy as np
+from segpy.datatypes import DATA_SAMPLE_FORMAT_TO_SEG_Y_TYPE
+from segpy.toolkit import TEXTUAL_HEADER_NUM_BYTES, read_binary_reel_header
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy.writer import SegYLayout, map_traces, trace_dtype
+
+
+def read_layout(fh, trace_header_format=TraceHeaderRev1, endian='>'):
+    """Determine the layout of a SEG-Y file from its binary reel header and its size.
+
+    Args:
+        fh: A file object open for binary read.
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: '>' for big-endian, '<' for little-endian.
+
+    Returns:
+        A (binary_reel_header, layout) pair, where layout is a SegYLayout.
+
+    Raises:
+        ValueError: If the file has a variable number of extended textual headers, its data
+            sample format is not supported, or its size is not that of a whole number of
+            fixed-length traces.
+    """
+    fh.seek(TEXTUAL_HEADER_NUM_BYTES)
+    binary_reel_header = read_binary_reel_header(fh, endian=endian)
+    num_extended_textual_headers = binary_reel_header.num_extended_textual_headers
+    if num_extended_textual_headers < 0:
+        raise ValueError("SEG-Y files with a variable number of extended textual headers are not supported")
+    try:
+        seg_y_type = DATA_SAMPLE_FORMAT_TO_SEG_Y_TYPE[binary_reel_header.data_sample_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown data sample format {binary_reel_header.data_sample_format}"
+        ) from None
+    num_samples = binary_reel_header.num_samples
+    dtype = trace_dtype(num_samples, seg_y_type, trace_header_format, endian)
+
+    traces_offset = SegYLayout(0, dtype, num_extended_textual_headers).traces_offset
+    file_size = os.fstat(fh.fileno()).st_size
+    num_traces, remainder = divmod(file_size - traces_offset, dtype.itemsize)
+    if num_traces < 0 or remainder != 0:
+        raise ValueError(
+            f"The size of the file, {file_size} bytes, is not that of a whole number of "
+            f"traces of {num_samples} samples"
+        )
+    return binary_reel_header, SegYLayout(num_traces, dtype, num_extended_textual_headers)
+
+
+def map_segy(segy_filepath, trace_header_format=TraceHeaderRev1, endian='>'):
+    """Memory-map the traces of a SEG-Y file with fixed-length traces, for reading.
+
+    Args:
+        segy_filepath: The path to the SEG-Y file.
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: '>' for big-endian, '<' for little-endian.
+
+    Returns:
+        A (binary_reel_header, traces) pair, where traces is a read-only structured array
+        with one record per trace, each with "header" and "samples" fields, as returned by
+        writer.map_traces().
+
+    Raises:
+        ValueError: As for read_layout().
+    """
+    with open(segy_filepath, "rb") as segy_file:
+        binary_reel_header, layout = read_layout(segy_file, trace_header_format, endian)
+    if layout.num_traces == 0:
+        # An empty region of a file cannot be mapped
+        return binary_reel_header, np.zeros(0, dtype=layout.trace_dtype)
+    return binary_reel_header, map_traces(segy_filepath, layout, mode='r')
@@ -0,0 +1,82 @@
+"""Rendering of SEG-Y traces as grayscale images, the reverse of conversion.
+
+The samples are read from a memory mapping of the SEG-Y file as a single strided view, so
+decimated renderings touch only the traces and samples which are needed. Samples are decoded
+by inverting the encoding applied by SampleEncoder, so that images converted with the default
+settings are reproduced exactly.
+"""
+import numpy as np
+from PIL import Image
+
+from img2segy.reader import map_segy
+
+
+def render_segy(segy_filepath, *, trace_step=1, sample_step=1, bits=8, amplitude_scale=1.0) -> Image.Image:
+    """Render the traces of a SEG-Y file as a grayscale image, one column per trace.
+
+    Args:
+        segy_filepath: The path to a SEG-Y file with fixed-length traces.
+        trace_step: Render every trace_step-th trace.
+        sample_step: Render every sample_step-th sample of each trace.
+        bits: The bit depth of the image: 8 or 16.
+        amplitude_scale: The factor by which floating point samples were multiplied when
+            they were encoded.
+
+    Returns:
+        A PIL.Image.Image in mode "L" if bits is 8, or "I;16" if bits is 16.
+
+    Raises:
+        ValueError: If the SEG-Y file cannot be mapped, or bits is not 8 or 16.
+    """
+    _, traces = map_segy(segy_filepath)
+    samples = traces["samples"][::trace_step, ::sample_step]
+    return Image.fromarray(pixels(samples, bits=bits, amplitude_scale=amplitude_scale))
+
+
+def pixels(samples, *, bits=8, amplitude_scale=1.0) -> np.ndarray:
+    """Decode samples as grayscale pixel values.
+
+    Integer samples are made unsigned by adding the mid-grey value of their width, and shifted
+    to the bit depth of the pixels. Floating point samples are divided by the amplitude scale,
+    offset by the mid-grey value of the bit depth, rounded and clipped to its range.
+
+    Args:
+        samples: An array with one row of samples per trace, such as a view of the mapped
+            traces of a SEG-Y file, which need not be contiguous.
+        bits: The bit depth of the pixels: 8 or 16.
+        amplitude_scale: The factor by which floating point samples were multiplied when
+            they were encoded.
+
+    Returns:
+        An array of shape (samples per trace, number of traces), with one column per trace.
+
+    Raises:
+        ValueError: If bits is not 8 or 16.
+    """
+    if bits not in (8, 16):
+        raise ValueError(f"Bit depth {bits} is not 8 or 16")
+    result = np.empty(samples.shape[::-1], dtype=np.uint16 if bits == 16 else np.uint8)
+    # Assign trace-major values through the transpose, so each trace fills a column
+    columns = result.T
+
+    if samples.dtype.kind == "f":
+        values = np.divide(samples, amplitude_scale, dtype=np.float64)
+        values += 1 << (bits - 1)
+        np.rint(values, out=values)
+        np.clip(values, 0, (1 << bits) - 1, out=values)
+        columns[...] = values
+        return result
+
+    # Toggling the most significant bit of two's complement samples is equivalent to adding
+    # the mid-grey value and reinterpreting the result as unsigned.
+    dtype = samples.dtype
+    sample_bits = dtype.itemsize * 8
+    unsigned = np.bitwise_xor(samples.view(f"{dtype.byteorder}u{dtype.itemsize}"), 1 << (sample_bits - 1))
+    if sample_bits > bits:
+        np.right_shift(unsigned, sample_bits - bits, out=unsigned)
+        columns[...] = unsigned
+    elif sample_bits < bits:
+        np.left_shift(unsigned, bits - sample_bits, out=columns, dtype=result.dtype)
+    else:
+        columns[...] = unsigned
+    return result
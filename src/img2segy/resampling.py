@@ -0,0 +1,114 @@
+from PIL import Image
+
+# Pillow resampling filters, keyed by the names used in configuration files.
+METHODS = {
+    "nearest": Image.Resampling.NEAREST,
+    "box": Image.Resampling.BOX,
+    "bilinear": Image.Resampling.BILINEAR,
+    "hamming": Image.Resampling.HAMMING,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+DEFAULT_METHOD = "bicubic"
+
+
+class ConfigurationError(Exception):
+    pass
+
+
+class Resampling:
+    """Resampling of an image to a target trace spacing and sample interval."""
+
+    @classmethod
+    def from_config(cls, config):
+        resample = config.get("resample", {})
+        try:
+            trace_spacing = resample.get("trace-spacing")
+            sample_interval = resample.get("sample-interval")
+            return cls(
+                trace_spacing=None if trace_spacing is None else float(trace_spacing),
+                sample_interval=None if sample_interval is None else float(sample_interval),
+                method=str(resample.get("method", DEFAULT_METHOD)),
+            )
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(f"[resample] {e}") from e
+
+    def __init__(self, *, trace_spacing=None, sample_interval=None, method=DEFAULT_METHOD):
+        """
+        Args:
+            trace_spacing: The horizontal distance between adjacent traces, in the horizontal
+                units of the geometry, or None to retain one trace per column of pixels.
+            sample_interval: The vertical distance between adjacent samples, in the vertical
+                units of the geometry, or None to retain one sample per row of pixels.
+            method: The name of the resampling filter; one of the keys of METHODS.
+
+        Raises:
+            ValueError: If the spacing or interval is not positive, or the method is unknown.
+        """
+        if trace_spacing is not None and not trace_spacing > 0:
+            raise ValueError(f"trace-spacing {trace_spacing} is not positive")
+        if sample_interval is not None and not sample_interval > 0:
+            raise ValueError(f"sample-interval {sample_interval} is not positive")
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}. Choose from {', '.join(METHODS)}")
+        self._trace_spacing = trace_spacing
+        self._sample_interval = sample_interval
+        self._method = method
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(trace_spacing={self._trace_spacing}, "
+            f"sample_interval={self._sample_interval}, method={self._method!r})"
+        )
+
+    @property
+    def trace_spacing(self):
+        return self._trace_spacing
+
+    @property
+    def sample_interval(self):
+        return self._sample_interval
+
+    @property
+    def method(self):
+        return self._method
+
+    def size(self, geometry, width, height):
+        """The number of traces and samples after resampling.
+
+        Traces are positioned at intervals of the geometry length divided by the number of
+        traces, and the first and last samples are at the top and bottom of the geometry.
+
+        Args:
+            geometry: The geometry of the image.
+            width: The width of the image in pixels.
+            height: The height of the image in pixels.
+
+        Returns:
+            A (num_traces, num_samples) 2-tuple.
+        """
+        num_traces = width
+        if self._trace_spacing is not None:
+            num_traces = max(1, round(geometry.length / self._trace_spacing))
+        num_samples = height
+        if self._sample_interval is not None:
+            depth_range = abs(geometry.bottom_z - geometry.top_z)
+            num_samples = max(2, round(depth_range / self._sample_interval) + 1)
+        return num_traces, num_samples
+
+    def apply(self, image, geometry):
+        """Resample an image.
+
+        Args:
+            image: The image to be resampled.
+            geometry: The geometry of the image.
+
+        Returns:
+            The resampled image, which will be the same image object if no resampling is
+            required.
+        """
+        size = self.size(geometry, image.width, image.height)
+        if size == image.size:
+            return image
+        return image.resize(size, resample=METHODS[self._method])
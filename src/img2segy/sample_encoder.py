@@ -0,0 +1,149 @@
+import numpy as np
+from PIL import Image, ImageOps
+from segpy.datatypes import DATA_SAMPLE_FORMAT_TO_SEG_Y_TYPE, DataSampleFormat
+
+from img2segy.writer import sample_dtype
+
+# Image modes with 16 bits per pixel, all of which are read by NumPy as unsigned integers.
+# Mode "I" holds 32-bit signed integers, but is used by some versions of Pillow for 16-bit
+# images, so is encoded as 16-bit provided its values are in range.
+SIXTEEN_BIT_MODES = frozenset({"I;16", "I;16B", "I;16L", "I;16N", "I"})
+
+# The range of pixel values which can be encoded from images of mode "I".
+SIXTEEN_BIT_RANGE = (0, (1 << 16) - 1)
+
+# Data sample formats, keyed by the names used in configuration files.
+DATA_SAMPLE_FORMATS = {
+    "int8": DataSampleFormat.INT8,
+    "int16": DataSampleFormat.INT16,
+    "float32": DataSampleFormat.FLOAT32,
+}
+
+AUTO = "auto"
+
+
+class ConfigurationError(Exception):
+    pass
+
+
+class SampleEncoder:
+    """Encoding of grayscale pixel values as SEG-Y samples.
+
+    Pixel values are made signed by subtracting the mid-grey value (128 for 8-bit images and
+    32768 for 16-bit images). Integer sample formats are shifted to the width of the format,
+    so 8-bit images encoded as 16-bit samples occupy the full range. Floating point samples
+    retain the signed pixel values, multiplied by an amplitude scale.
+    """
+
+    @classmethod
+    def from_config(cls, config):
+        segy = config.get("segy", {})
+        try:
+            return cls(
+                data_sample_format=str(segy.get("data-sample-format", AUTO)),
+                amplitude_scale=float(segy.get("amplitude-scale", 1.0)),
+            )
+        except ValueError as e:
+            raise ConfigurationError(f"[segy] {e}") from e
+
+    def __init__(self, *, data_sample_format=AUTO, amplitude_scale=1.0):
+        """
+        Args:
+            data_sample_format: One of the keys of DATA_SAMPLE_FORMATS, or "auto" to use int8
+                for 8-bit images and int16 for 16-bit images.
+            amplitude_scale: The factor by which floating point samples are multiplied.
+
+        Raises:
+            ValueError: If the data sample format is unknown.
+        """
+        if data_sample_format != AUTO and data_sample_format not in DATA_SAMPLE_FORMATS:
+            raise ValueError(
+                f"Unknown data-sample-format {data_sample_format!r}. "
+                f"Choose from {', '.join((AUTO, *DATA_SAMPLE_FORMATS))}"
+            )
+        self._data_sample_format = data_sample_format
+        self._amplitude_scale = amplitude_scale
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(data_sample_format={self._data_sample_format!r}, "
+            f"amplitude_scale={self._amplitude_scale})"
+        )
+
+    @property
+    def amplitude_scale(self):
+        return self._amplitude_scale
+
+    def data_sample_format(self, image_mode) -> DataSampleFormat:
+        """The data sample format used to encode images of the given mode."""
+        if self._data_sample_format == AUTO:
+            if bits_per_pixel(image_mode) == 16:
+                return DataSampleFormat.INT16
+            return DataSampleFormat.INT8
+        return DATA_SAMPLE_FORMATS[self._data_sample_format]
+
+    def encode(self, image) -> np.ndarray:
+        """Encode an image as samples.
+
+        The samples are stored trace-major (one contiguous row per trace, i.e. per image column)
+        and in SEG-Y byte order, so whole traces or runs of traces can be serialized directly.
+        Each conversion is performed by vectorized operations over the whole image, writing
+        directly into the result.
+
+        Args:
+            image: The image to be encoded.
+
+        Returns:
+            An array of shape (image.width, image.height).
+
+        Raises:
+            ConfigurationError: If the image has mode "I" and a pixel value is outside the
+                16-bit range.
+        """
+        bits = bits_per_pixel(image.mode)
+        pixels = np.asarray(grayscale(image)).T
+        if image.mode == "I" and pixels.size:
+            low, high = int(pixels.min()), int(pixels.max())
+            if low < SIXTEEN_BIT_RANGE[0] or high > SIXTEEN_BIT_RANGE[1]:
+                raise ConfigurationError(
+                    f"Pixel values of mode 'I' image range from {low} to {high}, beyond the "
+                    f"16-bit range {SIXTEEN_BIT_RANGE[0]} to {SIXTEEN_BIT_RANGE[1]} which "
+                    f"can be encoded"
+                )
+        data_sample_format = self.data_sample_format(image.mode)
+        dtype = sample_dtype(DATA_SAMPLE_FORMAT_TO_SEG_Y_TYPE[data_sample_format])
+        samples = np.empty(pixels.shape, dtype=dtype)
+
+        if data_sample_format == DataSampleFormat.FLOAT32:
+            np.subtract(pixels, 1 << (bits - 1), out=samples, dtype=np.float32)
+            if self._amplitude_scale != 1.0:
+                np.multiply(samples, self._amplitude_scale, out=samples)
+            return samples
+
+        # For the integer formats, work on the unsigned view of the samples. Toggling the most
+        # significant bit of an unsigned value is equivalent to subtracting the mid-grey value
+        # and reinterpreting the result as two's complement.
+        sample_bits = dtype.itemsize * 8
+        sign_bit = 1 << (sample_bits - 1)
+        unsigned = samples.view(f"{dtype.byteorder}u{dtype.itemsize}")
+        if sample_bits == bits:
+            np.bitwise_xor(pixels, sign_bit, out=unsigned, casting="unsafe")
+            return samples
+        if sample_bits < bits:
+            np.right_shift(pixels, bits - sample_bits, out=unsigned, casting="unsafe")
+        else:
+            np.left_shift(pixels, sample_bits - bits, out=unsigned, dtype=f"u{dtype.itemsize}")
+        np.bitwise_xor(unsigned, sign_bit, out=unsigned)
+        return samples
+
+
+def bits_per_pixel(image_mode):
+    """The number of bits per grayscale pixel for images of the given mode: 8 or 16."""
+    return 16 if image_mode in SIXTEEN_BIT_MODES else 8
+
+
+def grayscale(image) -> Image.Image:
+    """Convert an image to grayscale, retaining 16-bit images and avoiding needless copies."""
+    if image.mode == "L" or image.mode in SIXTEEN_BIT_MODES:
+        return image
+    return ImageOps.grayscale(image)
@@ -0,0 +1,411 @@
+"""A long-running conversion service.
+
+The server accepts HTTP/1.1 requests over TCP or a Unix domain socket, one request per
+connection, and performs conversions on a pool of worker processes which are started, and have
+imported NumPy, Pillow and segpy, before the first request is accepted:
+
+  GET /health
+      The number of workers and of queued and running jobs.
+
+  POST /jobs
+      Queue the conversion of an image already on the server's filesystem. The body is a JSON
+      object with an "image" path and optional "config" and "segy" paths and "force" flag,
+      with the same meanings as for img2segy.api.convert(). Responds 202 Accepted with the
+      status of the job.
+
+  GET /jobs/<id>
+      The status of a job: "queued", "running", "succeeded" or "failed".
+
+  POST /convert
+      Convert an image submitted as multipart/form-data, with an "image" part containing the
+      image file and a "config" part containing the TOML configuration. Responds when the
+      conversion is complete, with the SEG-Y file as the body.
+
+Jobs wait in a bounded queue until a worker is free. When the queue is full, submissions are
+refused with 503 Service Unavailable, so clients can back off and retry.
+"""
+import asyncio
+import email.parser
+import email.policy
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Optional
+
+from img2segy import api
+from img2segy.defaults import (
+    DEFAULT_ENGINE,
+    DEFAULT_SERVER_HOST as DEFAULT_HOST,
+    DEFAULT_SERVER_PORT as DEFAULT_PORT,
+    DEFAULT_SERVER_QUEUE_SIZE as DEFAULT_QUEUE_SIZE,
+)
+from img2segy.version import __version__
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BODY_NUM_BYTES = 256 * 1024 * 1024
+
+# The number of finished jobs whose status is retained.
+MAX_RETAINED_JOBS = 1000
+
+RESPONSE_CHUNK_NUM_BYTES = 1024 * 1024
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status: HTTPStatus, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class Job:
+    """A conversion submitted to the server."""
+    id: str
+    conversion: api.Conversion
+    force: bool = False
+    status: str = QUEUED
+    result: Optional[api.ConversionResult] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def as_dict(self):
+        status = {
+            "id": self.id,
+            "status": self.status,
+            "image": str(self.conversion.image_filepath),
+        }
+        if self.result is not None:
+            status["error"] = self.result.error
+            status["configuration_error"] = self.result.configuration_error
+            status["up_to_date"] = self.result.up_to_date
+        return status
+
+
+class ConversionServer:
+    """A server which converts images on a pool of warm worker processes."""
+
+    def __init__(
+            self,
+            *,
+            workers=None,
+            queue_size=DEFAULT_QUEUE_SIZE,
+            engine=DEFAULT_ENGINE,
+            strip_width=None,
+            max_body_num_bytes=DEFAULT_MAX_BODY_NUM_BYTES,
+    ):
+        """
+        Args:
+            workers: The number of worker processes, and so of concurrent conversions. If
+                None, the number of CPUs is used.
+            queue_size: The number of jobs which may wait for a worker before further
+                submissions are refused.
+            engine, strip_width: As for img2segy.api.convert(), applied to each conversion.
+            max_body_num_bytes: The largest request body accepted.
+        """
+        if queue_size < 1:
+            raise ValueError(f"queue_size {queue_size} is not positive")
+        self._num_workers = workers or os.cpu_count() or 1
+        self._queue_size = queue_size
+        self._options = dict(engine=engine, strip_width=strip_width)
+        self._max_body_num_bytes = max_body_num_bytes
+        self._jobs = OrderedDict()
+        self._queue = None
+        self._executor = None
+        self._dispatchers = []
+        self._server = None
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(workers={self._num_workers}, queue_size={self._queue_size}, "
+            f"engine={self._options['engine']!r}, strip_width={self._options['strip_width']})"
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def addresses(self):
+        """The addresses on which the server is listening."""
+        return [sock.getsockname() for sock in self._server.sockets] if self._server else []
+
+    async def start(self, *, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+        """Start the worker processes, then start listening.
+
+        Args:
+            host: The host name or address on which to listen for TCP connections.
+            port: The TCP port on which to listen, or zero to choose a free port.
+            socket_path: If provided, listen on a Unix domain socket at this path rather than
+                on TCP.
+        """
+        loop = asyncio.get_running_loop()
+        self._executor = ProcessPoolExecutor(max_workers=self._num_workers, initializer=_warm_up)
+        # Wait until every worker process has started and imported its dependencies
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warm_up) for _ in range(self._num_workers)
+        ))
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self._num_workers)
+        ]
+        if socket_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=socket_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info("Listening on %s with %d workers", self.addresses, self._num_workers)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, abandon queued jobs, and shut down the worker processes."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    def submit(self, conversion: api.Conversion, force=False) -> Job:
+        """Queue a conversion.
+
+        Raises:
+            HTTPError: With status 503 if the queue is full.
+        """
+        job = Job(id=uuid.uuid4().hex, conversion=conversion, force=force)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPError(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                f"The queue of {self._queue_size} jobs is full",
+                {"Retry-After": "1"},
+            ) from None
+        self._jobs[job.id] = job
+        self._forget_finished_jobs()
+        return job
+
+    def _forget_finished_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - MAX_RETAINED_JOBS)]:
+            del self._jobs[job_id]
+
+    async def _dispatch(self):
+        """Repeatedly take a job from the queue and run it on a worker process."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = RUNNING
+            try:
+                job.result = await loop.run_in_executor(
+                    self._executor,
+                    functools.partial(
+                        api.convert_one, job.conversion, **self._options, force=job.force
+                    ),
+                )
+            except Exception as e:
+                # For example, the worker process was killed
+                logger.exception("Error running job %s", job.id)
+                job.result = api.ConversionResult(job.conversion, error=f"{type(e).__name__}: {e}")
+            job.status = SUCCEEDED if job.result.succeeded else FAILED
+            job.done.set()
+            self._queue.task_done()
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, path, headers, body = await self._read_request(reader)
+                await self._route(method, path, headers, body, writer)
+            except HTTPError as e:
+                await _respond_json(writer, e.status, {"error": e.message}, e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug("Connection lost: %s", e)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request head too large")
+        request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Malformed request line {request_line!r}")
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length")
+        if content_length > self._max_body_num_bytes:
+            raise HTTPError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body exceeds {self._max_body_num_bytes} bytes",
+            )
+        body = await reader.readexactly(content_length)
+        return method, target.split("?", 1)[0], headers, body
+
+    async def _route(self, method, path, headers, body, writer):
+        parts = path.strip("/").split("/")
+        if parts == ["health"] and method == "GET":
+            await _respond_json(writer, HTTPStatus.OK, self._health())
+        elif parts == ["jobs"] and method == "POST":
+            job = self.submit(*_conversion_from_json(body))
+            await _respond_json(
+                writer, HTTPStatus.ACCEPTED, job.as_dict(), {"Location": f"/jobs/{job.id}"}
+            )
+        elif len(parts) == 2 and parts[0] == "jobs" and method == "GET":
+            try:
+                job = self._jobs[parts[1]]
+            except KeyError:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No job {parts[1]}") from None
+            await _respond_json(writer, HTTPStatus.OK, job.as_dict())
+        elif parts == ["convert"] and method == "POST":
+            await self._convert_submission(headers, body, writer)
+        elif parts in (["health"], ["jobs"], ["convert"]) or parts[0] == "jobs":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {path}")
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No resource {path}")
+
+    def _health(self):
+        return {
+            "status": "ok",
+            "version": __version__,
+            "workers": self._num_workers,
+            "queued": self._queue.qsize(),
+            "running": sum(job.status == RUNNING for job in self._jobs.values()),
+            "queue_size": self._queue_size,
+        }
+
+    async def _convert_submission(self, headers, body, writer):
+        form = _parse_form(headers.get("content-type", ""), body)
+        try:
+            image_filename, image_bytes = form["image"]
+            _, config_bytes = form["config"]
+        except KeyError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing form part {e}") from None
+
+        dirpath = Path(tempfile.mkdtemp(prefix="img2segy-"))
+        try:
+            image_filepath = dirpath / f"image{Path(image_filename or 'image.png').suffix}"
+            image_filepath.write_bytes(image_bytes)
+            config_filepath = dirpath / "config.toml"
+            config_filepath.write_bytes(config_bytes)
+            segy_filepath = dirpath / "image.segy"
+            job = self.submit(
+                api.Conversion(image_filepath, segy_filepath, config_filepath), force=True
+            )
+            await job.done.wait()
+            if not job.result.succeeded:
+                status = (
+                    HTTPStatus.BAD_REQUEST if job.result.configuration_error
+                    else HTTPStatus.UNPROCESSABLE_ENTITY
+                )
+                await _respond_json(writer, status, job.as_dict())
+                return
+            segy_name = Path(image_filename or "image").with_suffix(".segy").name
+            await _respond_file(writer, segy_filepath, {
+                "Content-Type": "application/octet-stream",
+                "Content-Disposition": f'attachment; filename="{segy_name}"',
+                "X-Img2segy-Job": job.id,
+            })
+        finally:
+            shutil.rmtree(dirpath, ignore_errors=True)
+
+
+def _warm_up():
+    """Import the modules needed for conversion, so that the first conversion isn't delayed."""
+    import img2segy.api  # noqa: F401
+
+
+def _conversion_from_json(body):
+    try:
+        request = json.loads(body)
+        image = request["image"]
+        config = request.get("config")
+        segy = request.get("segy")
+        return (
+            api.Conversion(
+                image_filepath=Path(image),
+                segy_filepath=None if segy is None else Path(segy),
+                config_filepath=None if config is None else Path(config),
+            ),
+            bool(request.get("force", False)),
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Malformed job: {e}") from None
+
+
+def _parse_form(content_type, body):
+    """Parse a multipart/form-data body.
+
+    Returns:
+        A dictionary mapping the name of each part to a (filename, content) 2-tuple, where the
+        filename is None if the part has none.
+    """
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Expected multipart/form-data")
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    if not message.is_multipart():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed multipart/form-data")
+    return {
+        part.get_param("name", header="content-disposition"): (
+            part.get_filename(),
+            part.get_payload(decode=True),
+        )
+        for part in message.iter_parts()
+    }
+
+
+def _write_head(writer, status: HTTPStatus, headers, content_length):
+    head = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    head.extend(f"{name}: {value}" for name, value in headers.items())
+    head.append(f"Content-Length: {content_length}")
+    head.append("Connection: close")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+
+async def _respond_json(writer, status: HTTPStatus, data, headers=None):
+    body = json.dumps(data).encode("utf-8")
+    _write_head(writer, status, {"Content-Type": "application/json", **(headers or {})}, len(body))
+    writer.write(body)
+    await writer.drain()
+
+
+async def _respond_file(writer, filepath: Path, headers):
+    """Respond with the content of a file, a chunk at a time, waiting for each to be sent."""
+    _write_head(writer, HTTPStatus.OK, headers, filepath.stat().st_size)
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(RESPONSE_CHUNK_NUM_BYTES), b""):
+            writer.write(chunk)
+            await writer.drain()
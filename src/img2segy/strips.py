@@ -0,0 +1,153 @@
+"""Decoding images in vertical strips.
+
+Each trace of the SEG-Y output corresponds to a column of pixels, so an image can be converted
+a run of columns at a time without holding the whole of it in memory.
+"""
+import threading
+
+import numpy as np
+from PIL import Image
+
+# The number of bytes per pixel for the uncompressed raw modes whose columns can be
+# addressed directly within a file.
+RAW_MODE_BYTES_PER_PIXEL = {
+    "L": 1,
+    "P": 1,
+    "I;16": 2,
+    "I;16B": 2,
+    "I;16L": 2,
+    "I;16N": 2,
+    "RGB": 3,
+    "BGR": 3,
+    "RGBA": 4,
+    "RGBX": 4,
+    "BGRX": 4,
+}
+
+
+class ImageStrips:
+    """The columns of an image, decoded one vertical strip at a time.
+
+    Where the encoded image consists of uncompressed rows or tiles, as it does in uncompressed
+    TIFF (including tiled TIFF), BMP and PPM files, only the bytes of the file which lie within
+    each strip are read, so memory use is bounded by the strip width rather than by the size of
+    the image. Compressed images, such as PNG or LZW-compressed TIFF files, can only be decoded
+    as a whole, so are decoded once and then cropped.
+    """
+
+    def __init__(self, image: Image.Image, strip_width: int):
+        if strip_width < 1:
+            raise ValueError(f"strip_width {strip_width} is not positive")
+        self._image = image
+        self._strip_width = strip_width
+        self._decodable_in_strips = True
+        # Serializes the decoding and cropping of images which cannot be decoded in strips
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(image={self._image!r}, strip_width={self._strip_width})"
+
+    @property
+    def strip_width(self):
+        return self._strip_width
+
+    def __len__(self):
+        return -(-self._image.width // self._strip_width)
+
+    def strip_index(self, column):
+        """The index of the strip containing a column of the image."""
+        return column // self._strip_width
+
+    def bounds(self, strip_index):
+        """The start column and one beyond the stop column of a strip."""
+        start = strip_index * self._strip_width
+        stop = min(start + self._strip_width, self._image.width)
+        return start, stop
+
+    def strip(self, strip_index) -> Image.Image:
+        """Decode one strip of the image.
+
+        Args:
+            strip_index: The zero-based index of the strip.
+
+        Returns:
+            An image with the full height of the source image, and the width of the strip.
+        """
+        if not (0 <= strip_index < len(self)):
+            raise IndexError(f"strip_index {strip_index} out of range 0 to {len(self) - 1}")
+        start, stop = self.bounds(strip_index)
+        if self._decodable_in_strips:
+            strip = self._read_strip(start, stop)
+            if strip is not None:
+                return strip
+            self._decodable_in_strips = False
+        with self._lock:
+            return self._image.crop((start, 0, stop, self._image.height))
+
+    def _read_strip(self, start, stop):
+        """Read the columns between start and stop directly from the uncompressed image file.
+
+        Returns:
+            An image of the strip, or None if the image cannot be decoded in strips.
+        """
+        filename = getattr(self._image, "filename", None)
+        tiles = getattr(self._image, "tile", None)
+        if not (filename and tiles):
+            # The image is already in memory, or doesn't come from a file we can reopen
+            return None
+        regions = _raw_strip_regions(tiles, start, stop)
+        if regions is None:
+            return None
+
+        data = np.memmap(filename, dtype=np.uint8, mode="r")
+        strip = Image.new(self._image.mode, (stop - start, self._image.height))
+        for (x0, y0, x1, y1), offset, raw_mode, stride, orientation in regions:
+            row_num_bytes = (x1 - x0) * RAW_MODE_BYTES_PER_PIXEL[raw_mode]
+            num_rows = y1 - y0
+            if offset + (num_rows - 1) * stride + row_num_bytes > len(data):
+                # The file is truncated, which decoding by Pillow will report
+                return None
+            rows = np.lib.stride_tricks.as_strided(
+                data[offset:], shape=(num_rows, row_num_bytes), strides=(stride, 1), writeable=False
+            )
+            region = Image.frombytes(
+                self._image.mode, (x1 - x0, num_rows), rows.tobytes(), "raw", raw_mode, 0, orientation
+            )
+            strip.paste(region, (x0, y0))
+        if self._image.mode == "P":
+            palette_mode, palette = self._image.palette.getdata()
+            strip.putpalette(palette, palette_mode)
+        return strip
+
+
+def _raw_strip_regions(tiles, start, stop):
+    """The regions of an uncompressed image file which contain the columns from start to stop.
+
+    Returns:
+        A list of (extents, offset, raw_mode, stride, orientation) tuples, one for each tile
+        which intersects the strip, where extents are relative to the strip, offset is that of
+        the first byte of the region in the file, and stride is the number of bytes between the
+        starts of successive rows in the file. None if any of the tiles is not uncompressed
+        data in a supported raw mode.
+    """
+    regions = []
+    for codec_name, (x0, y0, x1, y1), offset, args in tiles:
+        if isinstance(args, str):
+            args = (args, 0, 1)
+        if codec_name != "raw" or args[0] not in RAW_MODE_BYTES_PER_PIXEL:
+            return None
+        raw_mode, stride, *rest = args
+        orientation = rest[0] if rest else 1
+        bytes_per_pixel = RAW_MODE_BYTES_PER_PIXEL[raw_mode]
+        stride = stride or (x1 - x0) * bytes_per_pixel
+        left = max(x0, start)
+        right = min(x1, stop)
+        if left < right:
+            regions.append((
+                (left - start, y0, right - start, y1),
+                offset + (left - x0) * bytes_per_pixel,
+                raw_mode,
+                stride,
+                orientation,
+            ))
+    return regions
@@ -1,3 +1,18 @@
+import numpy as np
+from segpy.datatypes import LIMITS
+from segpy.trace_header import TraceHeaderRev1
+
+# The permitted values of the coordinate scalar, from the most to the least precise. Negative
+# scalars are divisors and positive scalars multipliers of the stored coordinates.
+XY_SCALARS = (-10000, -1000, -100, -10, 1, 10, 100, 1000, 10000)
+
+AUTO = "auto"
+
+
+class ConfigurationError(Exception):
+    pass
+
+
 class TraceHeaderMapper:
 
     @classmethod
@@ -5,6 +20,18 @@ class TraceHeaderMapper:
         segy = config["segy"]
         trace_position_field = segy["trace-position"]
         trace_number_field = segy["trace-number"]
+        inline_number_field = segy.get("inline-number", {})
+        xy_scalar = segy.get("xy-scalar", AUTO)
+        # TOML booleans and floats compare equal to the integers, so are excluded by type
+        if xy_scalar != AUTO and (
+                isinstance(xy_scalar, bool)
+                or not isinstance(xy_scalar, int)
+                or xy_scalar not in XY_SCALARS
+        ):
+            raise ConfigurationError(
+                f"[segy] xy-scalar {xy_scalar!r} is not {AUTO!r} or one of the integers "
+                f"{', '.join(map(str, XY_SCALARS))}"
+            )
         return cls(
             place_position_in_source_coords=bool(trace_position_field.get("use-source-coord-fields", True)),
             place_position_in_group_coords=bool(trace_position_field.get("use-group-coord-fields", True)),
@@ -12,6 +39,9 @@ class TraceHeaderMapper:
             place_trace_number_in_trace_number=bool(trace_number_field.get("use-trace-number-field", True)),
             place_trace_number_in_crossline_number=bool(trace_number_field.get("use-crossline-number-field", True)),
             base_trace_number=int(trace_position_field.get("base-trace-number", 0)),
+            place_slice_number_in_inline_number=bool(inline_number_field.get("use-inline-number-field", True)),
+            base_inline_number=int(inline_number_field.get("base-inline-number", 0)),
+            xy_scalar=xy_scalar,
         )
 
     def __init__(
@@ -21,7 +51,10 @@ class TraceHeaderMapper:
             place_position_in_cdp_coords,
             place_trace_number_in_trace_number,
             place_trace_number_in_crossline_number,
-            base_trace_number=0
+            base_trace_number=0,
+            place_slice_number_in_inline_number=True,
+            base_inline_number=0,
+            xy_scalar=AUTO,
     ):
         self._place_position_in_source_coords = place_position_in_source_coords
         self._place_position_in_group_coords = place_position_in_group_coords
@@ -36,24 +69,76 @@ class TraceHeaderMapper:
 
         self._base_trace_number = base_trace_number
 
+        # Only used for volumes, in which each slice is an inline
+        self._place_slice_number_in_inline_number = place_slice_number_in_inline_number
+        self._base_inline_number = base_inline_number
+
+        # Either one of XY_SCALARS, or "auto" to choose the most precise for the coordinates
+        self._xy_scalar = xy_scalar
+
+    def xy_scalar(self, max_abs_coordinate):
+        """The coordinate scalar with which positions will be stored.
+
+        Unless a scalar was specified, this is the most precise of XY_SCALARS with which
+        coordinates of the given magnitude fit in the coordinate fields.
+
+        Args:
+            max_abs_coordinate: The greatest absolute value of any x or y coordinate.
+
+        Raises:
+            ValueError: If the coordinates are too large for any scalar.
+        """
+        if self._xy_scalar != AUTO:
+            return self._xy_scalar
+        return optimal_xy_scalar(max_abs_coordinate)
+
     def position(self, p, xy_scalar):
+        scaled_x = int(self._scale(p[0], xy_scalar))
+        scaled_y = int(self._scale(p[1], xy_scalar))
         fields = {}
         if self._place_position_in_source_coords:
-            fields["source_x"] = self._scale(p[0], xy_scalar)
-            fields["source_y"] = self._scale(p[1], xy_scalar)
+            fields["source_x"] = scaled_x
+            fields["source_y"] = scaled_y
         if self._place_position_in_group_coords:
-            fields["group_x"] = self._scale(p[0], xy_scalar)
-            fields["group_y"] = self._scale(p[1], xy_scalar)
+            fields["group_x"] = scaled_x
+            fields["group_y"] = scaled_y
         if self._place_position_in_cdp_coords:
-            fields["cdp_x"] = self._scale(p[0], xy_scalar)
-            fields["cdp_y"] = self._scale(p[1], xy_scalar)
+            fields["cdp_x"] = scaled_x
+            fields["cdp_y"] = scaled_y
+        return fields
+
+    def positions(self, xs, ys, xy_scalar):
+        """Trace header fields for many positions at once.
+
+        Args:
+            xs: An array of x coordinates.
+            ys: An array of y coordinates, the same length as xs.
+            xy_scalar: The coordinate scalar, one of XY_SCALARS.
+
+        Returns:
+            A dictionary mapping trace header field names to arrays of integral values,
+            rounded to the nearest multiple of the precision of the scalar.
+        """
+        scaled_xs = self._scale(np.asarray(xs), xy_scalar)
+        scaled_ys = self._scale(np.asarray(ys), xy_scalar)
+        fields = {}
+        if self._place_position_in_source_coords:
+            fields["source_x"] = scaled_xs
+            fields["source_y"] = scaled_ys
+        if self._place_position_in_group_coords:
+            fields["group_x"] = scaled_xs
+            fields["group_y"] = scaled_ys
+        if self._place_position_in_cdp_coords:
+            fields["cdp_x"] = scaled_xs
+            fields["cdp_y"] = scaled_ys
         return fields
 
     def _scale(self, coord, xy_scalar):
+        # A positive scalar multiplies, and a negative scalar divides, the stored value
         if xy_scalar > 0:
-            return coord / xy_scalar
+            return np.rint(np.divide(coord, xy_scalar))
         elif xy_scalar < 0:
-            return coord * xy_scalar
+            return np.rint(np.multiply(coord, -xy_scalar))
         else:
             raise ValueError("xy_scalar cannot be zero")
 
@@ -65,3 +150,56 @@ class TraceHeaderMapper:
         if self._place_trace_number_in_crossline_number:
             fields["crossline_number"] = trace_number
         return fields
+
+    def trace_numbers(self, trace_indexes):
+        """Trace header fields for many trace indexes at once.
+
+        Args:
+            trace_indexes: An array of zero-based trace indexes.
+
+        Returns:
+            A dictionary mapping trace header field names to arrays of values.
+        """
+        trace_numbers = self._base_trace_number + np.asarray(trace_indexes)
+        fields = {}
+        if self._place_trace_number_in_trace_number:
+            fields["trace_num"] = trace_numbers
+        if self._place_trace_number_in_crossline_number:
+            fields["crossline_number"] = trace_numbers
+        return fields
+
+    def inline_numbers(self, slice_index, num_traces):
+        """Trace header fields for the traces of one slice of a volume.
+
+        Args:
+            slice_index: The zero-based index of the slice.
+            num_traces: The number of traces for which fields are required.
+
+        Returns:
+            A dictionary mapping trace header field names to arrays of values.
+        """
+        fields = {}
+        if self._place_slice_number_in_inline_number:
+            fields["inline_number"] = np.full(num_traces, self._base_inline_number + slice_index)
+        return fields
+
+
+def optimal_xy_scalar(max_abs_coordinate, trace_header_format=TraceHeaderRev1):
+    """The most precise coordinate scalar with which coordinates of a given magnitude fit.
+
+    Args:
+        max_abs_coordinate: The greatest absolute value of any x or y coordinate.
+        trace_header_format: The class which defines the layout of the trace header.
+
+    Returns:
+        One of XY_SCALARS.
+
+    Raises:
+        ValueError: If the coordinates are too large for any scalar.
+    """
+    limit = LIMITS[trace_header_format.cdp_x.value_type.SEG_Y_TYPE].max
+    for xy_scalar in XY_SCALARS:
+        factor = -xy_scalar if xy_scalar < 0 else 1 / xy_scalar
+        if round(max_abs_coordinate * factor) <= limit:
+            return xy_scalar
+    raise ValueError(f"Coordinate {max_abs_coordinate} is too large to be stored in a trace header")
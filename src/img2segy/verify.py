@@ -0,0 +1,266 @@
+"""Verification of SEG-Y files against the images and configuration from which they were converted.
+
+The SEG-Y file is memory-mapped, and its reel headers, trace headers and samples are checked in
+blocks. So that a fault in the conversion is not reproduced by the check, the two things most
+likely to be wrong are checked independently of the code which wrote them: the coordinates in
+the trace headers are compared, within their stored precision, with positions interpolated
+directly between the control points of the Geometry, and the samples are compared with the
+grayscale pixels of the image by plain integer arithmetic rather than with the SampleEncoder.
+The samples are never encoded, so verification is faster than conversion. The remaining trace
+header fields, which are set directly from the configuration, are compared as bytes with those
+the writer would produce, and only when they differ field by field.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from segpy.datatypes import DataSampleFormat
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy import writer
+from img2segy.reader import map_segy
+
+# The binary reel header fields which determine how the traces are interpreted.
+BINARY_REEL_HEADER_FIELDS = ("num_samples", "sample_interval", "data_sample_format")
+
+# Trace header fields whose values must increase from trace to trace in a section, if they
+# are populated.
+MONOTONIC_FIELDS = ("trace_num", "crossline_number")
+
+# The pairs of trace header fields which may hold the position of each trace.
+COORDINATE_FIELDS = (("source_x", "source_y"), ("group_x", "group_y"), ("cdp_x", "cdp_y"))
+
+# The relative tolerance, beyond the rounding to the coordinate scalar, within which coordinates
+# must agree, allowing for the different order of floating point operations.
+COORDINATE_RELATIVE_TOLERANCE = 1e-9
+
+# The relative tolerance within which floating point samples must agree.
+FLOAT_SAMPLE_RELATIVE_TOLERANCE = 1e-6
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    """A difference between a SEG-Y file and the image from which it should have been converted.
+
+    Attributes:
+        subject: What differs, such as "num_traces", a header field name, or "samples".
+        description: A description of the difference.
+    """
+    subject: str
+    description: str
+
+    def __str__(self):
+        return f"{self.subject}: {self.description}"
+
+
+def verify_segy(
+        segy_filepath,
+        dataset,
+        *,
+        trace_header_format=TraceHeaderRev1,
+        block_num_bytes=writer.DEFAULT_BLOCK_NUM_BYTES,
+):
+    """Check a SEG-Y file against the image and configuration from which it was converted.
+
+    Args:
+        segy_filepath: The path to the SEG-Y file.
+        dataset: The ImageDataset, as it would be passed to write_segy(). Its samples are not
+            used, so it is best constructed with a strip_width, so that nothing is encoded.
+        trace_header_format: The class which defines the layout of the trace header.
+        block_num_bytes: The approximate number of bytes of trace data checked at once.
+
+    Returns:
+        A list of Mismatches, which is empty if the file is as expected.
+    """
+    try:
+        binary_reel_header, traces = map_segy(segy_filepath, trace_header_format)
+    except ValueError as e:
+        return [Mismatch("layout", str(e))]
+
+    mismatches = []
+    expected_binary_reel_header = dataset.binary_reel_header
+    for name in BINARY_REEL_HEADER_FIELDS:
+        actual = getattr(binary_reel_header, name)
+        expected = getattr(expected_binary_reel_header, name)
+        if actual != expected:
+            mismatches.append(Mismatch(name, f"{actual} in binary reel header, expected {expected}"))
+    if mismatches:
+        # The traces cannot be interpreted as expected
+        return mismatches
+
+    num_traces = dataset.num_traces()
+    if len(traces) != num_traces:
+        mismatches.append(Mismatch("num_traces", f"{len(traces)} traces, expected {num_traces}"))
+
+    populated = _populated_fields(dataset)
+    monotonic_fields = [name for name in MONOTONIC_FIELDS if name in populated]
+    coordinate_fields = [pair for pair in COORDINATE_FIELDS if pair[0] in populated]
+    independently_checked = {name for pair in coordinate_fields for name in pair}
+    positions = _Positions(dataset)
+    pixel_samples = _PixelSamples(dataset, binary_reel_header.data_sample_format)
+
+    header_mismatches = {}
+    samples_mismatch = _Differences()
+    non_monotonic = {}
+    previous_values = {}
+    block_num_traces = max(1, block_num_bytes // traces.dtype.itemsize)
+    for start in range(0, min(len(traces), num_traces), block_num_traces):
+        stop = min(start + block_num_traces, len(traces), num_traces)
+        headers = traces["header"][start:stop]
+        for name in monotonic_fields:
+            values = headers[name].astype(np.int64)
+            if name in previous_values:
+                values = np.concatenate(([previous_values[name]], values))
+                first_step_index = start
+            else:
+                first_step_index = start + 1
+            not_increasing = np.diff(values) <= 0
+            if not_increasing.any():
+                non_monotonic.setdefault(name, _Differences()).add(first_step_index, not_increasing)
+            previous_values[name] = values[-1]
+
+        expected_xs, expected_ys = positions.expected(start, stop)
+        for x_name, y_name in coordinate_fields:
+            for name, expected in ((x_name, expected_xs), (y_name, expected_ys)):
+                differing = positions.differing(headers[name], headers["xy_scalar"], expected)
+                if differing.any():
+                    header_mismatches.setdefault(name, _Differences()).add(start, differing)
+
+        expected_headers = writer.trace_header_array(dataset, start, stop, trace_header_format)
+        if not np.array_equal(_as_bytes(headers), _as_bytes(expected_headers)):
+            for name in expected_headers.dtype.names:
+                if name in independently_checked:
+                    continue
+                differing = headers[name] != expected_headers[name]
+                if differing.any():
+                    header_mismatches.setdefault(name, _Differences()).add(start, differing)
+
+        differing = pixel_samples.differing(traces["samples"][start:stop], start, stop)
+        if differing.any():
+            samples_mismatch.add(start, differing)
+
+    for name, differences in non_monotonic.items():
+        mismatches.append(Mismatch(name, differences.describe("do not increase from the previous trace")))
+    for name, differences in header_mismatches.items():
+        mismatches.append(Mismatch(name, differences.describe("differ")))
+    if samples_mismatch:
+        mismatches.append(Mismatch("samples", samples_mismatch.describe("differ")))
+    return mismatches
+
+
+def _populated_fields(dataset):
+    """The trace header fields which the dataset populates with a value for each trace.
+
+    Fields which the configuration leaves unpopulated are zero for every trace, so trace numbers
+    are not expected to increase, nor coordinates to follow the geometry.
+    """
+    columns = dataset.trace_header_columns(0, min(1, dataset.num_traces()))
+    # Fields common to every trace are constants rather than columns
+    return {name for name, values in columns.items() if np.ndim(values) > 0}
+
+
+class _Positions:
+    """The expected positions of traces, interpolated directly between control points."""
+
+    def __init__(self, dataset):
+        geometry = dataset.geometry
+        control_points = [
+            geometry.left_xy, *(waypoint.xy for waypoint in geometry.waypoints), geometry.right_xy
+        ]
+        self._xs = np.array([point[0] for point in control_points], dtype=float)
+        self._ys = np.array([point[1] for point in control_points], dtype=float)
+        self._proportions = geometry.control_point_proportions(dataset.source_width)
+        self._num_traces = dataset.num_traces()
+
+    def expected(self, start, stop):
+        """The expected x and y coordinates of a range of traces."""
+        # Each trace lies at the proportion of the width of the image given by its index
+        proportions = np.arange(start, stop) / self._num_traces
+        return (
+            np.interp(proportions, self._proportions, self._xs),
+            np.interp(proportions, self._proportions, self._ys),
+        )
+
+    @staticmethod
+    def differing(stored, xy_scalars, expected):
+        """Which stored coordinates differ from those expected by more than their precision.
+
+        Args:
+            stored: The coordinates as stored in the trace headers.
+            xy_scalars: The coordinate scalars stored in the trace headers.
+            expected: The expected coordinates.
+
+        Returns:
+            A boolean array which is True for each coordinate which differs.
+        """
+        # A positive scalar multiplies, and a negative scalar divides, the stored value. Zero
+        # is treated as one.
+        xy_scalars = xy_scalars.astype(float)
+        units = np.ones_like(xy_scalars)
+        np.copyto(units, xy_scalars, where=xy_scalars > 0)
+        np.divide(-1, xy_scalars, out=units, where=xy_scalars < 0)
+        # Coordinates are rounded to the nearest unit
+        tolerance = units / 2 + COORDINATE_RELATIVE_TOLERANCE * np.abs(expected)
+        return np.abs(stored * units - expected) > tolerance
+
+
+class _PixelSamples:
+    """Comparison of samples with the grayscale pixels from which they were converted.
+
+    Pixels are made signed by subtracting the mid-grey value of their bit depth, and then
+    shifted to the width of integer samples, or multiplied by the amplitude scale for floating
+    point samples.
+    """
+
+    def __init__(self, dataset, data_sample_format):
+        self._dataset = dataset
+        self._bits = dataset.pixel_bits
+        self._float = data_sample_format == DataSampleFormat.FLOAT32
+        self._amplitude_scale = dataset.sample_encoder.amplitude_scale
+
+    def differing(self, samples, start, stop):
+        """A boolean array which is True for each of a range of traces whose samples differ."""
+        pixels = self._dataset.trace_pixels_array(start, stop)
+        mid_grey = 1 << (self._bits - 1)
+        if self._float:
+            expected = (pixels.astype(np.float64) - mid_grey) * self._amplitude_scale
+            tolerance = FLOAT_SAMPLE_RELATIVE_TOLERANCE * np.abs(expected)
+            return (np.abs(samples - expected) > tolerance).any(axis=1)
+        shift = samples.dtype.itemsize * 8 - self._bits
+        # Signed 8-bit pixels shifted to the width of int16 samples still fit in an int16
+        values = np.subtract(pixels, mid_grey, dtype=np.int16 if self._bits == 8 else np.int32)
+        if shift >= 0:
+            values <<= shift
+        else:
+            # Arithmetic shift, discarding the least significant bits of the pixels
+            values >>= -shift
+        return (samples != values).any(axis=1)
+
+
+class _Differences:
+    """The number of traces which differ in some respect, and the index of the first."""
+
+    def __init__(self):
+        self._num_traces = 0
+        self._first_trace_index = None
+
+    def __bool__(self):
+        return self._num_traces > 0
+
+    def add(self, start, differing):
+        """Record the differences in a block of traces beginning at start.
+
+        Args:
+            start: The index of the first trace in the block.
+            differing: A boolean array which is True for each trace in the block which differs.
+        """
+        num_differing = int(np.count_nonzero(differing))
+        if num_differing and self._first_trace_index is None:
+            self._first_trace_index = start + int(np.argmax(differing))
+        self._num_traces += num_differing
+
+    def describe(self, difference):
+        return f"{self._num_traces} traces {difference}, the first being trace {self._first_trace_index}"
+
+
+def _as_bytes(headers):
+    return np.ascontiguousarray(headers).view(np.uint8)
@@ -0,0 +1,304 @@
+"""Assembly of many images into a single three-dimensional SEG-Y volume.
+
+Each image, or each page of a multi-page TIFF file, is one slice of the volume: an inline,
+with its own position in space, whose columns are the crosslines. Slices are decoded one at a
+time as their traces are written, so only one slice need be held in memory however large the
+volume.
+"""
+import math
+import threading
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from segpy.dataset import Dataset
+from segpy.toolkit import format_standard_textual_header
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.resampling import Resampling
+from img2segy.sample_encoder import SampleEncoder
+from img2segy.trace_header_mapper import TraceHeaderMapper
+from img2segy.version import __version__
+
+
+class ConfigurationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class VolumeSlice:
+    """One image, or one page of a multi-page image, and its position in space.
+
+    Attributes:
+        image_filepath: The path to the image file.
+        geometry: The position of the slice.
+        page: The zero-based index of the page within a multi-page image file.
+    """
+    image_filepath: Path
+    geometry: Geometry
+    page: int = 0
+
+
+def volume_slices(image_filepath, config, num_pages=1):
+    """The slices contributed to a volume by one image file.
+
+    The first page is positioned by the [position] section of the configuration. Each further
+    page of a multi-page image is displaced from the previous page by the [volume] page-offset
+    entries, so that the pages form a series of parallel slices.
+
+    Args:
+        image_filepath: The path to the image file.
+        config: The configuration of the image, as a dictionary.
+        num_pages: The number of pages in the image file.
+
+    Returns:
+        A list of VolumeSlices, one for each page.
+
+    Raises:
+        ConfigurationError: If the image has many pages and the page offset is missing.
+    """
+    geometry = Geometry.from_config(config)
+    if num_pages == 1:
+        return [VolumeSlice(Path(image_filepath), geometry)]
+    try:
+        page_offset = config["volume"]["page-offset"]
+        dx = float(page_offset.get("x", 0.0))
+        dy = float(page_offset.get("y", 0.0))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ConfigurationError(
+            f"{image_filepath} has {num_pages} pages, so [volume] page-offset.x and "
+            f"page-offset.y are required to position them: {e}"
+        ) from e
+    return [
+        VolumeSlice(Path(image_filepath), geometry.translated(page * dx, page * dy), page)
+        for page in range(num_pages)
+    ]
+
+
+class VolumeDataset(Dataset):
+    """A dataset of many slices, each of which is an inline of a three-dimensional volume.
+
+    Every slice must have the same number of traces and samples, after any resampling, the
+    same sample interval and the same data sample format. Crossline and trace numbers restart
+    in each slice, and the inline number is the index of the slice plus the base inline number.
+    """
+
+    def __init__(
+            self,
+            slices,
+            trace_header_mapper: TraceHeaderMapper,
+            *,
+            resampling: Resampling = None,
+            sample_encoder: SampleEncoder = None,
+    ):
+        """
+        Args:
+            slices: A sequence of VolumeSlices, in inline order.
+            trace_header_mapper: Determines which trace header fields are populated.
+            resampling: If provided, each slice is resampled as described for ImageDataset.
+            sample_encoder: Determines how pixel values are encoded as samples.
+
+        Raises:
+            ValueError: If there are no slices, or the slices differ in their dimensions,
+                sample interval or data sample format.
+        """
+        self._slices = list(slices)
+        if not self._slices:
+            raise ValueError("A volume requires at least one slice")
+        self._trace_header_mapper = trace_header_mapper
+        self._resampling = resampling
+        self._sample_encoder = sample_encoder or SampleEncoder()
+        self._check_slices_conform()
+        # Every slice stores its coordinates with the same scalar
+        self._xy_scalar = trace_header_mapper.xy_scalar(
+            max(volume_slice.geometry.max_abs_coordinate for volume_slice in self._slices)
+        )
+        # The reel headers common to the whole volume are those of the first slice, which is
+        # opened without decoding its samples.
+        self._first = self._open_slice(self._slices[0], strip_width=1)
+        self._slice_width = self._first.num_traces()
+        # Each thread retains the dataset of the slice it most recently used
+        self._slice_cache = threading.local()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(<{len(self._slices)} slices>)"
+
+    @property
+    def slices(self):
+        return self._slices
+
+    @property
+    def textual_reel_header(self):
+        first = self._slices[0].geometry
+        last = self._slices[-1].geometry
+        return format_standard_textual_header(**{
+            **self._first._textual_header_fields(),
+            "unassigned1": f"Converted from {self._num_images()} images by img2segy {__version__}",
+            "unassigned4": (
+                f"Volume : {len(self._slices)} inlines x {self._slice_width} crosslines x "
+                f"{self._first.binary_reel_header.num_samples} samples"
+            ),
+            "unassigned5": "",
+            "unassigned10": (
+                f"First inline : x = {first.left_xy[0]} y = {first.left_xy[1]} "
+                f"to x = {first.right_xy[0]} y = {first.right_xy[1]}"
+            ),
+            "unassigned11": (
+                f"Last inline : x = {last.left_xy[0]} y = {last.left_xy[1]} "
+                f"to x = {last.right_xy[0]} y = {last.right_xy[1]}"
+            ),
+            "unassigned13": "",
+        })
+
+    @property
+    def binary_reel_header(self):
+        return self._first.binary_reel_header
+
+    @property
+    def extended_textual_header(self):
+        return []
+
+    @property
+    def dimensionality(self):
+        return 3
+
+    def num_traces(self):
+        return len(self._slices) * self._slice_width
+
+    @property
+    def strip_width(self):
+        """The number of traces decoded at a time: the number of traces in each slice."""
+        return self._slice_width
+
+    def trace_header(self, trace_index):
+        fields = self.trace_header_columns(trace_index, trace_index + 1)
+        return TraceHeaderRev1(**{
+            name: value[0].item() if isinstance(value, np.ndarray) else value
+            for name, value in fields.items()
+        })
+
+    def trace_header_columns(self, start, stop):
+        """The trace header field values for a range of traces.
+
+        Returns:
+            A dictionary mapping trace header field names to either an array of values, one for
+            each trace in the range, or a single value common to all traces.
+        """
+        parts = [
+            {
+                **self._slice_dataset(slice_index).trace_header_columns(slice_start, slice_stop),
+                **self._trace_header_mapper.inline_numbers(slice_index, slice_stop - slice_start),
+            }
+            for slice_index, slice_start, slice_stop in self._slice_ranges(start, stop)
+        ]
+        if len(parts) == 1:
+            return parts[0]
+        return {
+            name: (
+                np.concatenate([part[name] for part in parts])
+                if isinstance(value, np.ndarray) else value
+            )
+            for name, value in parts[0].items()
+        }
+
+    def trace_samples(self, trace_index, start=None, stop=None):
+        return self.trace_samples_array(trace_index, trace_index + 1)[0, slice(start, stop)]
+
+    def trace_samples_array(self, start, stop):
+        """The samples for a range of traces, with one contiguous row per trace."""
+        parts = [
+            self._slice_dataset(slice_index).trace_samples_array(slice_start, slice_stop)
+            for slice_index, slice_start, slice_stop in self._slice_ranges(start, stop)
+        ]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _slice_ranges(self, start, stop):
+        """Divide a range of traces of the volume into ranges of traces within each slice.
+
+        Yields:
+            A (slice index, start, stop) tuple for each slice spanned by the range.
+        """
+        width = self._slice_width
+        for slice_index in range(start // width, (stop - 1) // width + 1):
+            offset = slice_index * width
+            yield slice_index, max(start, offset) - offset, min(stop, offset + width) - offset
+
+    def _slice_dataset(self, slice_index):
+        """The dataset of one slice, retaining only the most recently used slice."""
+        cache = self._slice_cache
+        if slice_index != getattr(cache, "slice_index", None):
+            cache.dataset = None
+            cache.dataset = self._open_slice(self._slices[slice_index])
+            cache.slice_index = slice_index
+        return cache.dataset
+
+    def _open_slice(self, volume_slice, strip_width=None):
+        image = Image.open(volume_slice.image_filepath)
+        image.seek(volume_slice.page)
+        if strip_width is None:
+            image.load()
+        return ImageDataset(
+            image,
+            volume_slice.geometry,
+            self._trace_header_mapper,
+            strip_width=strip_width,
+            resampling=self._resampling,
+            sample_encoder=self._sample_encoder,
+            xy_scalar=self._xy_scalar,
+        )
+
+    def _check_slices_conform(self):
+        """Check that every slice has the same shape and format, reading only image headers."""
+        expected = None
+        for image_filepath, path_slices in groupby(self._slices, key=lambda s: s.image_filepath):
+            with Image.open(image_filepath) as image:
+                for volume_slice in path_slices:
+                    image.seek(volume_slice.page)
+                    properties = self._slice_properties(volume_slice, image)
+                    if expected is None:
+                        expected = properties
+                    elif not _conforms(properties, expected):
+                        raise ValueError(
+                            f"{_describe(volume_slice)} has {_describe_properties(properties)} "
+                            f"but {_describe(self._slices[0])} has {_describe_properties(expected)}"
+                        )
+
+    def _slice_properties(self, volume_slice, image):
+        width, height = image.size
+        if self._resampling is not None:
+            width, height = self._resampling.size(volume_slice.geometry, width, height)
+        return (
+            width,
+            height,
+            volume_slice.geometry.sample_interval_z(height),
+            self._sample_encoder.data_sample_format(image.mode),
+        )
+
+    def _num_images(self):
+        return len({volume_slice.image_filepath for volume_slice in self._slices})
+
+
+def _conforms(properties, expected):
+    width, height, sample_interval, data_sample_format = properties
+    expected_width, expected_height, expected_sample_interval, expected_data_sample_format = expected
+    return (
+        (width, height, data_sample_format) == (expected_width, expected_height, expected_data_sample_format)
+        and math.isclose(sample_interval, expected_sample_interval)
+    )
+
+
+def _describe(volume_slice):
+    page = f" page {volume_slice.page}" if volume_slice.page else ""
+    return f"{Path(volume_slice.image_filepath).name}{page}"
+
+
+def _describe_properties(properties):
+    width, height, sample_interval, data_sample_format = properties
+    return (
+        f"{width} traces x {height} samples at interval {sample_interval} "
+        f"in format {data_sample_format.name}"
+    )
@@ -0,0 +1,484 @@
+"""A bulk SEG-Y writer.
+
+Rather than packing each trace header and each trace of samples individually, as
+segpy.writer.write_segy does, the trace headers for a block of traces are assembled into
+a single NumPy structured array which is interleaved with the samples for those traces
+and written to the file with one call. Alternatively, since traces have a fixed length and
+the layout of the file is known in advance, the file can be preallocated and the traces
+assigned into a memory mapping of it.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+from segpy.datatypes import LIMITS, SEG_Y_TYPE_TO_CTYPE
+from segpy.encoding import ASCII, is_supported_encoding, UnsupportedEncodingError
+from segpy.toolkit import (
+    REEL_HEADER_NUM_BYTES,
+    TEXTUAL_HEADER_NUM_BYTES,
+    TRACE_HEADER_NUM_BYTES,
+    write_binary_reel_header,
+    write_extended_textual_headers,
+    write_textual_reel_header,
+)
+from segpy.trace_header import TraceHeaderRev1
+
+# The approximate number of bytes of trace data to accumulate before each write.
+DEFAULT_BLOCK_NUM_BYTES = 16 * 1024 * 1024
+
+
+def write_segy(
+        fh,
+        dataset,
+        encoding=None,
+        trace_header_format=TraceHeaderRev1,
+        endian='>',
+        progress=None,
+        block_num_bytes=DEFAULT_BLOCK_NUM_BYTES,
+):
+    """Write a dataset with fixed-length traces to SEG-Y.
+
+    This is a drop-in replacement for segpy.writer.write_segy which produces identical
+    output, but serializes traces in blocks rather than one at a time.
+
+    Args:
+        fh: A file-like object open for binary write, positioned to write the textual reel header.
+            It is written strictly sequentially, so need not be seekable; it may be a pipe.
+
+        dataset: An object implementing the interface of segpy.dataset.Dataset, such as an
+            ImageDataset. All traces must have the number of samples given in the binary
+            reel header.
+
+        encoding: Optional encoding for text data. Typically 'cp037' for EBCDIC or 'ascii' for
+            ASCII. If omitted, the dataset object will be queried for an encoding property.
+
+        trace_header_format: The class which defines the layout of the trace header. Defaults
+            to TraceHeaderRev1.
+
+        endian: Big endian by default.
+
+        progress: A unary callable which will be passed a number between zero and one
+            indicating the progress made.
+
+        block_num_bytes: The approximate number of bytes of trace data serialized with each
+            write. Ignored if the dataset has a strip_width attribute which is not None, in
+            which case each write contains one strip of traces.
+
+    Raises:
+        UnsupportedEncodingError: If the specified encoding is neither ASCII nor EBCDIC.
+        ValueError: If a trace header value is out of range for its field, or the data
+            sample format is not supported.
+    """
+    progress_callback = _progress_callback(progress)
+    layout = write_reel_headers(fh, dataset, encoding, trace_header_format, endian)
+    num_traces = layout.num_traces
+
+    blocks = trace_blocks(dataset, 0, num_traces, layout.trace_dtype.itemsize, block_num_bytes)
+    for start, stop in blocks:
+        block = np.zeros(stop - start, dtype=layout.trace_dtype)
+        block["header"] = trace_header_array(dataset, start, stop, trace_header_format, endian)
+        block["samples"] = trace_samples_array(dataset, start, stop)
+        fh.write(block.view(np.uint8))
+        progress_callback(stop / num_traces)
+
+    progress_callback(1)
+
+
+def write_segy_mapped(
+        fh,
+        dataset,
+        encoding=None,
+        trace_header_format=TraceHeaderRev1,
+        endian='>',
+        progress=None,
+        block_num_bytes=DEFAULT_BLOCK_NUM_BYTES,
+        workers=1,
+):
+    """Write a dataset with fixed-length traces to SEG-Y through a memory mapping.
+
+    The size of the file is known up front, so it is preallocated once the reel headers have
+    been written, and the trace headers and samples are written by assignment into a memory
+    mapping of the trace region rather than through buffered file writes. The output is
+    identical to that of write_segy().
+
+    Since every trace is at a known offset, the traces can be divided into shards which are
+    encoded and written concurrently by a pool of threads.
+
+    Args:
+        fh: A file-like object with a fileno() open for binary read and write (e.g. mode 'w+b')
+            positioned at the beginning of an empty file.
+
+        dataset, encoding, trace_header_format, endian, progress, block_num_bytes: As for
+            write_segy().
+
+        workers: The number of threads across which the traces will be sharded. If more than
+            one, the dataset must support concurrent calls to its methods.
+
+    Raises:
+        UnsupportedEncodingError: If the specified encoding is neither ASCII nor EBCDIC.
+        ValueError: If a trace header value is out of range for its field, or the data
+            sample format is not supported.
+    """
+    progress_callback = _progress_callback(progress)
+    layout = write_reel_headers(fh, dataset, encoding, trace_header_format, endian)
+    fh.flush()
+    preallocate(fh, layout.file_size)
+    traces = map_traces(fh, layout)
+    try:
+        shards = trace_shards(layout.num_traces, workers, getattr(dataset, "strip_width", None))
+        if len(shards) == 1:
+            fill_traces(
+                traces,
+                dataset,
+                0,
+                layout.num_traces,
+                trace_header_format,
+                endian,
+                block_num_bytes,
+                progress_callback,
+            )
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        fill_traces,
+                        traces,
+                        dataset,
+                        start,
+                        stop,
+                        trace_header_format,
+                        endian,
+                        block_num_bytes,
+                    )
+                    for start, stop in shards
+                ]
+                for num_completed, future in enumerate(as_completed(futures), start=1):
+                    future.result()
+                    progress_callback(num_completed / len(futures))
+        traces.flush()
+    finally:
+        del traces
+    progress_callback(1)
+
+
+def trace_shards(num_traces, num_shards, alignment=None):
+    """Divide the traces into contiguous ranges of approximately equal size.
+
+    Args:
+        num_traces: The total number of traces.
+        num_shards: The maximum number of shards.
+        alignment: If provided, each shard other than the last begins and ends at a multiple of
+            this number of traces, so that strips are not shared between shards.
+
+    Returns:
+        A list of (start, stop) pairs of trace indexes.
+    """
+    alignment = alignment or 1
+    num_units = -(-num_traces // alignment)
+    num_shards = max(1, min(num_shards, num_units))
+    boundaries = [
+        min(num_traces, (num_units * shard_index // num_shards) * alignment)
+        for shard_index in range(num_shards + 1)
+    ]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+@dataclass(frozen=True)
+class SegYLayout:
+    """The arrangement of the bytes of a SEG-Y file with fixed-length traces."""
+
+    num_traces: int
+    trace_dtype: np.dtype
+    num_extended_textual_headers: int = 0
+
+    @property
+    def traces_offset(self):
+        """The offset in bytes of the first trace header from the start of the file."""
+        return REEL_HEADER_NUM_BYTES + self.num_extended_textual_headers * TEXTUAL_HEADER_NUM_BYTES
+
+    def trace_offset(self, trace_index):
+        """The offset in bytes of a trace header from the start of the file."""
+        return self.traces_offset + trace_index * self.trace_dtype.itemsize
+
+    @property
+    def file_size(self):
+        """The size of the whole file in bytes."""
+        return self.trace_offset(self.num_traces)
+
+
+def write_reel_headers(fh, dataset, encoding=None, trace_header_format=TraceHeaderRev1, endian='>'):
+    """Write the textual, binary and extended textual reel headers of a dataset.
+
+    Args:
+        fh: A file-like object open for binary write, positioned to write the textual reel header.
+        dataset: An object implementing the interface of segpy.dataset.Dataset.
+        encoding: Optional encoding for text data. If omitted, the dataset object will be
+            queried for an encoding property.
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: '>' for big-endian, '<' for little-endian.
+
+    Returns:
+        A SegYLayout describing the file being written.
+
+    Raises:
+        UnsupportedEncodingError: If the specified encoding is neither ASCII nor EBCDIC.
+    """
+    encoding = encoding or (hasattr(dataset, 'encoding') and dataset.encoding) or ASCII
+
+    if not is_supported_encoding(encoding):
+        raise UnsupportedEncodingError("Writing SEG Y", encoding)
+
+    binary_reel_header = dataset.binary_reel_header
+    extended_textual_header = dataset.extended_textual_header
+    write_textual_reel_header(fh, dataset.textual_reel_header, encoding)
+    write_binary_reel_header(fh, binary_reel_header, endian)
+    if extended_textual_header:
+        # segpy seeks to the end of the binary reel header before writing the extended textual
+        # headers, which streams don't support, so they are formatted in a buffer.
+        buffer = io.BytesIO()
+        write_extended_textual_headers(buffer, extended_textual_header, encoding)
+        fh.write(buffer.getbuffer()[REEL_HEADER_NUM_BYTES:])
+
+    return SegYLayout(
+        num_traces=dataset.num_traces(),
+        trace_dtype=trace_dtype(
+            binary_reel_header.num_samples,
+            dataset.data_sample_format,
+            trace_header_format,
+            endian,
+        ),
+        num_extended_textual_headers=len(extended_textual_header),
+    )
+
+
+def trace_blocks(dataset, start, stop, trace_num_bytes, block_num_bytes=DEFAULT_BLOCK_NUM_BYTES):
+    """Divide a range of traces into blocks which will be serialized together.
+
+    Datasets with a strip_width attribute which is not None are divided into strips, otherwise
+    each block contains approximately block_num_bytes of trace data.
+
+    Args:
+        dataset: The dataset to be serialized.
+        start: The index of the first trace.
+        stop: One beyond the index of the last trace.
+        trace_num_bytes: The number of bytes occupied by each trace, including its header.
+        block_num_bytes: The approximate number of bytes in each block.
+
+    Yields:
+        A (start, stop) pair of trace indexes for each block.
+    """
+    block_num_traces = (
+        getattr(dataset, "strip_width", None)
+        or max(1, block_num_bytes // trace_num_bytes)
+    )
+    for block_start in range(start, stop, block_num_traces):
+        yield block_start, min(block_start + block_num_traces, stop)
+
+
+def preallocate(fh, num_bytes):
+    """Extend a file to a given size, reserving space for it where the filesystem allows."""
+    fh.truncate(num_bytes)
+    try:
+        os.posix_fallocate(fh.fileno(), 0, num_bytes)
+    except (AttributeError, OSError):
+        # Not available on this platform or filesystem; the file will be sparse.
+        pass
+
+
+def map_traces(file, layout, mode='r+'):
+    """Memory-map the traces of a SEG-Y file as a structured array.
+
+    Args:
+        file: A filename or a file object open for binary read (and write, if mode is 'r+').
+        layout: A SegYLayout describing the file.
+        mode: 'r+' for read-write access, 'r' for read-only access.
+
+    Returns:
+        A numpy.memmap with one record per trace, each with "header" and "samples" fields.
+    """
+    return np.memmap(
+        file,
+        dtype=layout.trace_dtype,
+        mode=mode,
+        offset=layout.traces_offset,
+        shape=(layout.num_traces,),
+    )
+
+
+def fill_traces(
+        traces,
+        dataset,
+        start,
+        stop,
+        trace_header_format=TraceHeaderRev1,
+        endian='>',
+        block_num_bytes=DEFAULT_BLOCK_NUM_BYTES,
+        progress=None,
+):
+    """Populate a range of traces in a (typically memory-mapped) structured array of traces.
+
+    Disjoint ranges of the same file may be filled independently, for example by different
+    workers, each with its own mapping obtained from map_traces().
+
+    Args:
+        traces: A structured array with the dtype given by trace_dtype(), whose padding bytes
+            are already zero, such as the mapping of a freshly preallocated file.
+        dataset: The dataset from which trace headers and samples will be obtained.
+        start: The index of the first trace to be filled.
+        stop: One beyond the index of the last trace to be filled.
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: The byte order of the traces: '>' for big-endian, '<' for little-endian.
+            Trace headers are assembled in this byte order, so they are assigned without
+            conversion.
+        block_num_bytes: The approximate number of bytes of trace data to assign at once.
+        progress: A unary callable which will be passed the proportion of the range filled.
+    """
+    progress_callback = _progress_callback(progress)
+    headers = traces["header"]
+    samples = traces["samples"]
+    blocks = trace_blocks(dataset, start, stop, traces.dtype.itemsize, block_num_bytes)
+    for block_start, block_stop in blocks:
+        headers[block_start:block_stop] = trace_header_array(
+            dataset, block_start, block_stop, trace_header_format, endian
+        )
+        samples[block_start:block_stop] = trace_samples_array(dataset, block_start, block_stop)
+        progress_callback((block_stop - start) / (stop - start))
+
+
+def trace_header_dtype(trace_header_format=TraceHeaderRev1, endian='>'):
+    """A NumPy structured dtype with the same binary layout as a trace header format.
+
+    Args:
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: '>' for big-endian, '<' for little-endian.
+
+    Returns:
+        A numpy.dtype with one named field for each field of the trace header format.
+    """
+    names = trace_header_format.ordered_field_names()
+    fields = [getattr(trace_header_format, name) for name in names]
+    return np.dtype({
+        "names": list(names),
+        "formats": [endian + SEG_Y_TYPE_TO_CTYPE[field.value_type.SEG_Y_TYPE] for field in fields],
+        "offsets": [field.offset - 1 for field in fields],
+        "itemsize": TRACE_HEADER_NUM_BYTES,
+    })
+
+
+def sample_dtype(seg_y_type, endian='>'):
+    """A NumPy dtype for samples of the given SEG Y type.
+
+    Raises:
+        ValueError: If the SEG Y type has no NumPy equivalent (i.e. IBM floats).
+    """
+    ctype = SEG_Y_TYPE_TO_CTYPE[seg_y_type]
+    if ctype == 'ibm':
+        raise ValueError(f"Data sample format {seg_y_type} is not supported by the native writer")
+    return np.dtype(endian + ctype)
+
+
+def trace_dtype(num_samples, seg_y_type, trace_header_format=TraceHeaderRev1, endian='>'):
+    """A NumPy structured dtype for a whole trace: the trace header followed by its samples."""
+    return np.dtype([
+        ("header", trace_header_dtype(trace_header_format, endian)),
+        ("samples", sample_dtype(seg_y_type, endian), (num_samples,)),
+    ])
+
+
+def trace_header_array(dataset, start, stop, trace_header_format=TraceHeaderRev1, endian='>'):
+    """Assemble the trace headers for a range of traces into a structured array.
+
+    If the dataset provides a trace_header_columns(start, stop) method returning a mapping of
+    field names to arrays (or scalars) of values it will be used, otherwise the headers are
+    gathered trace by trace. Fields not supplied by the dataset take their default values.
+
+    Args:
+        dataset: The dataset from which trace headers will be obtained.
+        start: The index of the first trace.
+        stop: One beyond the index of the last trace.
+        trace_header_format: The class which defines the layout of the trace header.
+        endian: '>' for big-endian, '<' for little-endian.
+
+    Returns:
+        A structured array of length stop - start, with dtype given by trace_header_dtype().
+
+    Raises:
+        ValueError: If a value is out of range for its field.
+    """
+    dtype = trace_header_dtype(trace_header_format, endian)
+    try:
+        bulk_trace_header = dataset.trace_header_columns
+    except AttributeError:
+        headers = [dataset.trace_header(trace_index) for trace_index in range(start, stop)]
+        array = np.zeros(len(headers), dtype=dtype)
+        for name in dtype.names:
+            array[name] = [getattr(header, name) for header in headers]
+        return array
+
+    array = default_trace_header_array(stop - start, trace_header_format, endian)
+    for name, values in bulk_trace_header(start, stop).items():
+        array[name] = field_values(name, values, trace_header_format)
+    return array
+
+
+def default_trace_header_array(num_traces, trace_header_format=TraceHeaderRev1, endian='>'):
+    """A structured array of trace headers with every field set to its default value."""
+    dtype = trace_header_dtype(trace_header_format, endian)
+    array = np.zeros(num_traces, dtype=dtype)
+    for name in dtype.names:
+        default = getattr(trace_header_format, name).default
+        if default:
+            array[name] = default
+    return array
+
+
+def field_values(name, values, trace_header_format=TraceHeaderRev1):
+    """Convert values to integers suitable for a trace header field.
+
+    Floating point values are truncated towards zero, as they would be by the integer
+    field types of the trace header format.
+
+    Args:
+        name: The name of the trace header field.
+        values: A scalar or an array of values.
+        trace_header_format: The class which defines the layout of the trace header.
+
+    Returns:
+        An integer array of values.
+
+    Raises:
+        ValueError: If any value is outside the range of the field type.
+    """
+    values = np.trunc(np.asarray(values, dtype=float)).astype(np.int64)
+    limits = LIMITS[getattr(trace_header_format, name).value_type.SEG_Y_TYPE]
+    if values.size and (values.min() < limits.min or values.max() > limits.max):
+        raise ValueError(
+            f"Values for {name} attribute in range {values.min()} to {values.max()} "
+            f"outside range {limits.min} to {limits.max}"
+        )
+    return values
+
+
+def trace_samples_array(dataset, start, stop):
+    """Assemble the samples for a range of traces into a two-dimensional array.
+
+    If the dataset provides a trace_samples_array(start, stop) method it will be used,
+    otherwise samples are gathered trace by trace.
+
+    Returns:
+        An array with one row per trace.
+    """
+    try:
+        bulk_trace_samples = dataset.trace_samples_array
+    except AttributeError:
+        return np.stack([dataset.trace_samples(trace_index) for trace_index in range(start, stop)])
+    return bulk_trace_samples(start, stop)
+
+
+def _progress_callback(progress):
+    progress_callback = progress if progress is not None else lambda p: None
+    if not callable(progress_callback):
+        raise TypeError("write_segy(): progress callback must be callable")
+    return progress_callback
@@ -1,7 +1,14 @@
+import shutil
 from pathlib import Path
 
+import numpy as np
 import pytest
 import toml
+from PIL import Image
+
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.trace_header_mapper import TraceHeaderMapper
 
 TESTS_DIRPATH = Path(__file__).resolve().parent
 DATA_DIRPATH = TESTS_DIRPATH.parent / "data"
@@ -16,3 +23,27 @@ def example_dirpath() -> Path:
 def example_config(example_dirpath):
     config_filepath = example_dirpath / "example.toml"
     return toml.load(config_filepath)
+
+
+@pytest.fixture
+def example_image():
+    rng = np.random.default_rng(seed=0)
+    return Image.fromarray(rng.integers(0, 256, size=(300, 400), dtype=np.uint8))
+
+
+@pytest.fixture
+def example_dataset(example_config, example_image):
+    return ImageDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+    )
+
+
+@pytest.fixture
+def example_image_filepath(tmp_path, example_image, example_dirpath) -> Path:
+    """An image file accompanied by a configuration file of the same name."""
+    image_filepath = tmp_path / "example.png"
+    example_image.save(image_filepath)
+    shutil.copy(example_dirpath / "example.toml", image_filepath.with_suffix(".toml"))
+    return image_filepath
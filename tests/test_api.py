@@ -0,0 +1,250 @@
+import gzip
+import io
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from img2segy import api, defaults
+from img2segy.image_dataset import ImageDataset
+from img2segy.profiling import Profile
+
+
+@pytest.fixture
+def batch_dirpath(example_image_filepath):
+    """A directory of three images, the last of which lacks a configuration file."""
+    dirpath = example_image_filepath.parent
+    shutil.copy(example_image_filepath, dirpath / "second.png")
+    shutil.copy(example_image_filepath.with_suffix(".toml"), dirpath / "second.toml")
+    shutil.copy(example_image_filepath, dirpath / "unconfigured.png")
+    return dirpath
+
+
+def test_convert_writes_segy_beside_image(example_image_filepath):
+    api.convert(example_image_filepath)
+    assert example_image_filepath.with_suffix(".segy").exists()
+
+
+def test_convert_with_unknown_engine_raises_value_error(example_image_filepath):
+    with pytest.raises(ValueError):
+        api.convert(example_image_filepath, engine="unknown")
+
+
+def test_find_conversions_in_directory(batch_dirpath):
+    conversions = list(api.find_conversions([batch_dirpath]))
+    names = [conversion.image_filepath.name for conversion in conversions]
+    assert names == ["example.png", "second.png", "unconfigured.png"]
+
+
+def test_find_conversions_with_glob_excludes_duplicates(batch_dirpath):
+    conversions = list(api.find_conversions([batch_dirpath / "*", batch_dirpath / "example.png"]))
+    assert len(conversions) == 3
+
+
+def test_read_manifest_resolves_paths_relative_to_manifest(tmp_path):
+    manifest_filepath = tmp_path / "manifest.toml"
+    manifest_filepath.write_text(
+        '[[conversion]]\n'
+        'image = "a.png"\n'
+        '[[conversion]]\n'
+        'image = "b.png"\n'
+        'segy = "out/b.segy"\n'
+    )
+    conversions = api.read_manifest(manifest_filepath)
+    assert conversions == [
+        api.Conversion(tmp_path / "a.png"),
+        api.Conversion(tmp_path / "b.png", segy_filepath=tmp_path / "out" / "b.segy"),
+    ]
+
+
+def test_read_malformed_manifest_raises_configuration_error(tmp_path):
+    manifest_filepath = tmp_path / "manifest.toml"
+    manifest_filepath.write_text('[[conversion]]\nsegy = "a.segy"\n')
+    with pytest.raises(api.ConfigurationError):
+        api.read_manifest(manifest_filepath)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_many_reports_each_outcome(batch_dirpath, workers):
+    results = list(api.convert_many(api.find_conversions([batch_dirpath]), workers=workers))
+    outcomes = {result.conversion.image_filepath.name: result.succeeded for result in results}
+    assert outcomes == {"example.png": True, "second.png": True, "unconfigured.png": False}
+    assert (batch_dirpath / "second.segy").exists()
+
+
+def test_sharded_convert_is_identical_to_unsharded(example_image_filepath, tmp_path):
+    api.convert(example_image_filepath, tmp_path / "unsharded.segy")
+    api.convert(example_image_filepath, tmp_path / "sharded.segy", workers=4, strip_width=32)
+    assert (tmp_path / "sharded.segy").read_bytes() == (tmp_path / "unsharded.segy").read_bytes()
+
+
+def test_sharded_convert_encodes_each_shard_separately(example_image_filepath, tmp_path, monkeypatch):
+    encoded_widths = []
+    encode_samples = ImageDataset._encode_samples
+
+    def recording_encode_samples(self, image):
+        encoded_widths.append(image.width)
+        return encode_samples(self, image)
+
+    monkeypatch.setattr(ImageDataset, "_encode_samples", recording_encode_samples)
+    api.convert(example_image_filepath, tmp_path / "unsharded.segy")
+    assert encoded_widths == [400]
+    encoded_widths.clear()
+    api.convert(example_image_filepath, tmp_path / "sharded.segy", workers=2)
+    assert encoded_widths == [200, 200]
+    assert (tmp_path / "sharded.segy").read_bytes() == (tmp_path / "unsharded.segy").read_bytes()
+
+
+def test_convert_skips_up_to_date_output(example_image_filepath):
+    assert api.convert(example_image_filepath)
+    assert not api.convert(example_image_filepath)
+
+
+def test_convert_with_force_does_not_skip(example_image_filepath):
+    api.convert(example_image_filepath)
+    assert api.convert(example_image_filepath, force=True)
+
+
+def test_convert_after_config_change_does_not_skip(example_image_filepath):
+    api.convert(example_image_filepath)
+    config_filepath = example_image_filepath.with_suffix(".toml")
+    config_filepath.write_text(config_filepath.read_text().replace("4300", "4200"))
+    assert api.convert(example_image_filepath)
+
+
+def test_convert_one_reports_rather_than_raises_error(batch_dirpath):
+    result = api.convert_one(api.Conversion(batch_dirpath / "unconfigured.png"))
+    assert not result.succeeded
+    assert "unconfigured.toml" in result.error
+    assert not (batch_dirpath / "unconfigured.segy").exists()
+
+
+def test_convert_many_reports_up_to_date_outputs(example_image_filepath):
+    api.convert(example_image_filepath)
+    results = list(api.convert_many([api.Conversion(example_image_filepath)], workers=1))
+    assert results[0].up_to_date
+
+
+def test_convert_records_each_stage_in_profile(example_image_filepath):
+    profile = Profile()
+    api.convert(example_image_filepath, profile=profile)
+    assert [stats.name for stats in profile.stages] == [
+        "configure", "digest", "decode", "encode", "headers", "write",
+    ]
+    assert profile.num_traces == 400
+
+
+def test_convert_many_includes_stats_when_profiled(example_image_filepath):
+    (result,) = api.convert_many([api.Conversion(example_image_filepath)], profile=True)
+    assert result.succeeded
+    assert result.stats["num_traces"] == 400
+
+
+def test_writers_match_engine_names():
+    assert tuple(api.WRITERS) == defaults.ENGINES
+
+
+def test_convert_to_stream_matches_convert_to_file(example_image_filepath):
+    stream = io.BytesIO()
+    assert api.convert(example_image_filepath, stream)
+    api.convert(example_image_filepath)
+    assert stream.getvalue() == example_image_filepath.with_suffix(".segy").read_bytes()
+
+
+def test_convert_to_stream_does_not_record_manifest(example_image_filepath):
+    api.convert(example_image_filepath, io.BytesIO())
+    assert not list(example_image_filepath.parent.glob("*.img2segy.json"))
+
+
+def test_convert_to_stream_with_mmap_engine_raises_value_error(example_image_filepath):
+    with pytest.raises(ValueError):
+        api.convert(example_image_filepath, io.BytesIO(), engine="mmap")
+
+
+def test_convert_to_gzip_matches_uncompressed(example_image_filepath, tmp_path):
+    api.convert(example_image_filepath)
+    compressed_filepath = tmp_path / "example.segy.gz"
+    api.convert(example_image_filepath, compressed_filepath, workers=2)
+    segy_bytes = example_image_filepath.with_suffix(".segy").read_bytes()
+    assert gzip.decompress(compressed_filepath.read_bytes()) == segy_bytes
+    assert not api.convert(example_image_filepath, compressed_filepath)
+
+
+def test_convert_to_zarr(example_image_filepath, tmp_path):
+    dirpath = tmp_path / "example.zarr"
+    assert api.convert(example_image_filepath, dirpath)
+    assert (dirpath / "samples" / ".zarray").exists()
+
+
+def test_compressed_output_with_mmap_engine_raises_value_error(example_image_filepath, tmp_path):
+    with pytest.raises(ValueError):
+        api.convert(example_image_filepath, tmp_path / "example.segy.gz", engine="mmap")
+
+
+def test_convert_with_unavailable_codec_does_not_create_output(example_image_filepath, tmp_path):
+    try:
+        import zstandard  # noqa: F401
+        pytest.skip("zstandard is installed")
+    except ImportError:
+        pass
+    with pytest.raises(ValueError):
+        api.convert(example_image_filepath, tmp_path / "example.segy.zst")
+    assert not (tmp_path / "example.segy.zst").exists()
+
+
+def segy_traces(segy_bytes):
+    """The SEG-Y data beyond the textual reel header, which names the image file."""
+    return segy_bytes[3200:]
+
+
+@pytest.fixture
+def reference_segy(example_image_filepath):
+    api.convert(example_image_filepath)
+    return example_image_filepath.with_suffix(".segy").read_bytes()
+
+
+@pytest.mark.parametrize(
+    "make_image",
+    [
+        lambda filepath: filepath.read_bytes(),
+        lambda filepath: bytearray(filepath.read_bytes()),
+        lambda filepath: io.BytesIO(filepath.read_bytes()),
+        lambda filepath: Image.open(filepath),
+        lambda filepath: np.asarray(Image.open(filepath)),
+    ],
+    ids=["bytes", "bytearray", "buffer", "image", "array"],
+)
+def test_convert_image_matches_convert(
+        example_image_filepath, example_config, reference_segy, make_image
+):
+    segy_bytes = api.convert_image(make_image(example_image_filepath), example_config)
+    assert segy_traces(segy_bytes) == segy_traces(reference_segy)
+
+
+def test_convert_image_writes_to_stream(example_image, example_config):
+    stream = io.BytesIO()
+    assert api.convert_image(example_image, example_config, stream) is None
+    assert stream.getvalue() == api.convert_image(example_image, example_config)
+
+
+def test_convert_image_of_16_bit_array_writes_int16_samples(example_config):
+    pixels = np.full((200, 10), 0x8001, dtype=np.uint16)
+    segy_bytes = api.convert_image(pixels, example_config)
+    assert len(segy_bytes) == 3600 + 10 * (240 + 200 * 2)
+    assert segy_bytes[3840:3842] == b"\x00\x01"
+
+
+@pytest.mark.parametrize(
+    "pixels",
+    [np.zeros((20, 10, 3), dtype=np.uint8), np.zeros((20, 10), dtype=np.float32)],
+    ids=["rgb", "float"],
+)
+def test_convert_image_of_unsupported_array_raises_value_error(example_config, pixels):
+    with pytest.raises(ValueError):
+        api.convert_image(pixels, example_config)
+
+
+def test_convert_image_of_unsupported_type_raises_type_error(example_config):
+    with pytest.raises(TypeError):
+        api.convert_image("example.png", example_config)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from img2segy import api, benchmark
+from img2segy.benchmark import Workload
+
+
+def test_workloads_are_every_combination_smallest_first():
+    workloads = benchmark.workloads(widths=(40, 10), heights=(5,), bit_depths=(16, 8))
+    assert [workload.name for workload in workloads] == ["10x5x8", "10x5x16", "40x5x8", "40x5x16"]
+
+
+@pytest.mark.parametrize("width, height, bits", [(0, 10, 8), (10, 1, 8), (10, 10, 12)])
+def test_invalid_workload(width, height, bits):
+    with pytest.raises(ValueError):
+        Workload(width, height, bits)
+
+
+@pytest.mark.parametrize("bits, dtype", [(8, np.uint8), (16, np.uint16)])
+def test_synthetic_image_has_workload_dimensions(bits, dtype):
+    image = benchmark.synthetic_image(Workload(30, 20, bits))
+    assert image.size == (30, 20)
+    assert np.asarray(image).dtype == dtype
+
+
+def test_generated_workload_can_be_converted(tmp_path):
+    image_filepath = benchmark.generate(tmp_path, Workload(30, 20, 16))
+    assert api.convert(image_filepath)
+    assert image_filepath.with_suffix(".segy").stat().st_size == 3600 + 30 * (240 + 20 * 2)
+
+
+def test_run_times_each_stage(tmp_path):
+    results = benchmark.run([Workload(30, 20)], repeat=1, dirpath=tmp_path, isolate=False)
+    (result,) = results["results"]
+    assert result["workload"]["name"] == "30x20x8"
+    assert result["num_traces"] == 30
+    assert result["segy_num_bytes"] == 3600 + 30 * (240 + 20)
+    assert set(result["stages"]) == {"construct", "headers", "encode", "write"}
+    for timing in result["stages"].values():
+        assert timing["seconds"] > 0
+        assert timing["traces_per_second"] == pytest.approx(30 / timing["seconds"])
+
+
+def test_compare_reports_regressions_beyond_tolerance():
+    def results(**seconds):
+        return {
+            "results": [
+                {
+                    "workload": {"name": "30x20x8"},
+                    "stages": {stage: {"seconds": s} for stage, s in seconds.items()},
+                }
+            ]
+        }
+
+    baseline = results(headers=1.0, write=1.0)
+    current = results(headers=1.05, write=1.2, encode=5.0)
+    assert benchmark.compare(baseline, current, tolerance=0.1) == [("30x20x8", "write", 1.0, 1.2)]
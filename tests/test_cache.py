@@ -0,0 +1,41 @@
+from img2segy import cache
+
+
+def test_manifest_filepath_is_beside_segy(tmp_path):
+    assert cache.manifest_filepath(tmp_path / "a.segy") == tmp_path / "a.segy.img2segy.json"
+
+
+def test_digest_depends_on_config(example_image_filepath, example_config):
+    other_config = dict(example_config, extra={"key": 1})
+    assert (
+        cache.source_digest(example_image_filepath, example_config)
+        != cache.source_digest(example_image_filepath, other_config)
+    )
+
+
+def test_digest_depends_on_image(example_image_filepath, example_config):
+    digest = cache.source_digest(example_image_filepath, example_config)
+    example_image_filepath.write_bytes(example_image_filepath.read_bytes() + b"\0")
+    assert cache.source_digest(example_image_filepath, example_config) != digest
+
+
+def test_recorded_segy_is_up_to_date(tmp_path):
+    segy_filepath = tmp_path / "a.segy"
+    segy_filepath.write_bytes(b"segy")
+    cache.record(segy_filepath, "1234", tmp_path / "a.png", tmp_path / "a.toml")
+    assert cache.is_up_to_date(segy_filepath, "1234")
+    assert not cache.is_up_to_date(segy_filepath, "5678")
+
+
+def test_modified_segy_is_not_up_to_date(tmp_path):
+    segy_filepath = tmp_path / "a.segy"
+    segy_filepath.write_bytes(b"segy")
+    cache.record(segy_filepath, "1234", tmp_path / "a.png", tmp_path / "a.toml")
+    segy_filepath.write_bytes(b"truncated")
+    assert not cache.is_up_to_date(segy_filepath, "1234")
+
+
+def test_segy_without_manifest_is_not_up_to_date(tmp_path):
+    segy_filepath = tmp_path / "a.segy"
+    segy_filepath.write_bytes(b"segy")
+    assert not cache.is_up_to_date(segy_filepath, "1234")
@@ -0,0 +1,48 @@
+import json
+import zlib
+
+import numpy as np
+
+from img2segy import writer
+from img2segy.chunked import write_zarr, zarr_dtype
+
+
+def read_array(dirpath):
+    """Read a zlib-compressed Zarr array with nothing but json, zlib and NumPy."""
+    metadata = json.loads((dirpath / ".zarray").read_text())
+    descr = metadata["dtype"]
+    dtype = np.dtype([tuple(field) for field in descr] if isinstance(descr, list) else descr)
+    num_chunks = -(-metadata["shape"][0] // metadata["chunks"][0])
+    suffix = ".0" if len(metadata["shape"]) == 2 else ""
+    data = b"".join(
+        zlib.decompress((dirpath / f"{index}{suffix}").read_bytes()) for index in range(num_chunks)
+    )
+    array = np.frombuffer(data, dtype=dtype)
+    if suffix:
+        array = array.reshape(-1, metadata["shape"][1])
+    return array[:metadata["shape"][0]]
+
+
+def test_zarr_arrays_contain_headers_and_samples(tmp_path, example_dataset):
+    dirpath = tmp_path / "example.zarr"
+    write_zarr(dirpath, example_dataset, workers=2, block_num_bytes=20000)
+    headers = read_array(dirpath / "headers")
+    expected = writer.trace_header_array(example_dataset, 0, 400)
+    assert np.array_equal(headers.view(np.uint8), np.ascontiguousarray(expected).view(np.uint8))
+    samples = read_array(dirpath / "samples")
+    assert np.array_equal(samples, example_dataset.trace_samples_array(0, 400))
+
+
+def test_zarr_group_records_reel_headers(tmp_path, example_dataset):
+    dirpath = tmp_path / "example.zarr"
+    write_zarr(dirpath, example_dataset)
+    attributes = json.loads((dirpath / ".zattrs").read_text())
+    assert attributes["binary_reel_header"]["num_samples"] == 300
+    assert len(attributes["textual_reel_header"]) == 40
+
+
+def test_zarr_dtype_preserves_header_layout():
+    dtype = writer.trace_header_dtype()
+    described = np.dtype([tuple(field) for field in zarr_dtype(dtype)])
+    assert described.itemsize == dtype.itemsize
+    assert all(described.fields[name][1] == dtype.fields[name][1] for name in dtype.names)
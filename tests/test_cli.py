@@ -0,0 +1,139 @@
+import json
+import subprocess
+import sys
+import textwrap
+
+import click
+import pytest
+from click.testing import CliRunner
+from exit_codes import ExitCode
+
+from img2segy.cli import cli
+
+# Dependencies which are slow to import, so must not be imported until a command needs them.
+HEAVY_MODULES = ("numpy", "PIL", "segpy", "toml", "euclidian")
+
+
+def test_batch_reports_failures_without_stopping(example_image_filepath):
+    dirpath = example_image_filepath.parent
+    (dirpath / "unconfigured.png").write_bytes(example_image_filepath.read_bytes())
+    result = CliRunner().invoke(cli, ["batch", "--workers", "1", str(dirpath)])
+    assert result.exit_code == ExitCode.DATA_ERR
+    assert "1 succeeded, 1 failed" in result.output
+    assert example_image_filepath.with_suffix(".segy").exists()
+
+
+def test_batch_exits_ok_when_all_succeed(example_image_filepath):
+    result = CliRunner().invoke(cli, ["batch", str(example_image_filepath)])
+    assert result.exit_code == ExitCode.OK
+
+
+def test_bench_writes_json_results(tmp_path):
+    output_filepath = tmp_path / "results.json"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "bench",
+            "--width", "30",
+            "--height", "20",
+            "--bits", "8",
+            "--repeat", "1",
+            "--output", str(output_filepath),
+        ],
+    )
+    assert result.exit_code == ExitCode.OK
+    results = json.loads(output_filepath.read_text())
+    assert [r["workload"]["name"] for r in results["results"]] == ["30x20x8"]
+
+
+def test_convert_writes_stats_json(example_image_filepath, tmp_path):
+    stats_filepath = tmp_path / "stats.json"
+    result = CliRunner().invoke(
+        cli, ["convert", str(example_image_filepath), "--stats-json", str(stats_filepath)]
+    )
+    assert result.exit_code == ExitCode.OK
+    stats = json.loads(stats_filepath.read_text())
+    assert stats["num_traces"] == 400
+    assert "write" in stats["stages"]
+
+
+def run_python(code):
+    """Run code in a fresh interpreter, returning what it prints as parsed JSON."""
+    completed = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--version"],
+        ["--help"],
+        ["convert", "--help"],
+        ["batch", "--help"],
+        ["bench", "--help"],
+        ["serve", "--help"],
+        ["volume", "--help"],
+        ["render", "--help"],
+        ["verify", "--help"],
+    ],
+)
+def test_cli_does_not_import_heavy_modules(args):
+    imported = run_python(f"""
+        import json, sys
+        from img2segy.cli import cli
+        try:
+            cli({args!r})
+        except SystemExit:
+            pass
+        print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+    """)
+    assert imported == []
+
+
+def test_convert_to_standard_output(example_image_filepath):
+    result = CliRunner().invoke(cli, ["convert", str(example_image_filepath), "--segy", "-"])
+    assert result.exit_code == ExitCode.OK
+    assert not example_image_filepath.with_suffix(".segy").exists()
+    segy_filepath = example_image_filepath.with_name("file.segy")
+    CliRunner().invoke(cli, ["convert", str(example_image_filepath), "--segy", str(segy_filepath)])
+    assert result.stdout_bytes == segy_filepath.read_bytes()
+
+
+def test_convert_from_standard_input(example_image_filepath):
+    config_filepath = example_image_filepath.with_suffix(".toml")
+    result = CliRunner().invoke(
+        cli,
+        ["convert", "-", "--config", str(config_filepath)],
+        input=example_image_filepath.read_bytes(),
+    )
+    assert result.exit_code == ExitCode.OK
+    assert len(result.stdout_bytes) == 3600 + 400 * (240 + 300)
+
+
+def test_convert_from_standard_input_requires_config(example_image_filepath):
+    result = CliRunner().invoke(cli, ["convert", "-"], input=example_image_filepath.read_bytes())
+    assert result.exit_code == click.UsageError.exit_code
+
+
+def test_render_reports_malformed_segy(tmp_path):
+    segy_filepath = tmp_path / "malformed.segy"
+    segy_filepath.write_bytes(bytes(3601))
+    result = CliRunner().invoke(cli, ["render", str(segy_filepath)])
+    assert result.exit_code == ExitCode.DATA_ERR
+
+
+def test_verify_reports_mismatched_outputs(example_image_filepath):
+    CliRunner().invoke(cli, ["convert", str(example_image_filepath)])
+    result = CliRunner().invoke(cli, ["verify", str(example_image_filepath)])
+    assert result.exit_code == ExitCode.OK
+    example_image_filepath.with_suffix(".toml").write_text(
+        example_image_filepath.with_suffix(".toml").read_text().replace("527501", "527500")
+    )
+    result = CliRunner().invoke(cli, ["verify", str(example_image_filepath)])
+    assert result.exit_code == ExitCode.DATA_ERR
+    assert "MISMATCH" in result.output
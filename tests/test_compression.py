@@ -0,0 +1,61 @@
+import gzip
+import io
+import zlib
+
+import pytest
+
+from img2segy.compression import CompressedWriter, codec_for, compressor
+
+DATA = bytes(range(256)) * 1000
+
+
+def compress(data, codec, workers, chunk_num_bytes=10000):
+    output = io.BytesIO()
+    with CompressedWriter(output, codec, workers=workers, chunk_num_bytes=chunk_num_bytes) as compressed:
+        for start in range(0, len(data), 7777):
+            compressed.write(data[start:start + 7777])
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_gzip_members_decompress_to_data(workers):
+    assert gzip.decompress(compress(DATA, "gzip", workers)) == DATA
+
+
+def test_output_does_not_depend_on_number_of_workers():
+    assert compress(DATA, "gzip", 1) == compress(DATA, "gzip", 3)
+
+
+def test_flush_does_not_move_chunk_boundaries():
+    output = io.BytesIO()
+    with CompressedWriter(output, "gzip", chunk_num_bytes=10000) as compressed:
+        compressed.write(DATA[:5])
+        compressed.flush()
+        compressed.write(DATA[5:])
+    assert output.getvalue() == compress(DATA, "gzip", 1)
+
+
+def test_closing_writer_does_not_close_file():
+    output = io.BytesIO()
+    CompressedWriter(output, "gzip").close()
+    assert not output.closed
+
+
+def test_zlib_compressor_produces_zlib_stream():
+    assert zlib.decompress(compressor("zlib")(DATA)) == DATA
+
+
+def test_zstd_frames_decompress_to_data():
+    zstandard = pytest.importorskip("zstandard")
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(compress(DATA, "zstd", 2)), read_across_frames=True)
+    assert reader.read() == DATA
+
+
+def test_unknown_codec_raises_value_error():
+    with pytest.raises(ValueError):
+        compressor("lzma")
+
+
+@pytest.mark.parametrize("filename, codec", [("a.segy.gz", "gzip"), ("a.segy.ZST", "zstd"), ("a.segy", None)])
+def test_codec_is_selected_by_extension(filename, codec):
+    assert codec_for(filename) == codec
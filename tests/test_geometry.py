@@ -1,6 +1,8 @@
+import numpy as np
+import pytest
 from euclidian.cartesian2 import Point2
 
-from img2segy.geometry import Geometry
+from img2segy.geometry import ConfigurationError, Geometry
 
 
 def test_load_geometry_from_toml_does_not_raise_errors(example_config):
@@ -63,4 +65,143 @@ def test_interpolate_xy_at_one(example_config):
 
 def test_sample_interval(example_config):
     geometry = Geometry.from_config(example_config)
-    assert geometry.sample_interval_z(2150) == 2000.9306654257794
\ No newline at end of file
+    assert geometry.sample_interval_z(2150) == 2000.9306654257794
+
+
+@pytest.mark.parametrize("proportion, expected", [
+    (0.25, Point2(527457.25, 4837840.25)),
+    (0.5, Point2(527413.5, 4834899.5)),
+])
+def test_interpolate_xy_between_left_and_right(example_config, proportion, expected):
+    geometry = Geometry.from_config(example_config)
+    assert geometry.interpolate_xy(proportion) == expected
+
+
+@pytest.mark.parametrize("proportion, expected", [
+    (0, Point2(0, 0)),
+    (0.25, Point2(15, 20)),
+    (0.5, Point2(30, 40)),
+    (0.75, Point2(30, 65)),
+    (1, Point2(30, 90)),
+])
+def test_interpolate_xy_at_and_between_waypoints(example_config, proportion, expected):
+    geometry = Geometry.from_config(
+        polyline_config(example_config, {"x": 0, "y": 0}, {"x": 30, "y": 40}, {"x": 30, "y": 90})
+    )
+    assert geometry.interpolate_xy(proportion) == expected
+
+
+def polyline_config(example_config, *points):
+    config = {**example_config, "position": {**example_config["position"], "points": list(points)}}
+    del config["position"]["left"], config["position"]["right"]
+    return config
+
+
+def test_interpolate_xy_array_of_two_points_matches_left_and_right(example_config):
+    geometry = Geometry.from_config(example_config)
+    polyline = Geometry.from_config(
+        polyline_config(
+            example_config,
+            {"x": 527501, "y": 4840781},
+            {"x": 527326, "y": 4829018},
+        )
+    )
+    proportions = np.arange(400) / 400
+    np.testing.assert_array_equal(
+        polyline.interpolate_xy_array(proportions), geometry.interpolate_xy_array(proportions)
+    )
+
+
+def test_polyline_length_is_arc_length(example_config):
+    geometry = Geometry.from_config(
+        polyline_config(example_config, {"x": 0, "y": 0}, {"x": 30, "y": 40}, {"x": 30, "y": 90})
+    )
+    assert geometry.left_xy == Point2(0, 0)
+    assert geometry.right_xy == Point2(30, 90)
+    assert geometry.length == 100
+
+
+def test_polyline_interpolates_by_arc_length(example_config):
+    geometry = Geometry.from_config(
+        polyline_config(example_config, {"x": 0, "y": 0}, {"x": 30, "y": 40}, {"x": 30, "y": 90})
+    )
+    xs, ys = geometry.interpolate_xy_array([0, 0.25, 0.5, 0.75, 1])
+    np.testing.assert_allclose(xs, [0, 15, 30, 30, 30])
+    np.testing.assert_allclose(ys, [0, 20, 40, 65, 90])
+
+
+def test_polyline_pinned_column(example_config):
+    geometry = Geometry.from_config(
+        polyline_config(
+            example_config,
+            {"x": 0, "y": 0},
+            {"x": 50, "y": 0, "column": 20},
+            {"x": 100, "y": 0},
+        )
+    )
+    xs, ys = geometry.interpolate_xy_array([0.1, 0.2, 0.6], num_columns=100)
+    np.testing.assert_allclose(xs, [25, 50, 75])
+    np.testing.assert_allclose(ys, [0, 0, 0])
+
+
+def test_polyline_unpinned_waypoints_between_pinned_waypoints(example_config):
+    geometry = Geometry.from_config(
+        polyline_config(
+            example_config,
+            {"x": 0, "y": 0},
+            {"x": 10, "y": 0},
+            {"x": 40, "y": 0, "column": 50},
+            {"x": 100, "y": 0},
+        )
+    )
+    np.testing.assert_allclose(
+        geometry.control_point_proportions(num_columns=100), [0, 0.125, 0.5, 1]
+    )
+
+
+def test_polyline_pinned_column_requires_num_columns(example_config):
+    geometry = Geometry.from_config(
+        polyline_config(
+            example_config,
+            {"x": 0, "y": 0},
+            {"x": 50, "y": 0, "column": 20},
+            {"x": 100, "y": 0},
+        )
+    )
+    with pytest.raises(ValueError):
+        geometry.interpolate_xy_array([0.5])
+
+
+@pytest.mark.parametrize(
+    "points",
+    [
+        [{"x": 0, "y": 0}],
+        [{"x": 0, "y": 0, "column": 0}, {"x": 100, "y": 0}],
+        [
+            {"x": 0, "y": 0},
+            {"x": 50, "y": 0, "column": 60},
+            {"x": 70, "y": 0, "column": 30},
+            {"x": 100, "y": 0},
+        ],
+        [{"x": 0}, {"x": 100, "y": 0}],
+    ],
+)
+def test_polyline_configuration_errors(example_config, points):
+    with pytest.raises(ConfigurationError):
+        Geometry.from_config(polyline_config(example_config, *points))
+
+
+def test_translated_displaces_every_control_point(example_config):
+    original = Geometry.from_config(
+        polyline_config(
+            example_config,
+            {"x": 527501, "y": 4840781},
+            {"x": 527480, "y": 4835120, "column": 100},
+            {"x": 527326, "y": 4829018},
+        )
+    )
+    geometry = original.translated(10, -20)
+    assert np.allclose(
+        np.array(geometry.interpolate_xy_array([0.0, 0.3, 1.0], 400)),
+        np.array(original.interpolate_xy_array([0.0, 0.3, 1.0], 400)) + [[10], [-20]],
+    )
@@ -0,0 +1,93 @@
+import numpy as np
+from PIL import Image
+
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.trace_header_mapper import TraceHeaderMapper
+
+
+def test_num_traces_is_image_width(example_dataset, example_image):
+    assert example_dataset.num_traces() == example_image.width
+
+
+def test_trace_samples_are_shifted_pixel_columns(example_dataset, example_image):
+    pixels = np.asarray(example_image).astype(int)
+    samples = example_dataset.trace_samples(7)
+    assert np.array_equal(samples, pixels[:, 7] - 128)
+
+
+def test_trace_samples_are_contiguous(example_dataset):
+    assert example_dataset.trace_samples(7).flags.c_contiguous
+
+
+def test_trace_samples_array_rows_are_traces(example_dataset):
+    block = example_dataset.trace_samples_array(5, 9)
+    assert block.flags.c_contiguous
+    for i, trace_index in enumerate(range(5, 9)):
+        assert np.array_equal(block[i], example_dataset.trace_samples(trace_index))
+
+
+def test_strip_samples_match_whole_image_samples(
+        tmp_path, example_image, example_dataset, example_config
+):
+    filepath = tmp_path / "example.bmp"
+    example_image.save(filepath)
+    dataset = ImageDataset(
+        Image.open(filepath),
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+        strip_width=64,
+    )
+    assert np.array_equal(
+        dataset.trace_samples_array(60, 200),
+        example_dataset.trace_samples_array(60, 200),
+    )
+    assert np.array_equal(dataset.trace_samples(130), example_dataset.trace_samples(130))
+
+
+def test_pinned_waypoint_is_at_its_column(example_config, example_image):
+    config = {
+        **example_config,
+        "position": {
+            "points": [
+                {"x": 1000, "y": 2000},
+                {"x": 1000, "y": 2500, "column": 100},
+                {"x": 1300, "y": 2500},
+            ],
+            "depth": example_config["position"]["depth"],
+        },
+    }
+    dataset = ImageDataset(
+        example_image,
+        Geometry.from_config(config),
+        TraceHeaderMapper.from_config(config),
+    )
+    assert coordinates(dataset.trace_header(100)) == (1000, 2500)
+    assert coordinates(dataset.trace_header(200)) == (1100, 2500)
+
+
+def coordinates(header):
+    """The unscaled cdp coordinates of a trace header with a negative coordinate scalar."""
+    return header.cdp_x / -header.xy_scalar, header.cdp_y / -header.xy_scalar
+
+
+def test_coordinates_are_stored_with_most_precise_scalar(example_dataset):
+    header = example_dataset.trace_header(1)
+    assert header.xy_scalar == -100
+    # The second trace is a fraction of a metre from the left edge
+    assert coordinates(header) == (527500.56, 4840751.59)
+
+
+def test_decimal_degree_coordinates_retain_their_precision(example_config, example_image):
+    config = {
+        **example_config,
+        "position": {
+            "left": {"x": 10.123456, "y": 59.5},
+            "right": {"x": 10.523456, "y": 59.5},
+            "depth": example_config["position"]["depth"],
+        },
+    }
+    dataset = ImageDataset(example_image, Geometry.from_config(config), TraceHeaderMapper.from_config(config))
+    assert dataset.trace_header(0).xy_scalar == -10000
+    assert coordinates(dataset.trace_header(0)) == (10.1235, 59.5)
+    assert coordinates(dataset.trace_header(200)) == (10.3235, 59.5)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from img2segy.profiling import NULL_PROFILE, Profile
+
+
+def test_stage_records_time_and_peak_allocation():
+    profile = Profile()
+    with profile.stage("allocate"):
+        np.ones(1_000_000, dtype=np.uint8).sum()
+    (stats,) = profile.stages
+    assert stats.name == "allocate"
+    assert stats.calls == 1
+    assert stats.wall_seconds > 0
+    assert stats.peak_allocated_bytes >= 1_000_000
+
+
+def test_repeated_stage_accumulates():
+    profile = Profile(trace_memory=False)
+    for _ in range(3):
+        with profile.stage("repeated"):
+            pass
+    (stats,) = profile.stages
+    assert stats.calls == 3
+    assert stats.peak_allocated_bytes is None
+
+
+def test_stage_records_time_when_an_exception_is_raised():
+    profile = Profile()
+    with pytest.raises(RuntimeError):
+        with profile.stage("failing"):
+            raise RuntimeError("failed")
+    assert profile.stages[0].calls == 1
+
+
+def test_as_dict_includes_throughput():
+    profile = Profile(trace_memory=False)
+    with profile.stage("first"):
+        pass
+    with profile.stage("second"):
+        pass
+    profile.record_traces(100)
+    stats = profile.as_dict()
+    assert list(stats["stages"]) == ["first", "second"]
+    assert stats["num_traces"] == 100
+    second = stats["stages"]["second"]
+    assert second["traces_per_second"] == pytest.approx(100 / second["wall_seconds"])
+    assert stats["total"]["wall_seconds"] == pytest.approx(
+        sum(stage["wall_seconds"] for stage in stats["stages"].values())
+    )
+
+
+def test_null_profile_stage_does_nothing():
+    with NULL_PROFILE.stage("anything") as stats:
+        assert stats is None
+    NULL_PROFILE.record_traces(100)
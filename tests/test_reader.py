@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from img2segy import api
+from img2segy.reader import map_segy
+
+
+@pytest.fixture
+def segy_filepath(example_image_filepath):
+    api.convert(example_image_filepath)
+    return example_image_filepath.with_suffix(".segy")
+
+
+def test_map_segy_finds_every_trace(segy_filepath, example_image):
+    binary_reel_header, traces = map_segy(segy_filepath)
+    assert binary_reel_header.num_samples == example_image.height
+    assert len(traces) == example_image.width
+    assert traces["samples"].shape == (example_image.width, example_image.height)
+
+
+def test_mapped_headers_match_dataset(segy_filepath, example_dataset):
+    _, traces = map_segy(segy_filepath)
+    header = example_dataset.trace_header(123)
+    assert traces["header"]["cdp_x"][123] == header.cdp_x
+    assert traces["header"]["trace_num"][123] == header.trace_num
+
+
+def test_mapped_samples_match_dataset(segy_filepath, example_dataset):
+    _, traces = map_segy(segy_filepath)
+    assert np.array_equal(traces["samples"], example_dataset.trace_samples_array(0, 400))
+
+
+def test_truncated_file_raises_value_error(segy_filepath):
+    with open(segy_filepath, "r+b") as segy_file:
+        segy_file.truncate(segy_filepath.stat().st_size - 1)
+    with pytest.raises(ValueError, match="not that of a whole number of traces"):
+        map_segy(segy_filepath)
+
+
+def test_file_without_traces_maps_no_traces(segy_filepath):
+    with open(segy_filepath, "r+b") as segy_file:
+        segy_file.truncate(3600)
+    _, traces = map_segy(segy_filepath)
+    assert len(traces) == 0
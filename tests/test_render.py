@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from img2segy import api
+from img2segy.render import pixels, render_segy
+
+
+def test_render_reproduces_converted_image(example_image_filepath, example_image):
+    api.convert(example_image_filepath)
+    image = render_segy(example_image_filepath.with_suffix(".segy"))
+    assert image.mode == "L"
+    assert np.array_equal(np.asarray(image), np.asarray(example_image))
+
+
+def test_render_decimates_traces_and_samples(example_image_filepath, example_image):
+    api.convert(example_image_filepath)
+    image = render_segy(example_image_filepath.with_suffix(".segy"), trace_step=3, sample_step=2)
+    assert np.array_equal(np.asarray(image), np.asarray(example_image)[::2, ::3])
+
+
+def test_pixels_of_16_bit_samples():
+    samples = np.array([[-32768, 0, 32767]], dtype=">i2")
+    assert pixels(samples, bits=16).tolist() == [[0], [32768], [65535]]
+    assert pixels(samples, bits=8).tolist() == [[0], [128], [255]]
+
+
+def test_pixels_of_8_bit_samples_at_16_bits():
+    samples = np.array([[-128, 0, 127]], dtype="i1")
+    assert pixels(samples, bits=16).tolist() == [[0], [32768], [65280]]
+
+
+def test_pixels_of_float_samples_are_unscaled_and_clipped():
+    samples = np.array([[-2.0, 0.0, 0.5, 10.0]], dtype=">f4")
+    assert pixels(samples, amplitude_scale=0.01).tolist() == [[0], [128], [178], [255]]
+
+
+def test_pixels_of_unsupported_bit_depth_raise_value_error():
+    with pytest.raises(ValueError):
+        pixels(np.zeros((1, 1), dtype="i1"), bits=12)
+
+
+def test_api_render_does_not_overwrite_source_image(example_image_filepath):
+    api.convert(example_image_filepath)
+    image_filepath = api.render(example_image_filepath.with_suffix(".segy"))
+    assert image_filepath.name == "example.segy.png"
+    assert image_filepath.exists()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.resampling import ConfigurationError, Resampling
+from img2segy.trace_header_mapper import TraceHeaderMapper
+
+
+def test_from_config_without_section_does_not_resample(example_config, example_image):
+    resampling = Resampling.from_config(example_config)
+    geometry = Geometry.from_config(example_config)
+    assert resampling.size(geometry, example_image.width, example_image.height) == example_image.size
+
+
+def test_from_config_with_unknown_method_raises_configuration_error(example_config):
+    config = dict(example_config, resample={"method": "magic"})
+    with pytest.raises(ConfigurationError):
+        Resampling.from_config(config)
+
+
+def test_from_config_with_negative_spacing_raises_configuration_error(example_config):
+    config = dict(example_config, resample={"trace-spacing": -1})
+    with pytest.raises(ConfigurationError):
+        Resampling.from_config(config)
+
+
+@pytest.mark.parametrize("trace_spacing", [[1, 2], {"x": 1}])
+def test_from_config_with_non_numeric_spacing_raises_configuration_error(example_config, trace_spacing):
+    config = dict(example_config, resample={"trace-spacing": trace_spacing})
+    with pytest.raises(ConfigurationError):
+        Resampling.from_config(config)
+
+
+def test_trace_spacing_determines_num_traces(example_config):
+    geometry = Geometry.from_config(example_config)
+    resampling = Resampling(trace_spacing=geometry.length / 100)
+    assert resampling.size(geometry, 400, 300) == (100, 300)
+
+
+def test_sample_interval_determines_num_samples(example_config):
+    geometry = Geometry.from_config(example_config)
+    resampling = Resampling(sample_interval=10)
+    assert resampling.size(geometry, 400, 300) == (400, 431)
+
+
+def test_resampled_dataset(example_config, example_image):
+    config = dict(example_config, resample={"trace-spacing": 58.77, "sample-interval": 20})
+    geometry = Geometry.from_config(config)
+    dataset = ImageDataset(
+        example_image,
+        geometry,
+        TraceHeaderMapper.from_config(config),
+        resampling=Resampling.from_config(config),
+    )
+    assert dataset.num_traces() == 200
+    assert dataset.binary_reel_header.num_samples == 216
+    assert dataset.binary_reel_header.sample_interval == 20000
+
+
+def test_resampling_with_nearest_method_selects_pixels(example_config):
+    pixels = np.arange(4 * 6, dtype=np.uint8).reshape(6, 4) * 10
+    geometry = Geometry.from_config(example_config)
+    resampling = Resampling(trace_spacing=geometry.length / 2, method="nearest")
+    resampled = np.asarray(resampling.apply(Image.fromarray(pixels), geometry))
+    assert np.array_equal(resampled, pixels[:, 1::2])
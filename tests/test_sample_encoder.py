@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from PIL import Image
+from segpy.datatypes import DataSampleFormat
+
+from img2segy.sample_encoder import ConfigurationError, SampleEncoder
+
+PIXELS_8 = np.array([[0, 1, 127], [128, 200, 255]], dtype=np.uint8)
+PIXELS_16 = np.array([[0, 1, 32767], [32768, 50000, 65535]], dtype=np.uint16)
+
+
+def encode(pixels, **kwargs):
+    return SampleEncoder(**kwargs).encode(Image.fromarray(pixels))
+
+
+def test_auto_format_of_8_bit_image_is_int8():
+    assert SampleEncoder().data_sample_format("L") == DataSampleFormat.INT8
+
+
+def test_auto_format_of_16_bit_image_is_int16():
+    assert SampleEncoder().data_sample_format("I;16") == DataSampleFormat.INT16
+
+
+def test_unknown_format_raises_configuration_error():
+    with pytest.raises(ConfigurationError):
+        SampleEncoder.from_config({"segy": {"data-sample-format": "int64"}})
+
+
+def test_encoded_samples_are_trace_major_big_endian():
+    samples = encode(PIXELS_16)
+    assert samples.shape == (3, 2)
+    assert samples.dtype == np.dtype(">i2")
+    assert samples.flags.c_contiguous
+
+
+def test_8_bit_to_int8():
+    assert np.array_equal(encode(PIXELS_8), PIXELS_8.T.astype(int) - 128)
+
+
+def test_16_bit_to_int16():
+    assert np.array_equal(encode(PIXELS_16), PIXELS_16.T.astype(int) - 32768)
+
+
+def test_16_bit_to_int8():
+    samples = encode(PIXELS_16, data_sample_format="int8")
+    assert np.array_equal(samples, (PIXELS_16.T.astype(int) >> 8) - 128)
+
+
+def test_8_bit_to_int16():
+    samples = encode(PIXELS_8, data_sample_format="int16")
+    assert np.array_equal(samples, (PIXELS_8.T.astype(int) - 128) * 256)
+
+
+def test_16_bit_to_float32_with_amplitude_scale():
+    samples = encode(PIXELS_16, data_sample_format="float32", amplitude_scale=0.5)
+    assert samples.dtype == np.dtype(">f4")
+    assert np.array_equal(samples, (PIXELS_16.T.astype(float) - 32768) * 0.5)
+
+
+def test_32_bit_image_within_16_bit_range_is_encoded_as_16_bit():
+    samples = encode(PIXELS_16.astype(np.int32))
+    assert np.array_equal(samples, PIXELS_16.T.astype(int) - 32768)
+
+
+@pytest.mark.parametrize("value", [-1, 65536, 1 << 20])
+def test_32_bit_image_beyond_16_bit_range_raises_configuration_error(value):
+    pixels = PIXELS_16.astype(np.int32)
+    pixels[1, 2] = value
+    with pytest.raises(ConfigurationError):
+        encode(pixels)
+
+
+def test_rgb_image_is_converted_to_grayscale():
+    rgb = np.stack([PIXELS_8] * 3, axis=-1)
+    assert np.array_equal(encode(rgb), PIXELS_8.T.astype(int) - 128)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import uuid
+from http import HTTPStatus
+
+import pytest
+
+from img2segy import api
+from img2segy.server import ConversionServer, HTTPError
+
+
+async def request(address, method, path, body=b"", headers=None):
+    """Make an HTTP request to a server on a TCP (host, port) address or Unix socket path."""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address[:2])
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    response_head, _, response_body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = response_head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), response_headers, response_body
+
+
+def form_data(**parts):
+    """Encode (filename, content) pairs as a multipart/form-data body and its content type."""
+    boundary = uuid.uuid4().hex
+    body = b""
+    for name, (filename, content) in parts.items():
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"'
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def serve(scenario, **options):
+    """Run a coroutine function with a server listening on a free TCP port."""
+    async def run():
+        async with ConversionServer(workers=1, **options) as server:
+            await server.start(port=0)
+            return await scenario(server, server.addresses[0])
+    return asyncio.run(run())
+
+
+def test_health():
+    async def scenario(server, address):
+        return await request(address, "GET", "/health")
+
+    status, _, body = serve(scenario)
+    assert status == HTTPStatus.OK
+    assert json.loads(body)["workers"] == 1
+
+
+def test_convert_submission_responds_with_segy(example_image_filepath, tmp_path):
+    reference_filepath = tmp_path / "reference.segy"
+    api.convert(example_image_filepath, reference_filepath)
+    body, content_type = form_data(
+        image=("section.png", example_image_filepath.read_bytes()),
+        config=(None, example_image_filepath.with_suffix(".toml").read_bytes()),
+    )
+
+    async def scenario(server, address):
+        return await request(address, "POST", "/convert", body, {"Content-Type": content_type})
+
+    status, headers, segy = serve(scenario)
+    assert status == HTTPStatus.OK
+    assert 'filename="section.segy"' in headers["Content-Disposition"]
+    # The textual header includes the name of the image file, which differs
+    assert len(segy) == reference_filepath.stat().st_size
+    assert segy[3200:] == reference_filepath.read_bytes()[3200:]
+
+
+def test_convert_submission_with_bad_config_is_bad_request(example_image_filepath):
+    body, content_type = form_data(
+        image=("section.png", example_image_filepath.read_bytes()),
+        config=(None, b"[position]\n"),
+    )
+
+    async def scenario(server, address):
+        return await request(address, "POST", "/convert", body, {"Content-Type": content_type})
+
+    status, _, body = serve(scenario)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert json.loads(body)["configuration_error"]
+
+
+def test_job_runs_to_completion(example_image_filepath):
+    async def scenario(server, address):
+        job_request = json.dumps({"image": str(example_image_filepath)}).encode()
+        status, headers, body = await request(address, "POST", "/jobs", job_request)
+        assert status == HTTPStatus.ACCEPTED
+        while True:
+            status, _, body = await request(address, "GET", headers["Location"])
+            job = json.loads(body)
+            if job["status"] not in ("queued", "running"):
+                return job
+            await asyncio.sleep(0.05)
+
+    job = serve(scenario)
+    assert job["status"] == "succeeded"
+    assert example_image_filepath.with_suffix(".segy").exists()
+
+
+def test_full_queue_refuses_submissions(example_image_filepath):
+    async def scenario(server, address):
+        conversion = api.Conversion(example_image_filepath)
+        # The dispatcher doesn't run between these calls, so the first job is still queued
+        server.submit(conversion)
+        with pytest.raises(HTTPError) as exc_info:
+            server.submit(conversion)
+        return exc_info.value
+
+    error = serve(scenario, queue_size=1)
+    assert error.status == HTTPStatus.SERVICE_UNAVAILABLE
+    assert "Retry-After" in error.headers
+
+
+def test_unknown_job_is_not_found():
+    async def scenario(server, address):
+        return await request(address, "GET", "/jobs/unknown")
+
+    status, _, _ = serve(scenario)
+    assert status == HTTPStatus.NOT_FOUND
+
+
+def test_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "img2segy.sock")
+
+    async def run():
+        async with ConversionServer(workers=1) as server:
+            await server.start(socket_path=socket_path)
+            return await request(socket_path, "GET", "/health")
+
+    status, _, _ = asyncio.run(run())
+    assert status == HTTPStatus.OK
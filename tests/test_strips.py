@@ -0,0 +1,118 @@
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from img2segy.strips import ImageStrips
+
+# TIFF field types used to write tiled TIFF files, which Pillow cannot write itself
+TIFF_SHORT = 3
+TIFF_LONG = 4
+
+
+def write_tiled_tiff(filepath, pixels, tile_size):
+    """Write an uncompressed, 8-bit grayscale, tiled TIFF file."""
+    height, width = pixels.shape
+    padded_shape = (-(-height // tile_size) * tile_size, -(-width // tile_size) * tile_size)
+    padded = np.zeros(padded_shape, dtype=np.uint8)
+    padded[:height, :width] = pixels
+    tiles = [
+        padded[y:y + tile_size, x:x + tile_size].tobytes()
+        for y in range(0, padded.shape[0], tile_size)
+        for x in range(0, padded.shape[1], tile_size)
+    ]
+    entries = [
+        (256, TIFF_LONG, 1, width),
+        (257, TIFF_LONG, 1, height),
+        (258, TIFF_SHORT, 1, 8),
+        (259, TIFF_SHORT, 1, 1),
+        (262, TIFF_SHORT, 1, 1),
+        (277, TIFF_SHORT, 1, 1),
+        (322, TIFF_SHORT, 1, tile_size),
+        (323, TIFF_SHORT, 1, tile_size),
+    ]
+    ifd_num_bytes = 2 + 12 * (len(entries) + 2) + 4
+    offsets_offset = 8 + ifd_num_bytes
+    counts_offset = offsets_offset + 4 * len(tiles)
+    data_offset = counts_offset + 4 * len(tiles)
+    entries += [
+        (324, TIFF_LONG, len(tiles), offsets_offset),
+        (325, TIFF_LONG, len(tiles), counts_offset),
+    ]
+    with open(filepath, "wb") as tiff_file:
+        tiff_file.write(b"II*\x00" + struct.pack("<IH", 8, len(entries)))
+        for tag, tag_type, count, value in entries:
+            # Values shorter than four bytes are left-justified within the value field
+            value_format = "<H2x" if tag_type == TIFF_SHORT else "<I"
+            tiff_file.write(struct.pack("<HHI", tag, tag_type, count) + struct.pack(value_format, value))
+        tiff_file.write(struct.pack("<I", 0))
+        tile_num_bytes = tile_size * tile_size
+        offsets = [data_offset + index * tile_num_bytes for index in range(len(tiles))]
+        tiff_file.write(struct.pack(f"<{len(tiles)}I", *offsets))
+        tiff_file.write(struct.pack(f"<{len(tiles)}I", *[tile_num_bytes] * len(tiles)))
+        tiff_file.write(b"".join(tiles))
+
+
+@pytest.fixture(params=["bmp", "palette.bmp", "ppm", "tif", "tiled.tif", "lzw.tif", "png"])
+def image_filepath(request, tmp_path, example_image):
+    filepath = tmp_path / f"example.{request.param}"
+    if request.param == "tiled.tif":
+        write_tiled_tiff(filepath, np.asarray(example_image), 64)
+    elif request.param == "lzw.tif":
+        example_image.save(filepath, compression="tiff_lzw")
+    elif request.param == "palette.bmp":
+        example_image.convert("P", palette=Image.Palette.ADAPTIVE, colors=16).save(filepath)
+    else:
+        example_image.convert("RGB" if request.param == "ppm" else "L").save(filepath)
+    return filepath
+
+
+def test_num_strips(example_image):
+    assert len(ImageStrips(example_image, 64)) == 7
+
+
+def test_last_strip_is_narrower(example_image):
+    strips = ImageStrips(example_image, 64)
+    assert strips.bounds(6) == (384, 400)
+
+
+def test_strip_width_must_be_positive(example_image):
+    with pytest.raises(ValueError):
+        ImageStrips(example_image, 0)
+
+
+def test_strip_index_out_of_range_raises_index_error(example_image):
+    with pytest.raises(IndexError):
+        ImageStrips(example_image, 64).strip(7)
+
+
+def test_strips_match_cropped_image(image_filepath):
+    image = Image.open(image_filepath)
+    pixels = np.asarray(Image.open(image_filepath))
+    strips = ImageStrips(image, 64)
+    for strip_index in range(len(strips)):
+        start, stop = strips.bounds(strip_index)
+        assert np.array_equal(np.asarray(strips.strip(strip_index)), pixels[:, start:stop])
+
+
+@pytest.mark.parametrize("tiled", [False, True])
+def test_uncompressed_image_is_not_decoded_whole(tmp_path, example_image, tiled):
+    filepath = tmp_path / "example.tif"
+    if tiled:
+        write_tiled_tiff(filepath, np.asarray(example_image), 64)
+    else:
+        example_image.save(filepath)
+    image = Image.open(filepath)
+    strip = ImageStrips(image, 48).strip(3)
+    assert image.tile, "The source image should remain unloaded"
+    assert np.array_equal(np.asarray(strip), np.asarray(example_image)[:, 144:192])
+
+
+def test_compressed_image_is_decoded_whole_once(tmp_path, example_image):
+    filepath = tmp_path / "example.tif"
+    example_image.save(filepath, compression="tiff_lzw")
+    image = Image.open(filepath)
+    strips = ImageStrips(image, 64)
+    strips.strip(3)
+    assert not image.tile, "The source image should have been loaded"
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from euclidian.cartesian2 import Point2
+
+from img2segy.trace_header_mapper import ConfigurationError, TraceHeaderMapper, optimal_xy_scalar
+
+
+def test_positions_match_position(example_config):
+    mapper = TraceHeaderMapper.from_config(example_config)
+    xs = np.array([527501.0, 527326.5])
+    ys = np.array([4840781.0, 4829018.25])
+    fields = mapper.positions(xs, ys, 1.0)
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        expected = mapper.position(Point2(x, y), 1.0)
+        assert {name: values[i] for name, values in fields.items()} == expected
+
+
+def test_position_fields_are_ints(example_config):
+    mapper = TraceHeaderMapper.from_config(example_config)
+    fields = mapper.position(Point2(527501.25, 4840781.75), -100)
+    assert fields["cdp_x"] == 52750125
+    assert all(type(value) is int for value in fields.values())
+
+
+def test_positions_omits_unused_fields():
+    mapper = TraceHeaderMapper(
+        place_position_in_source_coords=False,
+        place_position_in_group_coords=False,
+        place_position_in_cdp_coords=True,
+        place_trace_number_in_trace_number=True,
+        place_trace_number_in_crossline_number=True,
+    )
+    assert set(mapper.positions([1.0], [2.0], 1.0)) == {"cdp_x", "cdp_y"}
+
+
+def test_trace_numbers_match_trace_number(example_config):
+    mapper = TraceHeaderMapper.from_config(example_config)
+    fields = mapper.trace_numbers(np.arange(5))
+    for trace_index in range(5):
+        expected = mapper.trace_number(trace_index)
+        assert {name: values[trace_index] for name, values in fields.items()} == expected
+
+
+def test_inline_numbers_are_offset_slice_index():
+    mapper = TraceHeaderMapper(
+        place_position_in_source_coords=True,
+        place_position_in_group_coords=True,
+        place_position_in_cdp_coords=True,
+        place_trace_number_in_trace_number=True,
+        place_trace_number_in_crossline_number=True,
+        base_inline_number=100,
+    )
+    assert list(mapper.inline_numbers(3, 4)["inline_number"]) == [103] * 4
+
+
+def test_base_inline_number_is_read_from_inline_number_table(example_config):
+    inline_number = {"use-inline-number-field": True, "base-inline-number": 100}
+    config = {**example_config, "segy": {**example_config["segy"], "inline-number": inline_number}}
+    mapper = TraceHeaderMapper.from_config(config)
+    assert list(mapper.inline_numbers(3, 4)["inline_number"]) == [103] * 4
+
+
+@pytest.mark.parametrize(
+    "max_abs_coordinate, xy_scalar",
+    [(180.0, -10000), (214748.0, -10000), (214749.0, -1000), (4840781.0, -100), (3e9, 10)],
+)
+def test_optimal_xy_scalar_is_most_precise_that_fits(max_abs_coordinate, xy_scalar):
+    assert optimal_xy_scalar(max_abs_coordinate) == xy_scalar
+
+
+def test_optimal_xy_scalar_of_huge_coordinate_raises_value_error():
+    with pytest.raises(ValueError):
+        optimal_xy_scalar(1e15)
+
+
+@pytest.mark.parametrize("xy_scalar, expected", [(-100, [123457, -123457]), (10, [123, -123])])
+def test_positions_are_rounded_and_scaled(example_config, xy_scalar, expected):
+    mapper = TraceHeaderMapper.from_config(example_config)
+    fields = mapper.positions([1234.567, -1234.567], [0.0, 0.0], xy_scalar)
+    assert list(fields["cdp_x"]) == expected
+
+
+def test_configured_xy_scalar_overrides_optimal(example_config):
+    config = {**example_config, "segy": {**example_config["segy"], "xy-scalar": 1}}
+    assert TraceHeaderMapper.from_config(config).xy_scalar(180.0) == 1
+
+
+@pytest.mark.parametrize("xy_scalar", [3, True, 100.0, "100"])
+def test_invalid_xy_scalar_raises_configuration_error(example_config, xy_scalar):
+    config = {**example_config, "segy": {**example_config["segy"], "xy-scalar": xy_scalar}}
+    with pytest.raises(ConfigurationError):
+        TraceHeaderMapper.from_config(config)
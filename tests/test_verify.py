@@ -0,0 +1,176 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from img2segy import api, writer
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.reader import read_layout
+from img2segy.sample_encoder import SampleEncoder
+from img2segy.trace_header_mapper import TraceHeaderMapper
+from img2segy.verify import verify_segy
+
+
+@pytest.fixture
+def segy_filepath(tmp_path, example_dataset):
+    segy_filepath = tmp_path / "example.segy"
+    with open(segy_filepath, "w+b") as segy_file:
+        writer.write_segy(segy_file, example_dataset)
+    return segy_filepath
+
+
+def map_traces(segy_filepath):
+    """Map the traces of a SEG-Y file for writing."""
+    with open(segy_filepath, "rb") as segy_file:
+        _, layout = read_layout(segy_file)
+    return writer.map_traces(segy_filepath, layout)
+
+
+def subjects(mismatches):
+    return [mismatch.subject for mismatch in mismatches]
+
+
+def test_faithful_segy_has_no_mismatches(segy_filepath, example_dataset):
+    assert verify_segy(segy_filepath, example_dataset) == []
+
+
+def test_altered_header_field_is_reported(segy_filepath, example_dataset):
+    traces = map_traces(segy_filepath)
+    # Coordinates are checked to within half a unit of their scalar, so an alteration of one
+    # unit is indistinguishable from rounding where the exact position lies half way between
+    traces["header"]["cdp_x"][100:110] += 2
+    traces.flush()
+    del traces
+    mismatches = verify_segy(segy_filepath, example_dataset, block_num_bytes=4096)
+    assert subjects(mismatches) == ["cdp_x"]
+    assert str(mismatches[0]) == "cdp_x: 10 traces differ, the first being trace 100"
+
+
+def test_non_increasing_trace_numbers_are_reported(segy_filepath, example_dataset):
+    traces = map_traces(segy_filepath)
+    traces["header"]["trace_num"][200] = 0
+    traces.flush()
+    del traces
+    mismatches = verify_segy(segy_filepath, example_dataset, block_num_bytes=4096)
+    assert subjects(mismatches) == ["trace_num", "trace_num"]
+    assert "the first being trace 200" in str(mismatches[0])
+
+
+@pytest.mark.parametrize("field", ["use-trace-number-field", "use-crossline-number-field"])
+def test_unpopulated_trace_number_fields_are_not_required_to_increase(
+        tmp_path, example_config, example_image, field
+):
+    config = {**example_config, "segy": {**example_config["segy"], "trace-number": {field: False}}}
+    dataset = ImageDataset(
+        example_image, Geometry.from_config(config), TraceHeaderMapper.from_config(config)
+    )
+    segy_filepath = tmp_path / "example.segy"
+    with open(segy_filepath, "w+b") as segy_file:
+        writer.write_segy(segy_file, dataset)
+    assert verify_segy(segy_filepath, dataset) == []
+
+
+def test_coordinates_are_checked_independently_of_the_geometry(
+        monkeypatch, tmp_path, example_config, example_image
+):
+    def displaced_interpolate_xy_array(self, proportions, num_columns=None):
+        xs, ys = interpolate_xy_array(self, proportions, num_columns)
+        return xs + 10, ys
+
+    interpolate_xy_array = Geometry.interpolate_xy_array
+    monkeypatch.setattr(Geometry, "interpolate_xy_array", displaced_interpolate_xy_array)
+    dataset = ImageDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+    )
+    segy_filepath = tmp_path / "example.segy"
+    with open(segy_filepath, "w+b") as segy_file:
+        writer.write_segy(segy_file, dataset)
+    assert "cdp_x" in subjects(verify_segy(segy_filepath, dataset))
+
+
+def test_samples_are_checked_independently_of_the_sample_encoder(
+        monkeypatch, tmp_path, example_config, example_image
+):
+    def inverted_encode(self, image):
+        return ~encode(self, image)
+
+    encode = SampleEncoder.encode
+    monkeypatch.setattr(SampleEncoder, "encode", inverted_encode)
+    dataset = ImageDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+    )
+    segy_filepath = tmp_path / "example.segy"
+    with open(segy_filepath, "w+b") as segy_file:
+        writer.write_segy(segy_file, dataset)
+    assert subjects(verify_segy(segy_filepath, dataset)) == ["samples"]
+
+
+@pytest.mark.parametrize(
+    "sample_encoder",
+    [
+        SampleEncoder(data_sample_format="int8"),
+        SampleEncoder(data_sample_format="int16"),
+        SampleEncoder(data_sample_format="float32"),
+        SampleEncoder(data_sample_format="float32", amplitude_scale=0.01),
+    ],
+)
+def test_faithful_segy_of_each_sample_format_has_no_mismatches(
+        tmp_path, example_config, example_image, sample_encoder
+):
+    dataset = ImageDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+        sample_encoder=sample_encoder,
+    )
+    segy_filepath = tmp_path / "example.segy"
+    with open(segy_filepath, "w+b") as segy_file:
+        writer.write_segy(segy_file, dataset)
+    assert verify_segy(segy_filepath, dataset) == []
+
+
+def test_faithful_segy_of_sixteen_bit_image_has_no_mismatches(tmp_path, example_config):
+    pixels = np.random.default_rng(0).integers(0, 1 << 16, size=(300, 400), dtype=np.uint16)
+    image = Image.fromarray(pixels)
+    for data_sample_format in ("int8", "int16"):
+        dataset = ImageDataset(
+            image,
+            Geometry.from_config(example_config),
+            TraceHeaderMapper.from_config(example_config),
+            sample_encoder=SampleEncoder(data_sample_format=data_sample_format),
+        )
+        segy_filepath = tmp_path / f"example-{data_sample_format}.segy"
+        with open(segy_filepath, "w+b") as segy_file:
+            writer.write_segy(segy_file, dataset)
+        assert verify_segy(segy_filepath, dataset) == []
+
+
+def test_altered_samples_are_reported(segy_filepath, example_dataset):
+    traces = map_traces(segy_filepath)
+    traces["samples"][399, 5] ^= 1
+    traces.flush()
+    del traces
+    mismatches = verify_segy(segy_filepath, example_dataset)
+    assert [str(m) for m in mismatches] == ["samples: 1 traces differ, the first being trace 399"]
+
+
+def test_truncated_segy_is_reported(segy_filepath, example_dataset):
+    with open(segy_filepath, "r+b") as segy_file:
+        segy_file.truncate(3600 + 10 * (240 + 300))
+    assert subjects(verify_segy(segy_filepath, example_dataset)) == ["num_traces"]
+
+
+def test_api_verify_of_converted_image_has_no_mismatches(example_image_filepath):
+    api.convert(example_image_filepath)
+    assert api.verify(example_image_filepath) == []
+    assert api.verify(example_image_filepath, strip_width=64) == []
+
+
+def test_verify_many_reports_missing_output(example_image_filepath):
+    [result] = api.verify_many([api.Conversion(example_image_filepath)], workers=1)
+    assert not result.succeeded
+    assert "FileNotFoundError" in result.error
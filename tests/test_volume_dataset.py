@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+import toml
+from PIL import Image
+from segpy.datatypes import SegYType
+
+from img2segy import api, writer
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.trace_header_mapper import TraceHeaderMapper
+from img2segy.volume_dataset import ConfigurationError, VolumeDataset, VolumeSlice, volume_slices
+
+NUM_SLICES = 3
+SLICE_SPACING = 25.0
+
+
+def slice_image(index):
+    rng = np.random.default_rng(seed=index)
+    return Image.fromarray(rng.integers(0, 256, size=(300, 40), dtype=np.uint8))
+
+
+def translated_config(config, dx):
+    position = config["position"]
+    return {
+        **config,
+        "position": {
+            **position,
+            "left": {"x": position["left"]["x"] + dx, "y": position["left"]["y"]},
+            "right": {"x": position["right"]["x"] + dx, "y": position["right"]["y"]},
+        },
+    }
+
+
+@pytest.fixture
+def slice_filepaths(tmp_path, example_config):
+    filepaths = []
+    for index in range(NUM_SLICES):
+        image_filepath = tmp_path / f"inline_{index}.png"
+        slice_image(index).save(image_filepath)
+        config = translated_config(example_config, index * SLICE_SPACING)
+        image_filepath.with_suffix(".toml").write_text(toml.dumps(config))
+        filepaths.append(image_filepath)
+    return filepaths
+
+
+@pytest.fixture
+def volume(slice_filepaths):
+    slices = [
+        VolumeSlice(filepath, Geometry.from_config(toml.load(filepath.with_suffix(".toml"))))
+        for filepath in slice_filepaths
+    ]
+    config = toml.load(slice_filepaths[0].with_suffix(".toml"))
+    return VolumeDataset(slices, TraceHeaderMapper.from_config(config))
+
+
+def test_num_traces_is_total_of_slice_widths(volume):
+    assert volume.num_traces() == NUM_SLICES * 40
+    assert volume.dimensionality == 3
+
+
+def test_traces_are_those_of_each_slice(volume, slice_filepaths, example_config):
+    for index, filepath in enumerate(slice_filepaths):
+        config = translated_config(example_config, index * SLICE_SPACING)
+        dataset = ImageDataset(
+            Image.open(filepath), Geometry.from_config(config), TraceHeaderMapper.from_config(config)
+        )
+        samples = volume.trace_samples_array(index * 40, (index + 1) * 40)
+        assert np.array_equal(samples, dataset.trace_samples_array(0, 40))
+        assert volume.trace_header(index * 40 + 7).cdp_x == dataset.trace_header(7).cdp_x
+
+
+def test_inline_numbers_count_slices_and_crosslines_restart(volume):
+    columns = volume.trace_header_columns(30, 50)
+    assert list(columns["inline_number"]) == [0] * 10 + [1] * 10
+    assert list(columns["crossline_number"]) == list(range(30, 40)) + list(range(0, 10))
+
+
+def test_samples_spanning_slices_are_concatenated(volume):
+    samples = volume.trace_samples_array(35, 45)
+    assert np.array_equal(samples[:5], volume.trace_samples_array(35, 40))
+    assert np.array_equal(samples[5:], volume.trace_samples_array(40, 45))
+
+
+def test_slices_of_different_sizes_are_rejected(slice_filepaths, example_config):
+    Image.new("L", (41, 300)).save(slice_filepaths[1])
+    slices = [VolumeSlice(filepath, Geometry.from_config(example_config)) for filepath in slice_filepaths]
+    with pytest.raises(ValueError, match="inline_1.png has 41 traces"):
+        VolumeDataset(slices, TraceHeaderMapper.from_config(example_config))
+
+
+def test_pages_are_offset_from_one_another(example_config):
+    config = {**example_config, "volume": {"page-offset": {"x": 10.0, "y": -5.0}}}
+    slices = volume_slices("stack.tif", config, num_pages=3)
+    assert [s.page for s in slices] == [0, 1, 2]
+    left_xy = slices[2].geometry.left_xy
+    assert (left_xy[0], left_xy[1]) == (527501 + 20.0, 4840781 - 10.0)
+
+
+def test_pages_without_offset_are_a_configuration_error(example_config):
+    with pytest.raises(ConfigurationError):
+        volume_slices("stack.tif", example_config, num_pages=2)
+
+
+def test_multi_page_tiff_pages_are_slices(tmp_path, example_config):
+    image_filepath = tmp_path / "stack.tif"
+    pages = [slice_image(index) for index in range(NUM_SLICES)]
+    pages[0].save(image_filepath, save_all=True, append_images=pages[1:])
+    config = {**example_config, "volume": {"page-offset": {"x": SLICE_SPACING}}}
+    dataset = VolumeDataset(
+        volume_slices(image_filepath, config, num_pages=NUM_SLICES),
+        TraceHeaderMapper.from_config(config),
+    )
+    pixels = np.asarray(pages[2]).astype(int)
+    assert np.array_equal(dataset.trace_samples(2 * 40 + 3), pixels[:, 3] - 128)
+
+
+@pytest.mark.parametrize("engine, workers", [("native", 1), ("mmap", 1), ("mmap", 2), ("segpy", 1)])
+def test_convert_volume_writes_every_slice(tmp_path, slice_filepaths, engine, workers):
+    segy_filepath = tmp_path / "volume.segy"
+    api.convert_volume(slice_filepaths, segy_filepath, engine=engine, workers=workers)
+    traces = np.fromfile(segy_filepath, dtype=writer.trace_dtype(300, SegYType.INT8), offset=3600)
+    assert len(traces) == NUM_SLICES * 40
+    assert list(traces["header"]["inline_number"][38:42]) == [0, 0, 1, 1]
+    assert list(traces["header"]["crossline_number"][38:42]) == [38, 39, 0, 1]
+    pixels = np.asarray(slice_image(1)).astype(int)
+    assert np.array_equal(traces["samples"][45], pixels[:, 5] - 128)
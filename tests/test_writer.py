@@ -0,0 +1,193 @@
+import io
+
+import numpy as np
+import pytest
+
+import segpy.writer
+from segpy.packer import make_header_packer
+from PIL import Image
+from segpy.trace_header import TraceHeaderRev1
+
+from img2segy import writer
+from img2segy.geometry import Geometry
+from img2segy.image_dataset import ImageDataset
+from img2segy.sample_encoder import SampleEncoder
+from img2segy.trace_header_mapper import TraceHeaderMapper
+
+
+def segpy_bytes(dataset):
+    fh = io.BytesIO()
+    segpy.writer.write_segy(fh, dataset)
+    return fh.getvalue()
+
+
+def native_bytes(dataset, **kwargs):
+    fh = io.BytesIO()
+    writer.write_segy(fh, dataset, **kwargs)
+    return fh.getvalue()
+
+
+def test_trace_header_dtype_itemsize():
+    assert writer.trace_header_dtype().itemsize == 240
+
+
+def test_trace_header_array_matches_segpy_packer(example_dataset):
+    packer = make_header_packer(TraceHeaderRev1, '>')
+    headers = writer.trace_header_array(example_dataset, 10, 13)
+    for i, header in enumerate(headers):
+        assert header.tobytes() == packer.pack(example_dataset.trace_header(10 + i))
+
+
+def test_native_writer_output_is_identical_to_segpy(example_dataset):
+    assert native_bytes(example_dataset) == segpy_bytes(example_dataset)
+
+
+def test_native_writer_output_is_independent_of_block_size(example_dataset):
+    assert native_bytes(example_dataset, block_num_bytes=1000) == segpy_bytes(example_dataset)
+
+
+def test_native_writer_reports_completion(example_dataset):
+    progress = []
+    native_bytes(example_dataset, progress=progress.append)
+    assert progress[-1] == 1
+
+
+def test_trace_header_array_rejects_out_of_range_values():
+    class Dataset:
+        def trace_header_columns(self, start, stop):
+            return {"trace_num": [1, 2 ** 31]}
+
+    with pytest.raises(ValueError):
+        writer.trace_header_array(Dataset(), 0, 2)
+
+
+def test_default_trace_header_array_matches_default_header():
+    packer = make_header_packer(TraceHeaderRev1, '>')
+    headers = writer.default_trace_header_array(1)
+    assert headers[0].tobytes() == packer.pack(TraceHeaderRev1())
+
+
+def test_native_writer_output_from_strips_is_identical_to_segpy(
+        tmp_path, example_image, example_config
+):
+    filepath = tmp_path / "example.bmp"
+    example_image.save(filepath)
+    geometry = Geometry.from_config(example_config)
+    trace_header_mapper = TraceHeaderMapper.from_config(example_config)
+    dataset = ImageDataset(Image.open(filepath), geometry, trace_header_mapper, strip_width=48)
+    expected = ImageDataset(Image.open(filepath), geometry, trace_header_mapper)
+    assert native_bytes(dataset) == segpy_bytes(expected)
+
+
+def test_mapped_writer_output_is_identical_to_segpy(tmp_path, example_dataset):
+    filepath = tmp_path / "example.segy"
+    with open(filepath, "w+b") as fh:
+        writer.write_segy_mapped(fh, example_dataset, block_num_bytes=10000)
+    assert filepath.read_bytes() == segpy_bytes(example_dataset)
+
+
+def test_little_endian_mapped_writer_assembles_headers_in_byte_order(tmp_path, example_dataset, monkeypatch):
+    fh = io.BytesIO()
+    writer.write_segy(fh, example_dataset, endian='<')
+    header_byte_orders = set()
+    trace_header_array = writer.trace_header_array
+
+    def recording_trace_header_array(*args, **kwargs):
+        headers = trace_header_array(*args, **kwargs)
+        header_byte_orders.add(headers.dtype["trace_num"].byteorder)
+        return headers
+
+    monkeypatch.setattr(writer, "trace_header_array", recording_trace_header_array)
+    filepath = tmp_path / "example.segy"
+    with open(filepath, "w+b") as mapped_fh:
+        writer.write_segy_mapped(mapped_fh, example_dataset, endian='<', workers=2)
+    assert filepath.read_bytes() == fh.getvalue()
+    assert header_byte_orders == {np.dtype('<i4').byteorder}
+
+
+def test_layout_file_size_matches_output(example_dataset):
+    fh = io.BytesIO()
+    layout = writer.write_reel_headers(fh, example_dataset)
+    assert fh.tell() == layout.traces_offset
+    assert layout.file_size == len(segpy_bytes(example_dataset))
+
+
+def test_disjoint_trace_ranges_can_be_filled_independently(tmp_path, example_dataset):
+    filepath = tmp_path / "example.segy"
+    with open(filepath, "w+b") as fh:
+        layout = writer.write_reel_headers(fh, example_dataset)
+        fh.flush()
+        writer.preallocate(fh, layout.file_size)
+    for start, stop in [(200, 400), (0, 200)]:
+        traces = writer.map_traces(filepath, layout)
+        writer.fill_traces(traces, example_dataset, start, stop)
+        traces.flush()
+        del traces
+    assert filepath.read_bytes() == segpy_bytes(example_dataset)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_sharded_mapped_writer_output_is_identical_to_segpy(tmp_path, example_dataset, workers):
+    filepath = tmp_path / "example.segy"
+    with open(filepath, "w+b") as fh:
+        writer.write_segy_mapped(fh, example_dataset, workers=workers)
+    assert filepath.read_bytes() == segpy_bytes(example_dataset)
+
+
+def test_trace_shards_cover_all_traces():
+    assert writer.trace_shards(10, 3) == [(0, 3), (3, 6), (6, 10)]
+
+
+def test_trace_shards_are_aligned_to_strips():
+    assert writer.trace_shards(400, 3, alignment=64) == [(0, 128), (128, 256), (256, 400)]
+
+
+def test_trace_shards_are_no_more_numerous_than_strips():
+    assert writer.trace_shards(100, 8, alignment=64) == [(0, 64), (64, 100)]
+
+
+@pytest.mark.parametrize("data_sample_format", ["int16", "float32"])
+def test_native_writer_output_for_wider_formats_is_identical_to_segpy(
+        example_image, example_config, data_sample_format
+):
+    dataset = ImageDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+        sample_encoder=SampleEncoder(data_sample_format=data_sample_format, amplitude_scale=0.1),
+    )
+    assert native_bytes(dataset) == segpy_bytes(dataset)
+
+
+class SequentialStream:
+    """A write-only stream, like a pipe, which cannot seek."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+def test_native_writer_writes_sequentially_to_streams(example_config, example_image):
+    class ExtendedDataset(ImageDataset):
+        @property
+        def extended_textual_header(self):
+            return [[f"{i:<80}" for i in range(40)]]
+
+    dataset = ExtendedDataset(
+        example_image,
+        Geometry.from_config(example_config),
+        TraceHeaderMapper.from_config(example_config),
+    )
+    stream = SequentialStream()
+    writer.write_segy(stream, dataset, block_num_bytes=10000)
+    assert stream.getvalue() == segpy_bytes(dataset)
+    assert max(len(chunk) for chunk in stream.chunks) <= 10000